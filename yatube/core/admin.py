@@ -0,0 +1,20 @@
+from django.contrib import admin
+
+from .models import Job
+
+
+class JobAdmin(admin.ModelAdmin):
+    list_display = (
+        "pk",
+        "name",
+        "status",
+        "attempts",
+        "run_at",
+    )
+
+    list_filter = ("status", "name")
+    search_fields = ("name", "key")
+    readonly_fields = ("last_error",)
+
+
+admin.site.register(Job, JobAdmin)
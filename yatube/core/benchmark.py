@@ -0,0 +1,321 @@
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+from io import StringIO
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.tokens import default_token_generator
+from django.core.management import call_command
+from django.core.paginator import Paginator
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+from posts import caching, timeline
+from posts.models import Group, Post
+from yatube.settings.sessions import SESSION_ENGINES
+
+User = get_user_model()
+
+PASSWORD = "bench-password"
+WORDS = (
+    "погода", "город", "новости", "кино", "музыка", "спорт", "книга",
+    "путешествие", "работа", "кофе", "поезд", "море", "лес", "праздник",
+)
+
+
+def seed(users, groups, posts, batch_size=5000):
+    """Наполняет текущую базу пользователями, группами и постами."""
+    rng = random.Random(0)
+    author = User.objects.create_user("bench_author", password=PASSWORD)
+    User.objects.bulk_create(
+        User(username=f"bench_user_{i}") for i in range(users - 1)
+    )
+    Group.objects.bulk_create(
+        Group(title=f"Группа {i}", slug=f"bench-group-{i}", description="")
+        for i in range(groups)
+    )
+    user_ids = list(User.objects.values_list("pk", flat=True))
+    group_ids = list(Group.objects.values_list("pk", flat=True)) + [None]
+    for start in range(0, posts, batch_size):
+        with transaction.atomic():
+            Post.objects.bulk_create(
+                Post(
+                    text=" ".join(rng.choices(WORDS, k=30)),
+                    author_id=rng.choice(user_ids),
+                    group_id=rng.choice(group_ids),
+                )
+                for _ in range(min(batch_size, posts - start))
+            )
+    Post.objects.create(text="Пост автора", author=author)
+    call_command("recount_posts", stdout=StringIO())
+    for followed in User.objects.exclude(pk=author.pk)[:20]:
+        timeline.follow(author, followed)
+    return author
+
+
+def get_cases(author):
+    """
+    (имя, url, нужен ли вход) для каждого маршрута posts, users и about.
+    Для лент добавлена глубокая страница по номеру.
+    """
+    post = Post.objects.filter(author=author).first()
+    group = (
+        Group.objects.filter(posts__isnull=False).first()
+        or Group.objects.first()
+    )
+    busy = Post.objects.order_by().values("author").annotate(
+        n=Count("pk")
+    ).order_by("-n").first()
+    busy_author = User.objects.get(pk=busy["author"]) if busy else author
+    # Подписка и отписка не меняют подписки, созданные seed()
+    stranger = User.objects.exclude(pk=author.pk).exclude(
+        following__user=author
+    ).first() or busy_author
+    latest = Post.objects.latest("pub_date").pub_date
+    group_latest = group.posts.latest("pub_date").pub_date
+    author_latest = busy_author.posts.latest("pub_date").pub_date
+    uid = urlsafe_base64_encode(force_bytes(author.pk))
+    token = default_token_generator.make_token(author)
+    feeds = {
+        "posts:index": (reverse("posts:index"), Post.objects.all()),
+        "posts:group_list": (
+            reverse("posts:group_list", args=(group.slug,)),
+            group.posts.all(),
+        ),
+        "posts:profile": (
+            reverse("posts:profile", args=(busy_author,)),
+            busy_author.posts.all(),
+        ),
+    }
+    cases = []
+    for name, (url, post_list) in feeds.items():
+        last_page = Paginator(post_list, settings.POST_COUNT).num_pages
+        cases.append((name, url, False))
+        cases.append((f"{name} (deep)", f"{url}?page={last_page}", False))
+    cases += [
+        ("posts:post_detail", reverse("posts:post_detail", args=(post.pk,)),
+         False),
+        ("posts:api_index", reverse("posts:api_index"), False),
+        ("posts:api_group_list",
+         reverse("posts:api_group_list", args=(group.slug,)), False),
+        ("posts:api_profile",
+         reverse("posts:api_profile", args=(busy_author,)), False),
+        ("posts:api_post_detail",
+         reverse("posts:api_post_detail", args=(post.pk,)), False),
+        ("posts:index_feed", reverse("posts:index_feed", args=("rss",)),
+         False),
+        ("posts:group_feed",
+         reverse("posts:group_feed", args=("atom", group.slug)), False),
+        ("posts:profile_feed",
+         reverse("posts:profile_feed", args=("rss", busy_author)), False),
+        ("posts:index_archive",
+         reverse("posts:index_archive",
+                 args=(latest.year, latest.month, latest.day)), False),
+        ("posts:group_archive",
+         reverse("posts:group_archive",
+                 args=(group.slug, group_latest.year)), False),
+        ("posts:profile_archive",
+         reverse("posts:profile_archive",
+                 args=(busy_author, author_latest.year,
+                       author_latest.month)), False),
+        ("posts:group_index", reverse("posts:group_index"), False),
+        ("posts:search", reverse("posts:search") + "?q=погода", False),
+        ("posts:follow_index", reverse("posts:follow_index"), True),
+        ("posts:profile_follow",
+         reverse("posts:profile_follow", args=(stranger,)), True),
+        ("posts:profile_unfollow",
+         reverse("posts:profile_unfollow", args=(stranger,)), True),
+        ("posts:post_create", reverse("posts:post_create"), True),
+        ("posts:post_edit", reverse("posts:post_edit", args=(post.pk,)),
+         True),
+        ("users:signup", reverse("users:signup"), False),
+        ("users:login", reverse("users:login"), False),
+        ("users:logout", reverse("users:logout"), False),
+        ("users:password_reset_form", reverse("users:password_reset_form"),
+         False),
+        ("users:password_reset_done", reverse("users:password_reset_done"),
+         False),
+        ("users:password_change_form",
+         reverse("users:password_change_form"), True),
+        ("users:password_change_done",
+         reverse("users:password_change_done"), True),
+        ("users:password_reset_confirm",
+         reverse("users:password_reset_confirm", args=(uid, token)), False),
+        ("users:password_reset_complete",
+         reverse("users:password_reset_complete"), False),
+        ("about:author", reverse("about:author"), False),
+        ("about:tech", reverse("about:tech"), False),
+    ]
+    return cases
+
+
+def percentile(values, percent):
+    values = sorted(values)
+    index = min(len(values) - 1, round(percent / 100 * (len(values) - 1)))
+    return values[index]
+
+
+def reset_feed_cache(url):
+    """
+    Сбрасывает области кеша лент, в которые может попасть url:
+    иначе ленты, RSS и API после прогрева отдаются из кеша без
+    запросов к БД, и замер показывает только попадание в кеш.
+    """
+    kwargs = resolve(urlsplit(url).path).kwargs
+    scopes = [caching.index_scope()]
+    if "slug" in kwargs:
+        scopes.append(caching.group_scope(kwargs["slug"]))
+    if "username" in kwargs:
+        scopes.append(caching.profile_scope(kwargs["username"]))
+    caching.invalidate(*scopes)
+
+
+def measure(client, url, iterations, cold=False):
+    """
+    Замер url. При cold перед каждым запросом сбрасывается кеш лент.
+    """
+    timings = []
+    queries = []
+    status = None
+    for _ in range(iterations):
+        if cold:
+            reset_feed_cache(url)
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = client.get(url)
+            timings.append(time.perf_counter() - started)
+        queries.append(len(captured))
+        status = response.status_code
+    total = sum(timings)
+    return {
+        "url": url,
+        "status": status,
+        "iterations": iterations,
+        "mean_ms": round(statistics.mean(timings) * 1000, 3),
+        "p50_ms": round(percentile(timings, 50) * 1000, 3),
+        "p90_ms": round(percentile(timings, 90) * 1000, 3),
+        "p99_ms": round(percentile(timings, 99) * 1000, 3),
+        "rps": round(iterations / total, 1) if total else None,
+        "queries": max(queries),
+    }
+
+
+def run(author, iterations, authenticated=False):
+    """Замеряет каждый маршрут и возвращает отчёт по имени маршрута."""
+    guest = Client()
+    member = Client()
+    member.force_login(author)
+    routes = {}
+    for name, url, login_required in get_cases(author):
+        client = member if login_required or authenticated else guest
+        if name == "users:logout":
+            client = guest
+        # Первый запрос прогревает шаблоны и не входит в замер
+        client.get(url)
+        routes[name] = measure(client, url, iterations, cold=True)
+    return routes
+
+
+# Страницы, которые вошедший пользователь открывает чаще всего
+SESSION_ROUTES = (
+    "posts:index",
+    "posts:group_list",
+    "posts:profile",
+    "posts:follow_index",
+)
+
+
+def measure_sessions(author, iterations, modes=tuple(SESSION_ENGINES)):
+    """
+    Замеряет SESSION_ROUTES от имени вошедшего автора с каждым режимом
+    сессий из yatube.settings.sessions. Отчёт: режим -> маршрут -> замер.
+    """
+    urls = {
+        name: url
+        for name, url, _ in get_cases(author)
+        if name in SESSION_ROUTES
+    }
+    results = {}
+    for mode in modes:
+        with override_settings(SESSION_ENGINE=SESSION_ENGINES[mode]):
+            client = Client()
+            client.force_login(author)
+            results[mode] = {}
+            for name, url in urls.items():
+                client.get(url)
+                results[mode][name] = measure(client, url, iterations)
+    return results
+
+
+# Команды запуска процесса: голый интерпретатор для сравнения,
+# manage.py check и импорт WSGI-приложения, как при старте обработчика
+STARTUP_COMMANDS = {
+    "python": ("-c", "pass"),
+    "check": ("manage.py", "check"),
+    "wsgi": ("-c", "import yatube.wsgi"),
+}
+
+
+def measure_startup(profile, repeats):
+    """
+    Время запуска каждой команды STARTUP_COMMANDS в новом процессе
+    с профилем настроек profile (YATUBE_ENV).
+    """
+    env = dict(os.environ, YATUBE_ENV=profile)
+    env.pop("DJANGO_SETTINGS_MODULE", None)
+    env.setdefault("YATUBE_SECRET_KEY", "benchmark")
+    results = {}
+    for name, args in STARTUP_COMMANDS.items():
+        timings = []
+        for _ in range(repeats):
+            started = time.perf_counter()
+            subprocess.run(
+                (sys.executable, *args),
+                cwd=settings.BASE_DIR,
+                env=env,
+                check=True,
+                stdout=subprocess.DEVNULL,
+            )
+            timings.append(time.perf_counter() - started)
+        results[name] = {
+            "repeats": repeats,
+            "min_ms": round(min(timings) * 1000, 1),
+            "p50_ms": round(percentile(timings, 50) * 1000, 1),
+            "mean_ms": round(statistics.mean(timings) * 1000, 1),
+        }
+    return results
+
+
+def compare(baseline, current, threshold):
+    """
+    Строки сравнения двух отчётов и список регрессий: p50 вырос больше
+    чем на threshold или выросло число запросов к БД.
+    """
+    lines = []
+    regressions = []
+    for name, now in current["routes"].items():
+        before = baseline["routes"].get(name)
+        if before is None:
+            lines.append(f"{name}: новый маршрут")
+            continue
+        change = (now["p50_ms"] - before["p50_ms"]) / max(
+            before["p50_ms"], 1e-6
+        )
+        lines.append(
+            f"{name}: p50 {before['p50_ms']} -> {now['p50_ms']} мс "
+            f"({change:+.0%}), запросов {before['queries']} -> "
+            f"{now['queries']}"
+        )
+        if change > threshold or now["queries"] > before["queries"]:
+            regressions.append(name)
+    return lines, regressions
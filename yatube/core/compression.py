@@ -0,0 +1,79 @@
+"""
+Сжатие ответов и статики: gzip есть всегда, brotli — если установлен
+пакет brotli.
+"""
+import gzip
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Сжатие и суффикс заранее сжатой копии файла, лучшее первым
+ENCODINGS = (
+    ("br", ".br"),
+    ("gzip", ".gz"),
+)
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/javascript",
+    "application/json",
+    "application/xml",
+    "application/rss+xml",
+    "application/atom+xml",
+    "image/svg+xml",
+)
+
+
+def parse_quality(params):
+    """
+    Вес q из параметров элемента Accept-Encoding: по умолчанию 1,
+    нечитаемый вес считается отказом.
+    """
+    for param in params.split(";"):
+        name, _, value = param.partition("=")
+        if name.strip().lower() == "q":
+            try:
+                return float(value)
+            except ValueError:
+                return 0
+    return 1
+
+
+def accepted_encodings(accept_encoding):
+    """
+    Сжатия из ENCODINGS, которые принимает клиент: по убыванию веса q,
+    при равном весе — лучшее первым. Сжатия с q=0 клиент отклонил.
+    """
+    weights = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.partition(";")
+        weights[coding.strip().lower()] = parse_quality(params)
+    default = weights.get("*", 0)
+    accepted = [
+        (weights.get(encoding, default), encoding)
+        for encoding, _ in ENCODINGS
+    ]
+    return [
+        encoding
+        for weight, encoding in sorted(
+            accepted, key=lambda item: -item[0]
+        )
+        if weight > 0
+    ]
+
+
+def is_compressible(content_type):
+    return bool(content_type) and content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+def compress(content, quality=11):
+    """
+    {суффикс: сжатые данные} для доступных сжатий. quality — уровень
+    brotli: 11 для статики, для ответов на лету — ниже.
+    """
+    variants = {".gz": gzip.compress(content, mtime=0)}
+    if brotli is not None:
+        variants[".br"] = brotli.compress(content, quality=quality)
+    return variants
@@ -0,0 +1,107 @@
+import multiprocessing
+import random
+import statistics
+import time
+
+from django.conf import settings
+from django.db import (OperationalError, close_old_connections, connection,
+                       connections)
+
+from posts.models import Post, User
+
+from .benchmark import WORDS, percentile
+
+
+def get_profiles():
+    """
+    Настройки SQLite для сравнения: значения Django и SQLite
+    по умолчанию и профиль prod (yatube/settings/sqlite.py).
+    """
+    from yatube.settings import sqlite as production
+
+    return {
+        "default": {
+            "conn_max_age": 0,
+            "options": {},
+            "pragmas": {"journal_mode": "DELETE", "synchronous": "FULL"},
+        },
+        "production": {
+            "conn_max_age": production.CONN_MAX_AGE,
+            "options": {"timeout": production.SQLITE_TIMEOUT},
+            "pragmas": production.SQLITE_PRAGMAS,
+        },
+    }
+
+
+def worker(path, profile, duration, write_ratio, seed):
+    """
+    Процесс-обработчик: до истечения duration секунд читает первую
+    страницу главной ленты или публикует пост, как post_create.
+    Между операциями соединение закрывается так же, как в конце запроса.
+    """
+    connection.settings_dict.update(
+        NAME=path,
+        CONN_MAX_AGE=profile["conn_max_age"],
+        OPTIONS=profile["options"],
+    )
+    settings.SQLITE_PRAGMAS = profile["pragmas"]
+    rng = random.Random(seed)
+    author_ids = list(User.objects.values_list("pk", flat=True)[:100])
+    timings = {"read": [], "write": []}
+    errors = 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        close_old_connections()
+        kind = "write" if rng.random() < write_ratio else "read"
+        started = time.perf_counter()
+        try:
+            if kind == "write":
+                Post.objects.create(
+                    text=" ".join(rng.choices(WORDS, k=30)),
+                    author_id=rng.choice(author_ids),
+                )
+            else:
+                list(Post.objects.feed()[:settings.POST_COUNT])
+        except OperationalError:
+            errors += 1
+            continue
+        timings[kind].append(time.perf_counter() - started)
+    connection.close()
+    return timings, errors
+
+
+def summarize(timings, duration):
+    if not timings:
+        return {"ops": 0, "ops_per_second": 0.0}
+    return {
+        "ops": len(timings),
+        "ops_per_second": round(len(timings) / duration, 1),
+        "mean_ms": round(statistics.mean(timings) * 1000, 3),
+        "p50_ms": round(percentile(timings, 50) * 1000, 3),
+        "p99_ms": round(percentile(timings, 99) * 1000, 3),
+    }
+
+
+def run(path, profile, workers, duration, write_ratio):
+    """
+    Запускает workers процессов на файле БД path с настройками
+    profile и возвращает пропускную способность чтений и записей.
+    """
+    # Дочерние процессы не должны наследовать открытые соединения
+    connections.close_all()
+    context = multiprocessing.get_context("fork")
+    with context.Pool(workers) as pool:
+        results = pool.starmap(
+            worker,
+            (
+                (path, profile, duration, write_ratio, seed)
+                for seed in range(workers)
+            ),
+        )
+    reads = [value for timings, _ in results for value in timings["read"]]
+    writes = [value for timings, _ in results for value in timings["write"]]
+    return {
+        "reads": summarize(reads, duration),
+        "writes": summarize(writes, duration),
+        "locked_errors": sum(errors for _, errors in results),
+    }
@@ -0,0 +1,14 @@
+from django.conf import settings
+
+
+def apply_pragmas(sender, connection, **kwargs):
+    """
+    Выполняет SQLITE_PRAGMAS на новом соединении с SQLite.
+    С постоянными соединениями (CONN_MAX_AGE) это происходит один раз
+    на соединение, а не на каждый запрос.
+    """
+    if connection.vendor != "sqlite" or not settings.SQLITE_PRAGMAS:
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
@@ -0,0 +1,133 @@
+import contextvars
+import threading
+import time
+
+from django.template.backends.django import DjangoTemplates, Template
+
+# Сколько SQL-запросов одного запроса хранить для журнала медленных
+MAX_LOGGED_QUERIES = 50
+
+_current = contextvars.ContextVar("request_stats", default=None)
+
+
+class RequestStats:
+    """Стоимость одного HTTP-запроса."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.query_time = 0.0
+        self.sql = []
+        self.template_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def __call__(self, execute, sql, params, many, context):
+        # Обёртка connection.execute_wrapper: считает запросы к БД
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.queries += 1
+            self.query_time += duration
+            if len(self.sql) < MAX_LOGGED_QUERIES:
+                self.sql.append((duration, sql))
+
+
+def start():
+    stats = RequestStats()
+    return stats, _current.set(stats)
+
+
+def finish(token):
+    _current.reset(token)
+
+
+def current():
+    return _current.get()
+
+
+def record_cache(hit):
+    """Учитывает обращение к кешу в статистике текущего запроса."""
+    stats = current()
+    if stats is None:
+        return
+    if hit:
+        stats.cache_hits += 1
+    else:
+        stats.cache_misses += 1
+
+
+class ViewStats:
+    """Накопленная статистика по имени представления."""
+
+    FIELDS = (
+        "requests", "total_ms", "max_ms", "queries", "query_ms",
+        "template_ms", "cache_hits", "cache_misses", "slow",
+    )
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def add(self, view_name, stats, slow):
+        elapsed_ms = stats.elapsed * 1000
+        with self._lock:
+            row = self._views.setdefault(
+                view_name, dict.fromkeys(self.FIELDS, 0)
+            )
+            row["requests"] += 1
+            row["total_ms"] += elapsed_ms
+            row["max_ms"] = max(row["max_ms"], elapsed_ms)
+            row["queries"] += stats.queries
+            row["query_ms"] += stats.query_time * 1000
+            row["template_ms"] += stats.template_time * 1000
+            row["cache_hits"] += stats.cache_hits
+            row["cache_misses"] += stats.cache_misses
+            row["slow"] += int(slow)
+
+    def snapshot(self):
+        with self._lock:
+            views = {name: dict(row) for name, row in self._views.items()}
+        for row in views.values():
+            requests = row["requests"]
+            row["mean_ms"] = round(row["total_ms"] / requests, 3)
+            row["mean_queries"] = round(row["queries"] / requests, 2)
+            for field in ("total_ms", "max_ms", "query_ms", "template_ms"):
+                row[field] = round(row[field], 3)
+        return views
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+
+view_stats = ViewStats()
+
+
+class InstrumentedTemplate(Template):
+    def render(self, context=None, request=None):
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            stats = current()
+            if stats is not None:
+                stats.template_time += time.perf_counter() - started
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """Бэкенд DjangoTemplates, который замеряет время рендеринга."""
+
+    def from_string(self, template_code):
+        template = super().from_string(template_code)
+        return InstrumentedTemplate(template.template, self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return InstrumentedTemplate(template.template, self)
@@ -0,0 +1,166 @@
+import functools
+import json
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger("yatube.jobs")
+
+# Зарегистрированные задачи: имя -> функция
+TASKS = {}
+
+
+def task(func):
+    """
+    Регистрирует функцию как фоновую задачу. Аргументы задачи
+    передаются через JSON, поэтому должны быть простыми значениями;
+    даты лучше передавать строкой isoformat(): DjangoJSONEncoder
+    отбрасывает микросекунды.
+    func.enqueue(key=None, delay=0, **kwargs) ставит её в очередь.
+    """
+    name = f"{func.__module__}.{func.__name__}"
+    TASKS[name] = func
+    func.enqueue = functools.partial(enqueue, name)
+    return func
+
+
+def enqueue(name, key=None, delay=0, **kwargs):
+    """
+    Ставит задачу в очередь. Вызванная внутри транзакции, задача
+    появится в очереди только вместе с её изменениями.
+    Пока задача с тем же key не выполнена успешно, новая не
+    добавляется: ожидающая задача (и та, что ждёт повтора после
+    ошибки) остаётся как есть, упавшая ставится заново, а
+    выполняющаяся будет выполнена ещё раз с новыми аргументами.
+    При JOBS_EAGER задача выполняется сразу.
+    """
+    payload = json.dumps(kwargs, cls=DjangoJSONEncoder)
+    if settings.JOBS_EAGER:
+        TASKS[name](**json.loads(payload))
+        return
+    run_at = timezone.now() + timedelta(seconds=delay)
+    if key is None:
+        Job.objects.create(name=name, payload=payload, run_at=run_at)
+        return
+    while True:
+        job, created = Job.objects.get_or_create(
+            key=key,
+            defaults={"name": name, "payload": payload, "run_at": run_at},
+        )
+        if created or job.status == Job.PENDING:
+            return
+        changes = {"payload": payload, "run_at": run_at}
+        if job.status == Job.FAILED:
+            changes.update(status=Job.PENDING, attempts=0)
+        # Статус мог измениться с момента чтения: тогда ещё раз
+        if Job.objects.filter(pk=job.pk, status=job.status).update(
+            **changes
+        ):
+            return
+
+
+def retry_delay(attempts):
+    """Пауза перед следующей попыткой: растёт вдвое с каждой ошибкой."""
+    return timedelta(
+        seconds=settings.JOBS_RETRY_DELAY * 2 ** (attempts - 1)
+    )
+
+
+def release_stale():
+    """Возвращает в очередь задачи упавших обработчиков."""
+    expired = timezone.now() - timedelta(seconds=settings.JOBS_LOCK_TIMEOUT)
+    return Job.objects.filter(
+        status=Job.RUNNING, locked_at__lt=expired
+    ).update(status=Job.PENDING, locked_at=None)
+
+
+def claim(job):
+    """
+    Забирает задачу у других обработчиков условным UPDATE:
+    SQLite не поддерживает SELECT ... FOR UPDATE SKIP LOCKED.
+    """
+    claimed = Job.objects.filter(pk=job.pk, status=Job.PENDING).update(
+        status=Job.RUNNING,
+        locked_at=timezone.now(),
+        attempts=F("attempts") + 1,
+    )
+    if claimed:
+        job.refresh_from_db(fields=("attempts",))
+    return bool(claimed)
+
+
+def unchanged(job):
+    """
+    Задача job, если enqueue() не переставил её во время выполнения.
+    Перестановка меняет run_at, и такую задачу нужно выполнить ещё раз.
+    """
+    return Job.objects.filter(pk=job.pk, run_at=job.run_at)
+
+
+def requeue(job, **fields):
+    Job.objects.filter(pk=job.pk).update(
+        status=Job.PENDING, attempts=0, locked_at=None, **fields
+    )
+
+
+def run_job(job):
+    """Выполняет задачу. Возвращает True, если она завершилась без ошибок."""
+    try:
+        func = TASKS[job.name]
+        with transaction.atomic():
+            func(**json.loads(job.payload))
+            # Задача снимается с очереди в одной транзакции со своими
+            # изменениями: иначе после сбоя между ними release_stale()
+            # выполнил бы её ещё раз
+            deleted, _ = unchanged(job).delete()
+            if not deleted:
+                requeue(job)
+    except Exception:
+        error = traceback.format_exc()
+        if job.attempts >= settings.JOBS_MAX_ATTEMPTS:
+            logger.error("Задача %s не выполнена:\n%s", job.name, error)
+            if not unchanged(job).update(
+                status=Job.FAILED, locked_at=None, last_error=error
+            ):
+                requeue(job, last_error=error)
+        else:
+            Job.objects.filter(pk=job.pk).update(
+                status=Job.PENDING,
+                locked_at=None,
+                last_error=error,
+                run_at=timezone.now() + retry_delay(job.attempts),
+            )
+        return False
+    return True
+
+
+def run_pending(batch_size=100):
+    """
+    Выполняет задачи, срок которых наступил, пока они не кончатся.
+    Возвращает (выполнено, с ошибкой).
+    """
+    release_stale()
+    done = failed = 0
+    while True:
+        jobs = list(
+            Job.objects.filter(
+                status=Job.PENDING, run_at__lte=timezone.now()
+            ).order_by("run_at", "pk")[:batch_size]
+        )
+        if not jobs:
+            return done, failed
+        for job in jobs:
+            if not claim(job):
+                continue
+            if run_job(job):
+                done += 1
+            else:
+                failed += 1
@@ -0,0 +1,102 @@
+import json
+import platform
+import subprocess
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (setup_test_environment,
+                               teardown_test_environment)
+
+from core import benchmark
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ("git", "rev-parse", "--short", "HEAD"),
+            cwd=settings.BASE_DIR,
+            stderr=subprocess.DEVNULL,
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        "Замеряет задержку, число запросов к БД и пропускную способность "
+        "всех маршрутов posts, users и about на отдельной тестовой базе."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=100)
+        parser.add_argument("--groups", type=int, default=10)
+        parser.add_argument("--posts", type=int, default=10000)
+        parser.add_argument(
+            "--iterations", type=int, default=50,
+            help="Запросов на каждый маршрут.",
+        )
+        parser.add_argument(
+            "--authenticated", action="store_true",
+            help="Все маршруты запрашивать от имени автора.",
+        )
+        parser.add_argument(
+            "--output", help="Файл для JSON-отчёта (по умолчанию stdout).",
+        )
+        parser.add_argument(
+            "--compare", help="Отчёт предыдущего прогона для сравнения.",
+        )
+        parser.add_argument(
+            "--threshold", type=float, default=0.2,
+            help="Допустимый рост p50 при сравнении (0.2 = 20%%).",
+        )
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            started = time.perf_counter()
+            author = benchmark.seed(
+                options["users"], options["groups"], options["posts"]
+            )
+            seed_seconds = time.perf_counter() - started
+            routes = benchmark.run(
+                author, options["iterations"], options["authenticated"]
+            )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+        report = {
+            "meta": {
+                "revision": git_revision(),
+                "python": platform.python_version(),
+                "database": connection.vendor,
+                "users": options["users"],
+                "groups": options["groups"],
+                "posts": options["posts"],
+                "iterations": options["iterations"],
+                "authenticated": options["authenticated"],
+                "seed_seconds": round(seed_seconds, 2),
+            },
+            "routes": routes,
+        }
+        data = json.dumps(report, ensure_ascii=False, indent=2)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as stream:
+                stream.write(data + "\n")
+        else:
+            self.stdout.write(data)
+        if options["compare"]:
+            with open(options["compare"], encoding="utf-8") as stream:
+                baseline = json.load(stream)
+            lines, regressions = benchmark.compare(
+                baseline, report, options["threshold"]
+            )
+            for line in lines:
+                self.stderr.write(line)
+            if regressions:
+                raise CommandError(
+                    "Регрессии производительности: " + ", ".join(regressions)
+                )
@@ -0,0 +1,54 @@
+import json
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import (setup_test_environment,
+                               teardown_test_environment)
+
+from core import benchmark
+from yatube.settings.sessions import SESSION_ENGINES
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнивает ленты вошедшего пользователя с сессиями в БД, "
+        "в кеше с записью в БД и в подписанной cookie."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=100)
+        parser.add_argument("--groups", type=int, default=10)
+        parser.add_argument("--posts", type=int, default=10000)
+        parser.add_argument(
+            "--iterations", type=int, default=50,
+            help="Запросов на каждую страницу.",
+        )
+        parser.add_argument(
+            "--modes", nargs="+", default=list(SESSION_ENGINES),
+            choices=list(SESSION_ENGINES),
+            help="Режимы сессий для сравнения.",
+        )
+        parser.add_argument(
+            "--output", help="Файл для JSON-отчёта (по умолчанию stdout).",
+        )
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            author = benchmark.seed(
+                options["users"], options["groups"], options["posts"]
+            )
+            report = benchmark.measure_sessions(
+                author, options["iterations"], options["modes"]
+            )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+        data = json.dumps(report, ensure_ascii=False, indent=2)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as stream:
+                stream.write(data + "\n")
+        else:
+            self.stdout.write(data)
@@ -0,0 +1,77 @@
+import json
+import os
+import tempfile
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+
+from core import benchmark, concurrency
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнивает пропускную способность чтений и записей SQLite "
+        "с настройками по умолчанию и профилем prod "
+        "при нескольких параллельных процессах."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=4)
+        parser.add_argument(
+            "--duration", type=float, default=5,
+            help="Секунд на каждый профиль.",
+        )
+        parser.add_argument(
+            "--write-ratio", type=float, default=0.2,
+            help="Доля операций-записей (0.2 = 20%%).",
+        )
+        parser.add_argument("--users", type=int, default=50)
+        parser.add_argument("--groups", type=int, default=5)
+        parser.add_argument("--posts", type=int, default=5000)
+        parser.add_argument(
+            "--output", help="Файл для JSON-отчёта (по умолчанию stdout).",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError("Бенчмарк рассчитан только на SQLite.")
+        settings_dict = connection.settings_dict
+        old = {key: settings_dict[key] for key in ("NAME", "OPTIONS")}
+        profiles = concurrency.get_profiles()
+        report = {}
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "benchmark.sqlite3")
+            connections.close_all()
+            settings_dict["NAME"] = path
+            try:
+                call_command("migrate", verbosity=0)
+                benchmark.seed(
+                    options["users"], options["groups"], options["posts"]
+                )
+                for name, profile in profiles.items():
+                    report[name] = concurrency.run(
+                        path,
+                        profile,
+                        options["workers"],
+                        options["duration"],
+                        options["write_ratio"],
+                    )
+            finally:
+                connections.close_all()
+                settings_dict.update(old)
+        report = {
+            "meta": {
+                "workers": options["workers"],
+                "duration": options["duration"],
+                "write_ratio": options["write_ratio"],
+                "posts": options["posts"],
+            },
+            "profiles": report,
+        }
+        data = json.dumps(report, ensure_ascii=False, indent=2)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as stream:
+                stream.write(data + "\n")
+        else:
+            self.stdout.write(data)
@@ -0,0 +1,37 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from core import benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Замеряет время запуска manage.py check и импорта WSGI-приложения "
+        "в новых процессах для профилей настроек dev и prod."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--repeats", type=int, default=10,
+            help="Запусков каждой команды.",
+        )
+        parser.add_argument(
+            "--profiles", nargs="+", default=["dev", "prod"],
+            help="Профили YATUBE_ENV для сравнения.",
+        )
+        parser.add_argument(
+            "--output", help="Файл для JSON-отчёта (по умолчанию stdout).",
+        )
+
+    def handle(self, *args, **options):
+        report = {
+            profile: benchmark.measure_startup(profile, options["repeats"])
+            for profile in options["profiles"]
+        }
+        data = json.dumps(report, ensure_ascii=False, indent=2)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as stream:
+                stream.write(data + "\n")
+        else:
+            self.stdout.write(data)
@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core import jobs
+
+
+class Command(BaseCommand):
+    help = (
+        "Обработчик фоновых задач: выполняет задачи из очереди в БД "
+        "и ждёт новых."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once", action="store_true",
+            help="Выполнить задачи, срок которых наступил, и выйти.",
+        )
+        parser.add_argument(
+            "--sleep", type=float, default=1.0,
+            help="Пауза между опросами пустой очереди, секунд.",
+        )
+        parser.add_argument("--batch-size", type=int, default=100)
+
+    def handle(self, *args, **options):
+        try:
+            while True:
+                done, failed = jobs.run_pending(options["batch_size"])
+                if done or failed:
+                    self.stdout.write(
+                        f"Выполнено задач: {done}, с ошибкой: {failed}"
+                    )
+                if options["once"]:
+                    return
+                if not done and not failed:
+                    time.sleep(options["sleep"])
+        except KeyboardInterrupt:
+            self.stdout.write("Обработчик остановлен")
@@ -0,0 +1,149 @@
+import contextlib
+import logging
+
+from django.conf import settings
+from django.db import connections
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+
+from . import compression, instrumentation, routers
+
+logger = logging.getLogger("yatube.slow_requests")
+
+
+class RequestStatsMiddleware:
+    """
+    Замеряет время запроса, число и время SQL-запросов, время рендеринга
+    шаблонов и обращения к кешу. Итоги копятся по имени представления,
+    отдаются в заголовке Server-Timing, медленные запросы пишутся в журнал
+    вместе с SQL.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats, token = instrumentation.start()
+        try:
+            with contextlib.ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(
+                        connections[alias].execute_wrapper(stats)
+                    )
+                response = self.get_response(request)
+        finally:
+            instrumentation.finish(token)
+        match = request.resolver_match
+        view_name = match.view_name if match else "<unresolved>"
+        elapsed_ms = stats.elapsed * 1000
+        slow = elapsed_ms >= settings.SLOW_REQUEST_THRESHOLD_MS
+        instrumentation.view_stats.add(view_name, stats, slow)
+        response["Server-Timing"] = self.server_timing(stats, elapsed_ms)
+        if slow:
+            self.log_slow(request, view_name, stats, elapsed_ms)
+        return response
+
+    @staticmethod
+    def server_timing(stats, elapsed_ms):
+        metrics = [
+            f"app;dur={elapsed_ms:.1f}",
+            f'db;dur={stats.query_time * 1000:.1f};desc="{stats.queries} q"',
+            f"tpl;dur={stats.template_time * 1000:.1f}",
+        ]
+        if stats.cache_hits or stats.cache_misses:
+            metrics.append(
+                f'cache;desc="{stats.cache_hits} hit, '
+                f'{stats.cache_misses} miss"'
+            )
+        return ", ".join(metrics)
+
+    @staticmethod
+    def log_slow(request, view_name, stats, elapsed_ms):
+        sql = "\n".join(
+            f"  {duration * 1000:.1f} мс: {query}"
+            for duration, query in stats.sql
+        )
+        logger.warning(
+            "Медленный запрос %s %s (%s): %.1f мс, SQL: %d за %.1f мс\n%s",
+            request.method,
+            request.get_full_path(),
+            view_name,
+            elapsed_ms,
+            stats.queries,
+            stats.query_time * 1000,
+            sql,
+        )
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Включает маршрутизацию чтений на реплики (core.routers). После
+    записи в БД ставит подписанную cookie: следующие
+    REPLICA_STICKY_SECONDS пользователь читает с основной БД и видит
+    свои изменения, даже если реплика отстаёт.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state, token = routers.start(sticky=routers.is_sticky(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            routers.finish(token)
+        if state.wrote:
+            response.set_signed_cookie(
+                settings.REPLICA_STICKY_COOKIE,
+                "1",
+                max_age=settings.REPLICA_STICKY_SECONDS,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    Сжимает ответы не короче COMPRESS_MIN_SIZE байт: brotli, если он
+    установлен и его принимает браузер, иначе gzip. Потоковые ответы
+    сжимаются только gzip.
+    """
+
+    # Уровень brotli для ответов на лету: 11 слишком медленный
+    BROTLI_QUALITY = 5
+
+    def process_response(self, request, response):
+        if (
+            not response.streaming
+            and len(response.content) < settings.COMPRESS_MIN_SIZE
+        ):
+            return response
+        if response.has_header("Content-Encoding"):
+            return response
+        patch_vary_headers(response, ("Accept-Encoding",))
+        encodings = compression.accepted_encodings(
+            request.META.get("HTTP_ACCEPT_ENCODING", "")
+        )
+        if (
+            compression.brotli is None
+            or "br" not in encodings
+            or response.streaming
+        ):
+            # GZipMiddleware не смотрит на q=0: gzip мог быть отклонён
+            if "gzip" not in encodings:
+                return response
+            return super().process_response(request, response)
+        content = compression.brotli.compress(
+            response.content, quality=self.BROTLI_QUALITY
+        )
+        if len(content) >= len(response.content):
+            return response
+        response.content = content
+        response["Content-Length"] = str(len(content))
+        # Как в GZipMiddleware: у сжатого ответа ETag слабый
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = "W/" + etag
+        response["Content-Encoding"] = "br"
+        return response
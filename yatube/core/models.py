@@ -0,0 +1,48 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    PENDING = "pending"
+    RUNNING = "running"
+    FAILED = "failed"
+    STATUSES = (
+        (PENDING, "Ожидает"),
+        (RUNNING, "Выполняется"),
+        (FAILED, "Ошибка"),
+    )
+
+    name = models.CharField("Задача", max_length=200)
+    # Ключ задачи: пока она не выполнена успешно, повторная
+    # постановка с тем же ключом не добавляет новую
+    key = models.CharField(
+        "Ключ",
+        max_length=200,
+        unique=True,
+        blank=True,
+        null=True
+    )
+    payload = models.TextField("Аргументы", default="{}")
+    status = models.CharField(
+        "Статус",
+        max_length=10,
+        choices=STATUSES,
+        default=PENDING
+    )
+    attempts = models.PositiveSmallIntegerField("Попыток", default=0)
+    run_at = models.DateTimeField("Запустить после", default=timezone.now)
+    locked_at = models.DateTimeField("Запущена", blank=True, null=True)
+    last_error = models.TextField("Последняя ошибка", blank=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.status})"
+
+    class Meta:
+        verbose_name = "Фоновая задача"
+        verbose_name_plural = "Фоновые задачи"
+        indexes = (
+            models.Index(
+                fields=("status", "run_at"),
+                name="job_status_run_at_idx",
+            ),
+        )
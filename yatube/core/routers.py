@@ -0,0 +1,110 @@
+import contextlib
+import contextvars
+import functools
+import random
+
+from django.conf import settings
+
+PRIMARY = "default"
+
+_current = contextvars.ContextVar("routing_state", default=None)
+
+
+class RoutingState:
+    """
+    Маршрутизация запросов к БД в пределах одного HTTP-запроса.
+    sticky — пользователь недавно писал в БД и читает только с основной.
+    """
+
+    def __init__(self, sticky=False):
+        self.sticky = sticky
+        self.use_replica = False
+        self.wrote = False
+
+
+def start(sticky):
+    state = RoutingState(sticky)
+    return state, _current.set(state)
+
+
+def finish(token):
+    _current.reset(token)
+
+
+def is_sticky(request):
+    """Писал ли пользователь в БД последние REPLICA_STICKY_SECONDS."""
+    return request.get_signed_cookie(
+        settings.REPLICA_STICKY_COOKIE,
+        default=None,
+        max_age=settings.REPLICA_STICKY_SECONDS,
+    ) is not None
+
+
+def replica_reads(view):
+    """
+    Чтения представления идут на реплику, если реплики настроены
+    и пользователь не писал в БД последние REPLICA_STICKY_SECONDS.
+    """
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        state = _current.get()
+        if (
+            state is None
+            or state.sticky
+            or request.method not in ("GET", "HEAD")
+        ):
+            return view(request, *args, **kwargs)
+        state.use_replica = True
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            state.use_replica = False
+    return wrapper
+
+
+@contextlib.contextmanager
+def primary_reads():
+    """Чтения внутри блока идут на основную БД, даже в replica_reads."""
+    state = _current.get()
+    if state is None:
+        yield
+        return
+    use_replica, state.use_replica = state.use_replica, False
+    try:
+        yield
+    finally:
+        state.use_replica = use_replica
+
+
+class ReplicaRouter:
+    """
+    Все записи идут в основную БД. Чтения моделей REPLICA_APPS — на
+    случайную реплику из DATABASE_REPLICAS, но только внутри
+    представлений replica_reads.
+    """
+
+    # Сессии и пользователи читаются с основной БД: на отставшей
+    # реплике нет свежей сессии, и вошедший пользователь стал бы гостем
+    REPLICA_APPS = ("posts",)
+
+    def db_for_read(self, model, **hints):
+        state = _current.get()
+        if (
+            state is None
+            or not state.use_replica
+            or not settings.DATABASE_REPLICAS
+            or model._meta.app_label not in self.REPLICA_APPS
+        ):
+            return PRIMARY
+        return random.choice(settings.DATABASE_REPLICAS)
+
+    def db_for_write(self, model, **hints):
+        state = _current.get()
+        if state is not None:
+            state.wrote = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики — копии основной БД
+        databases = {PRIMARY, *settings.DATABASE_REPLICAS}
+        return obj1._state.db in databases and obj2._state.db in databases
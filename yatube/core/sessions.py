@@ -0,0 +1,35 @@
+"""
+Сессии cached_db с локальным кешем процесса (CACHES["sessions"]).
+Кеш у каждого процесса-обработчика свой, поэтому сессия лежит в нём
+не дольше SESSION_CACHE_TIMEOUT секунд: выход или удаление сессии
+в одном процессе остальные увидят не позже чем через это время.
+"""
+from django.conf import settings
+from django.contrib.sessions.backends import cached_db
+
+
+class CappedCache:
+    """Обёртка кеша, в которой запись живёт не дольше timeout секунд."""
+
+    def __init__(self, cache, timeout):
+        self.cache = cache
+        self.timeout = timeout
+
+    def __contains__(self, key):
+        return key in self.cache
+
+    def __getattr__(self, name):
+        return getattr(self.cache, name)
+
+    def set(self, key, value, timeout):
+        self.cache.set(key, value, min(timeout, self.timeout))
+
+
+class SessionStore(cached_db.SessionStore):
+    cache_key_prefix = "core.sessions"
+
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        self._cache = CappedCache(
+            self._cache, settings.SESSION_CACHE_TIMEOUT
+        )
@@ -0,0 +1,139 @@
+"""
+Статика боевого сервера: имена с хешем содержимого, сжатые копии .gz
+и .br, которые готовит collectstatic, и раздача из STATIC_ROOT прямо
+в WSGI-приложении, без Django и без отдельного веб-сервера.
+"""
+import mimetypes
+import os
+from urllib.parse import urlparse
+from wsgiref.util import FileWrapper
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import (
+    ManifestStaticFilesStorage, staticfiles_storage
+)
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.base import ContentFile
+from django.utils._os import safe_join
+from django.utils.functional import cached_property
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+from . import compression
+
+# Файлы с хешем в имени не меняются: кешируются на год
+HASHED_MAX_AGE = 365 * 24 * 60 * 60
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    ManifestStaticFilesStorage, который кладёт рядом с текстовыми
+    файлами не короче COMPRESS_MIN_SIZE байт их сжатые копии.
+    Копия сохраняется, только если она меньше файла.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        names = set()
+        for name, hashed_name, processed in super().post_process(
+            paths, dry_run, **options
+        ):
+            yield name, hashed_name, processed
+            if not isinstance(processed, Exception):
+                names.update(item for item in (name, hashed_name) if item)
+        if not dry_run:
+            for name in sorted(names):
+                self.save_compressed(name)
+
+    def save_compressed(self, name):
+        content_type, _ = mimetypes.guess_type(name)
+        if not compression.is_compressible(content_type):
+            return
+        with self.open(name) as original:
+            content = original.read()
+        if len(content) < settings.COMPRESS_MIN_SIZE:
+            return
+        for suffix, data in compression.compress(content).items():
+            if self.exists(name + suffix):
+                self.delete(name + suffix)
+            if len(data) < len(content):
+                self._save(name + suffix, ContentFile(data))
+
+
+class StaticFilesApplication:
+    """
+    WSGI-обёртка: GET и HEAD под STATIC_URL отдаёт из STATIC_ROOT,
+    выбирая сжатую копию по Accept-Encoding. Файлы из манифеста
+    с хешем в имени кешируются на год, остальные — на
+    STATIC_MAX_AGE секунд. Прочие запросы уходят в application.
+    """
+
+    def __init__(self, application):
+        self.application = application
+        self.prefix = urlparse(settings.STATIC_URL).path
+        self.root = settings.STATIC_ROOT
+
+    @cached_property
+    def hashed_names(self):
+        return set(getattr(staticfiles_storage, "hashed_files", {}).values())
+
+    def __call__(self, environ, start_response):
+        path = environ.get("PATH_INFO", "")
+        method = environ.get("REQUEST_METHOD")
+        if (
+            not self.root
+            or method not in ("GET", "HEAD")
+            or not path.startswith(self.prefix)
+        ):
+            return self.application(environ, start_response)
+        name = path[len(self.prefix):]
+        try:
+            file_path = safe_join(self.root, name)
+        except SuspiciousFileOperation:
+            file_path = None
+        if file_path is None or not os.path.isfile(file_path):
+            return self.application(environ, start_response)
+        return self.serve(environ, start_response, name, file_path)
+
+    def headers(self, name, file_path):
+        content_type, _ = mimetypes.guess_type(name)
+        content_type = content_type or "application/octet-stream"
+        if content_type.startswith("text/"):
+            content_type += "; charset=utf-8"
+        max_age = (
+            HASHED_MAX_AGE if name in self.hashed_names
+            else settings.STATIC_MAX_AGE
+        )
+        cache_control = f"public, max-age={max_age}"
+        if max_age == HASHED_MAX_AGE:
+            cache_control += ", immutable"
+        headers = {
+            "Content-Type": content_type,
+            "Cache-Control": cache_control,
+            "Last-Modified": http_date(os.stat(file_path).st_mtime),
+        }
+        if compression.is_compressible(content_type):
+            headers["Vary"] = "Accept-Encoding"
+        return headers
+
+    def serve(self, environ, start_response, name, file_path):
+        headers = self.headers(name, file_path)
+        if not was_modified_since(
+            environ.get("HTTP_IF_MODIFIED_SINCE"),
+            os.stat(file_path).st_mtime,
+        ):
+            start_response("304 Not Modified", list(headers.items()))
+            return []
+        for encoding in compression.accepted_encodings(
+            environ.get("HTTP_ACCEPT_ENCODING", "")
+        ):
+            suffix = dict(compression.ENCODINGS)[encoding]
+            if "Vary" in headers and os.path.isfile(file_path + suffix):
+                file_path += suffix
+                headers["Content-Encoding"] = encoding
+                break
+        headers["Content-Length"] = str(os.path.getsize(file_path))
+        start_response("200 OK", list(headers.items()))
+        if environ["REQUEST_METHOD"] == "HEAD":
+            return []
+        file_wrapper = environ.get("wsgi.file_wrapper", FileWrapper)
+        return file_wrapper(open(file_path, "rb"))
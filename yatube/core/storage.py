@@ -0,0 +1,17 @@
+from django.core.files.storage import FileSystemStorage
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Хранилище для файлов, имя которых — хеш содержимого.
+    Файл с таким именем уже лежит в хранилище и совпадает с новым,
+    поэтому он не перезаписывается и не получает суффикс.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        return name
+
+    def _save(self, name, content):
+        if self.exists(name):
+            return name
+        return super()._save(name, content)
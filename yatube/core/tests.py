@@ -0,0 +1,668 @@
+import gzip
+import importlib
+import os
+import tempfile
+from datetime import timedelta
+from http import HTTPStatus
+from io import StringIO
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import DatabaseError, connection, connections
+from django.template import engines
+from django.test import (Client, RequestFactory, SimpleTestCase, TestCase,
+                         override_settings)
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from mixer.backend.django import mixer
+
+from about import urls as about_urls
+from core import (benchmark, compression, concurrency, db, jobs, routers,
+                  sessions, staticfiles, warmup)
+from core.instrumentation import view_stats
+from core.models import Job
+from posts import urls as posts_urls
+from posts.models import Post
+from users import urls as users_urls
+from yatube.settings.sessions import SESSION_ENGINES, get_session_engine
+
+User = get_user_model()
+CALLS = []
+
+
+@jobs.task
+def record_call(value, fail=False):
+    CALLS.append(value)
+    if fail:
+        raise ValueError(value)
+
+
+@jobs.task
+def create_post(text):
+    mixer.blend(Post, text=text)
+
+
+class BenchmarkTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_run_measures_every_route(self):
+        """Бенчмарк проходит все маршруты posts, users и about."""
+        author = benchmark.seed(users=3, groups=2, posts=30)
+        routes = benchmark.run(author, iterations=2)
+        self.assertIn("posts:index (deep)", routes)
+        for urls in (posts_urls, users_urls, about_urls):
+            for pattern in urls.urlpatterns:
+                with self.subTest(route=pattern.name):
+                    self.assertIn(f"{urls.app_name}:{pattern.name}", routes)
+        for name, result in routes.items():
+            with self.subTest(name=name):
+                self.assertLess(result["status"], 400)
+                self.assertLessEqual(result["p50_ms"], result["p99_ms"])
+        # Ленты замеряются без кеша: с запросами к БД
+        for name in (
+            "posts:index", "posts:group_list", "posts:api_profile",
+            "posts:index_feed",
+        ):
+            with self.subTest(name=name):
+                self.assertGreater(routes[name]["queries"], 0)
+
+    def test_compare_reports_query_regression(self):
+        """Рост числа запросов к БД считается регрессией."""
+        route = {"p50_ms": 1.0, "queries": 2}
+        baseline = {"routes": {"posts:index": route}}
+        current = {"routes": {"posts:index": dict(route, queries=3)}}
+        lines, regressions = benchmark.compare(baseline, current, 0.2)
+        self.assertEqual(regressions, ["posts:index"])
+
+
+class RequestStatsMiddlewareTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        view_stats.reset()
+
+    def test_server_timing_header(self):
+        """Ответ содержит заголовок Server-Timing с временем БД."""
+        response = self.client.get(reverse("posts:index"))
+        self.assertIn("app;dur=", response["Server-Timing"])
+        self.assertIn("db;dur=", response["Server-Timing"])
+        self.assertIn("cache;", response["Server-Timing"])
+
+    def test_stats_are_aggregated_per_view(self):
+        """Статистика копится по имени представления."""
+        self.client.get(reverse("posts:index"))
+        self.client.get(reverse("posts:index"))
+        self.client.get(reverse("about:tech"))
+        stats = view_stats.snapshot()
+        self.assertEqual(stats["posts:index"]["requests"], 2)
+        self.assertEqual(stats["posts:index"]["cache_hits"], 1)
+        self.assertEqual(stats["about:tech"]["requests"], 1)
+        self.assertGreater(stats["about:tech"]["template_ms"], 0)
+
+    def test_stats_endpoint_is_staff_only(self):
+        """Статистика доступна только персоналу."""
+        url = reverse("core:request_stats")
+        user = User.objects.create_user("user")
+        self.client.force_login(user)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
+        user.is_staff = True
+        user.save()
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertIn("core:request_stats", response.json()["views"])
+
+    @override_settings(SLOW_REQUEST_THRESHOLD_MS=0)
+    def test_slow_request_is_logged_with_sql(self):
+        """Медленный запрос пишется в журнал вместе с SQL."""
+        with self.assertLogs("yatube.slow_requests") as logs:
+            self.client.get(reverse("posts:index"))
+        self.assertIn("posts:index", logs.output[0])
+        self.assertIn("SELECT", logs.output[0])
+
+
+class JobQueueTests(TestCase):
+    def setUp(self):
+        CALLS.clear()
+
+    def test_enqueue_with_key_is_idempotent(self):
+        """Пока задача ждёт запуска, тот же ключ её не дублирует."""
+        record_call.enqueue(key="same", value=1)
+        record_call.enqueue(key="same", value=2)
+        self.assertEqual(Job.objects.count(), 1)
+        self.assertEqual(jobs.run_pending(), (1, 0))
+        self.assertEqual(CALLS, [1])
+        self.assertFalse(Job.objects.exists())
+        record_call.enqueue(key="same", value=3)
+        self.assertEqual(Job.objects.count(), 1)
+
+    @override_settings(JOBS_MAX_ATTEMPTS=2)
+    def test_key_is_kept_until_success(self):
+        """Ключ не дублирует задачу, ждущую повтора, и ставит упавшую."""
+        record_call.enqueue(key="same", value=1, fail=True)
+        jobs.run_pending()
+        record_call.enqueue(key="same", value=2, fail=True)
+        self.assertEqual(Job.objects.count(), 1)
+        Job.objects.update(run_at=timezone.now())
+        with self.assertLogs("yatube.jobs"):
+            jobs.run_pending()
+        self.assertEqual(Job.objects.get().status, Job.FAILED)
+        record_call.enqueue(key="same", value=3)
+        job = Job.objects.get()
+        self.assertEqual((job.status, job.attempts), (Job.PENDING, 0))
+        self.assertEqual(jobs.run_pending(), (1, 0))
+        self.assertEqual(CALLS, [1, 1, 3])
+        self.assertFalse(Job.objects.exists())
+
+    def test_enqueue_during_run_repeats_job(self):
+        """Задача, поставленная во время выполнения, выполнится ещё раз."""
+        record_call.enqueue(key="same", value=1)
+        job = Job.objects.get()
+        self.assertTrue(jobs.claim(job))
+        record_call.enqueue(key="same", value=2)
+        self.assertTrue(jobs.run_job(job))
+        self.assertEqual(Job.objects.get().status, Job.PENDING)
+        self.assertEqual(jobs.run_pending(), (1, 0))
+        self.assertEqual(CALLS, [1, 2])
+        self.assertFalse(Job.objects.exists())
+
+    @override_settings(JOBS_RETRY_DELAY=10, JOBS_MAX_ATTEMPTS=2)
+    def test_failed_job_is_retried_with_backoff(self):
+        """Упавшая задача повторяется позже, а после лимита — помечается."""
+        record_call.enqueue(value=1, fail=True)
+        started = timezone.now()
+        self.assertEqual(jobs.run_pending(), (0, 1))
+        job = Job.objects.get()
+        self.assertEqual(job.status, Job.PENDING)
+        self.assertGreaterEqual(job.run_at, started + timedelta(seconds=10))
+        self.assertIn("ValueError", job.last_error)
+        self.assertEqual(jobs.run_pending(), (0, 0))
+        Job.objects.update(run_at=timezone.now())
+        with self.assertLogs("yatube.jobs"):
+            jobs.run_pending()
+        job = Job.objects.get()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertEqual(job.attempts, 2)
+
+    def test_job_is_done_with_its_changes(self):
+        """Сбой при снятии задачи с очереди откатывает и её изменения."""
+        create_post.enqueue(text="Пост из задачи")
+        job = Job.objects.get()
+        self.assertTrue(jobs.claim(job))
+        with mock.patch.object(
+            jobs, "unchanged", side_effect=DatabaseError
+        ):
+            self.assertFalse(jobs.run_job(job))
+        self.assertFalse(Post.objects.exists())
+        self.assertEqual(Job.objects.get().status, Job.PENDING)
+        Job.objects.update(run_at=timezone.now())
+        jobs.run_pending()
+        self.assertEqual(Post.objects.count(), 1)
+        self.assertFalse(Job.objects.filter(name=job.name).exists())
+
+    @override_settings(JOBS_LOCK_TIMEOUT=0)
+    def test_abandoned_job_is_released(self):
+        """Задача упавшего обработчика возвращается в очередь."""
+        record_call.enqueue(value=1)
+        Job.objects.update(
+            status=Job.RUNNING,
+            locked_at=timezone.now() - timedelta(seconds=1),
+        )
+        self.assertEqual(jobs.run_pending(), (1, 0))
+
+    def test_run_jobs_command(self):
+        """run_jobs --once выполняет очередь и завершается."""
+        record_call.enqueue(value=1)
+        out = StringIO()
+        call_command("run_jobs", "--once", stdout=out)
+        self.assertEqual(CALLS, [1])
+        self.assertIn("Выполнено задач: 1", out.getvalue())
+
+    @override_settings(JOBS_EAGER=True)
+    def test_eager_mode_runs_immediately(self):
+        """При JOBS_EAGER задача выполняется без очереди."""
+        record_call.enqueue(value=1)
+        self.assertEqual(CALLS, [1])
+        self.assertFalse(Job.objects.exists())
+
+
+@override_settings(DATABASE_REPLICAS=["replica"])
+class ReplicaRouterTests(TestCase):
+    def setUp(self):
+        self.router = routers.ReplicaRouter()
+        self.request = RequestFactory().get("/")
+
+    def read_db(self, sticky=False, model=Post):
+        @routers.replica_reads
+        def view(request):
+            return self.router.db_for_read(model)
+
+        state, token = routers.start(sticky)
+        try:
+            return view(self.request), self.router.db_for_read(model)
+        finally:
+            routers.finish(token)
+
+    def test_feed_reads_go_to_replica(self):
+        """Внутри replica_reads чтения идут на реплику, вне — на основную."""
+        self.assertEqual(self.read_db(), ("replica", "default"))
+
+    def test_sessions_and_users_read_primary(self):
+        """Сессии и пользователи читаются с основной БД и в replica_reads."""
+        for model in (Session, User):
+            with self.subTest(model=model):
+                self.assertEqual(
+                    self.read_db(model=model), ("default", "default")
+                )
+
+    def test_primary_reads_inside_replica_view(self):
+        """primary_reads переключает чтения на основную БД внутри блока."""
+        @routers.replica_reads
+        def view(request):
+            with routers.primary_reads():
+                inside = self.router.db_for_read(Post)
+            return inside, self.router.db_for_read(Post)
+
+        state, token = routers.start(sticky=False)
+        try:
+            self.assertEqual(view(self.request), ("default", "replica"))
+        finally:
+            routers.finish(token)
+
+    def test_sticky_user_reads_primary(self):
+        """После записи пользователь читает с основной БД."""
+        self.assertEqual(self.read_db(sticky=True), ("default", "default"))
+
+    def test_writes_go_to_primary(self):
+        """Записи идут в основную БД и отмечаются в состоянии запроса."""
+        state, token = routers.start(sticky=False)
+        try:
+            self.assertEqual(self.router.db_for_write(Post), "default")
+        finally:
+            routers.finish(token)
+        self.assertTrue(state.wrote)
+
+    def test_write_sets_sticky_cookie(self):
+        """Запрос с записью в БД ставит cookie чтения с основной БД."""
+        cookie = settings.REPLICA_STICKY_COOKIE
+        response = self.client.get(reverse("posts:index"))
+        self.assertNotIn(cookie, response.cookies)
+        user = User.objects.create_user("writer")
+        self.client.force_login(user)
+        response = self.client.post(
+            reverse("posts:post_create"), data={"text": "Новый пост"}
+        )
+        self.assertIn(cookie, response.cookies)
+        request = RequestFactory().get("/")
+        request.COOKIES[cookie] = response.cookies[cookie].value
+        self.assertTrue(routers.is_sticky(request))
+
+
+@override_settings(DATABASE_REPLICAS=["replica"])
+class LaggingReplicaTests(TestCase):
+    """
+    Реплика — копия пустой тестовой БД, сделанная до входа
+    пользователя и до публикации постов.
+    """
+
+    databases = {"default", "replica"}
+
+    @classmethod
+    def setUpClass(cls):
+        connections.databases["replica"] = dict(
+            settings.DATABASES["default"], NAME=":memory:"
+        )
+        connections["default"].ensure_connection()
+        connections["replica"].ensure_connection()
+        connections["default"].connection.backup(
+            connections["replica"].connection
+        )
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections["replica"].close()
+        del connections["replica"]
+        del connections.databases["replica"]
+
+    def setUp(self):
+        cache.clear()
+
+    def test_login_survives_lagging_replica(self):
+        """Вошедший пользователь остаётся вошедшим на странице реплики."""
+        User.objects.create_user("reader", password="secret-password")
+        self.client.post(
+            reverse("users:login"),
+            {"username": "reader", "password": "secret-password"},
+        )
+        # Окно чтения с основной БД после записи закончилось
+        self.client.cookies.pop(settings.REPLICA_STICKY_COOKIE, None)
+        response = self.client.get(reverse("posts:index"))
+        self.assertTrue(response.context["user"].is_authenticated)
+        self.assertNotIn(settings.SESSION_COOKIE_NAME, response.cookies)
+
+    def test_feed_cache_is_filled_from_primary(self):
+        """Промах кеша ленты рендерится с основной БД."""
+        mixer.blend(Post, text="Пост после копии реплики")
+        response = self.client.get(reverse("posts:index"))
+        self.assertEqual(response["X-Feed-Cache"], "miss")
+        self.assertContains(response, "Пост после копии реплики")
+        response = self.client.get(reverse("posts:index"))
+        self.assertEqual(response["X-Feed-Cache"], "hit")
+        self.assertContains(response, "Пост после копии реплики")
+
+    def test_syndication_cache_is_filled_from_primary(self):
+        """Промах кеша RSS и Atom собирается с основной БД."""
+        group = mixer.blend("posts.Group")
+        mixer.blend(Post, text="Пост после копии реплики", group=group)
+        url = reverse("posts:group_feed", args=("rss", group.slug))
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertIn(
+            "Пост после копии реплики",
+            b"".join(response.streaming_content).decode(),
+        )
+        self.assertIn("Last-Modified", response)
+        response = self.client.get(url)
+        self.assertIn("Пост после копии реплики", response.content.decode())
+
+
+class SqlitePragmasTests(TestCase):
+    def pragma(self, name, value=None):
+        with connection.cursor() as cursor:
+            if value is not None:
+                cursor.execute(f"PRAGMA {name} = {value}")
+                return None
+            cursor.execute(f"PRAGMA {name}")
+            return cursor.fetchone()[0]
+
+    def test_pragmas_are_applied_to_connection(self):
+        """Прагмы SQLITE_PRAGMAS выполняются на соединении."""
+        cache_size = self.pragma("cache_size")
+        self.addCleanup(self.pragma, "cache_size", cache_size)
+        with override_settings(SQLITE_PRAGMAS={"cache_size": -4096}):
+            db.apply_pragmas(sender=None, connection=connection)
+        self.assertEqual(self.pragma("cache_size"), -4096)
+
+    def test_production_profile_tunes_sqlite(self):
+        """Боевой профиль включает WAL и постоянные соединения."""
+        profile = concurrency.get_profiles()["production"]
+        self.assertEqual(profile["pragmas"]["journal_mode"], "WAL")
+        self.assertGreater(profile["conn_max_age"], 0)
+        self.assertIn("timeout", profile["options"])
+
+
+class SettingsProfilesTests(SimpleTestCase):
+    def load_prod(self, **env):
+        with mock.patch.dict(os.environ, env):
+            if "YATUBE_SECRET_KEY" not in env:
+                os.environ.pop("YATUBE_SECRET_KEY", None)
+            return importlib.reload(
+                importlib.import_module("yatube.settings.prod")
+            )
+
+    def test_prod_profile(self):
+        """
+        Профиль prod без отладки, с кешем шаблонов и постоянными
+        соединениями; настройки текущего процесса не меняются.
+        """
+        prod = self.load_prod(
+            YATUBE_SECRET_KEY="secret",
+            YATUBE_ALLOWED_HOSTS="yatube.ru, www.yatube.ru",
+        )
+        self.assertFalse(prod.DEBUG)
+        self.assertEqual(prod.ALLOWED_HOSTS, ["yatube.ru", "www.yatube.ru"])
+        options = prod.TEMPLATES[0]["OPTIONS"]
+        self.assertEqual(
+            options["loaders"][0][0], "django.template.loaders.cached.Loader"
+        )
+        self.assertNotIn(
+            "django.template.context_processors.debug",
+            options["context_processors"],
+        )
+        self.assertGreater(prod.DATABASES["default"]["CONN_MAX_AGE"], 0)
+        self.assertEqual(settings.DATABASES["default"]["CONN_MAX_AGE"], 0)
+
+    def test_prod_requires_secret_key(self):
+        """Без YATUBE_SECRET_KEY профиль prod не загружается."""
+        with self.assertRaises(ImproperlyConfigured):
+            self.load_prod()
+
+
+class TemplateWarmupTests(SimpleTestCase):
+    def test_templates_are_compiled_into_cache(self):
+        """При запуске все шаблоны проекта попадают в cached.Loader."""
+        options = dict(
+            settings.TEMPLATES[0]["OPTIONS"],
+            loaders=[
+                (
+                    "django.template.loaders.cached.Loader",
+                    settings.TEMPLATE_LOADERS,
+                ),
+            ],
+        )
+        templates = [dict(settings.TEMPLATES[0], OPTIONS=options)]
+        with override_settings(TEMPLATES=templates):
+            self.assertGreater(warmup.warm_templates(), 20)
+            loader = engines.all()[0].engine.template_loaders[0]
+            self.assertIn("posts/index.html", loader.get_template_cache)
+            self.assertIn(
+                "posts/includes/paginator.html", loader.get_template_cache
+            )
+
+    def test_uncached_loaders_are_skipped(self):
+        """Без кеширующего загрузчика прогрев ничего не делает."""
+        self.assertEqual(warmup.warm_templates(), 0)
+
+
+@override_settings(
+    STATICFILES_STORAGE=(
+        "core.staticfiles.CompressedManifestStaticFilesStorage"
+    ),
+    STATICFILES_FINDERS=[
+        "django.contrib.staticfiles.finders.FileSystemFinder",
+    ],
+)
+class StaticFilesTests(SimpleTestCase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.root = tmp_dir.name
+        settings_override = override_settings(STATIC_ROOT=self.root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        call_command("collectstatic", interactive=False, verbosity=0)
+        self.css = staticfiles_storage.stored_name("css/bootstrap.min.css")
+
+    def get(self, path, **environ):
+        response = {}
+
+        def start_response(status, headers):
+            response["status"] = status
+            response["headers"] = dict(headers)
+
+        def application(environ, start_response):
+            start_response("404 Not Found", [])
+            return [b"django"]
+
+        app = staticfiles.StaticFilesApplication(application)
+        environ = dict(
+            {"REQUEST_METHOD": "GET", "PATH_INFO": path}, **environ
+        )
+        body = b"".join(app(environ, start_response))
+        return response["status"], response["headers"], body
+
+    def test_collectstatic_writes_compressed_copies(self):
+        """Текстовые файлы с хешем в имени получают сжатую копию."""
+        self.assertNotEqual(self.css, "css/bootstrap.min.css")
+        path = os.path.join(self.root, self.css)
+        with open(path, "rb") as original, open(path + ".gz", "rb") as gz:
+            self.assertEqual(gzip.decompress(gz.read()), original.read())
+        logo = staticfiles_storage.stored_name("img/logo.png")
+        self.assertFalse(os.path.exists(os.path.join(self.root, logo + ".gz")))
+
+    def test_hashed_files_are_served_compressed_and_cached(self):
+        """Файл с хешем отдаётся сжатым и кешируется на год."""
+        status, headers, body = self.get(
+            settings.STATIC_URL + self.css, HTTP_ACCEPT_ENCODING="gzip"
+        )
+        self.assertEqual(status, "200 OK")
+        self.assertEqual(headers["Content-Encoding"], "gzip")
+        self.assertEqual(headers["Vary"], "Accept-Encoding")
+        self.assertIn("immutable", headers["Cache-Control"])
+        self.assertIn(b"Bootstrap", gzip.decompress(body))
+
+    def test_refused_encodings_are_not_served(self):
+        """Сжатие с q=0 клиент отклонил: файл отдаётся как есть."""
+        status, headers, body = self.get(
+            settings.STATIC_URL + self.css,
+            HTTP_ACCEPT_ENCODING="gzip;q=0, br;q=0",
+        )
+        self.assertNotIn("Content-Encoding", headers)
+        self.assertIn(b"Bootstrap", body)
+
+    def test_plain_and_missing_files(self):
+        """Без хеша — короткое кеширование, остальное уходит в Django."""
+        status, headers, body = self.get(
+            settings.STATIC_URL + "css/bootstrap.min.css"
+        )
+        self.assertEqual(status, "200 OK")
+        self.assertNotIn("Content-Encoding", headers)
+        self.assertNotIn("immutable", headers["Cache-Control"])
+        for path in ("/static/missing.css", "/static/../manage.py", "/"):
+            with self.subTest(path=path):
+                self.assertEqual(self.get(path)[2], b"django")
+
+
+class CompressionMiddlewareTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        mixer.cycle(10).blend(Post, text="Длинный пост " * 50)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_html_is_gzipped(self):
+        """Страница длиннее порога отдаётся сжатой."""
+        response = self.client.get(
+            reverse("posts:index"), HTTP_ACCEPT_ENCODING="gzip"
+        )
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        content = gzip.decompress(response.content).decode()
+        self.assertIn("Длинный пост", content)
+
+    def test_short_responses_are_not_compressed(self):
+        """Короткие ответы и ответы без Accept-Encoding не сжимаются."""
+        with override_settings(COMPRESS_MIN_SIZE=10 ** 7):
+            response = self.client.get(
+                reverse("posts:index"), HTTP_ACCEPT_ENCODING="gzip"
+            )
+        self.assertFalse(response.has_header("Content-Encoding"))
+        response = self.client.get(reverse("posts:index"))
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+    def test_accept_encoding_weights(self):
+        """Сжатия с q=0 отклонены, остальные идут по убыванию веса."""
+        cases = (
+            ("gzip, br", ["br", "gzip"]),
+            ("gzip;q=0, br;q=0", []),
+            ("br;q=0.1, gzip", ["gzip", "br"]),
+            ("*;q=0, gzip", ["gzip"]),
+            ("*", ["br", "gzip"]),
+        )
+        for header, expected in cases:
+            with self.subTest(header=header):
+                self.assertEqual(
+                    compression.accepted_encodings(header), expected
+                )
+
+    def test_refused_gzip_is_not_used(self):
+        """gzip;q=0 — ответ не сжимается."""
+        response = self.client.get(
+            reverse("posts:index"), HTTP_ACCEPT_ENCODING="gzip;q=0, br;q=0"
+        )
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual(response["Vary"].count("Accept-Encoding"), 1)
+
+    @skipUnless(compression.brotli, "нужен пакет brotli")
+    def test_brotli_is_preferred(self):
+        """brotli выбирается, если браузер принимает оба сжатия."""
+        response = self.client.get(
+            reverse("posts:index"), HTTP_ACCEPT_ENCODING="gzip, br"
+        )
+        self.assertEqual(response["Content-Encoding"], "br")
+
+
+class SessionEnginesTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("reader")
+
+    def session_queries(self, engine):
+        """Запросы к django_session при повторном открытии ленты."""
+        client = Client()
+        with override_settings(SESSION_ENGINE=engine):
+            client.force_login(self.user)
+            client.get(reverse("posts:index"))
+            with CaptureQueriesContext(connection) as captured:
+                response = client.get(reverse("posts:index"))
+        self.assertTrue(response.context["user"].is_authenticated)
+        return [
+            query["sql"] for query in captured
+            if "django_session" in query["sql"]
+        ]
+
+    def test_db_sessions_read_table(self):
+        """Сессии в БД читаются на каждой странице."""
+        engine = SESSION_ENGINES["db"]
+        self.assertEqual(len(self.session_queries(engine)), 1)
+
+    def test_cached_and_cookie_sessions_skip_table(self):
+        """cached_db и signed_cookies не обращаются к django_session."""
+        for mode in ("cached_db", "signed_cookies"):
+            with self.subTest(mode=mode):
+                engine = SESSION_ENGINES[mode]
+                self.assertEqual(self.session_queries(engine), [])
+
+    def test_local_cache_timeout_is_capped(self):
+        """Сессия лежит в кеше процесса не дольше SESSION_CACHE_TIMEOUT."""
+        cache_backend = mock.Mock()
+        capped = sessions.CappedCache(cache_backend, 60)
+        capped.set("key", "value", 3600)
+        cache_backend.set.assert_called_once_with("key", "value", 60)
+        with override_settings(SESSION_CACHE_TIMEOUT=5):
+            self.assertEqual(sessions.SessionStore()._cache.timeout, 5)
+
+    def test_unknown_mode(self):
+        """Неизвестный режим YATUBE_SESSIONS — ошибка настроек."""
+        with self.assertRaises(ImproperlyConfigured):
+            get_session_engine("redis")
+
+    def test_purge_sessions(self):
+        """purge_sessions удаляет только истёкшие сессии."""
+        now = timezone.now()
+        for i in range(5):
+            Session.objects.create(
+                session_key=f"expired{i}",
+                session_data="",
+                expire_date=now - timedelta(days=1),
+            )
+        Session.objects.create(
+            session_key="active",
+            session_data="",
+            expire_date=now + timedelta(days=1),
+        )
+        out = StringIO()
+        call_command("purge_sessions", "--batch-size", "2", stdout=out)
+        self.assertIn("5", out.getvalue())
+        self.assertEqual(
+            list(Session.objects.values_list("pk", flat=True)), ["active"]
+        )
@@ -0,0 +1,15 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+
+from posts import caching
+
+from .instrumentation import view_stats
+
+
+@staff_member_required
+def request_stats(request):
+    """Статистика запросов по представлениям для мониторинга."""
+    return JsonResponse({
+        "views": view_stats.snapshot(),
+        "feed_cache": caching.get_stats(),
+    })
@@ -0,0 +1,66 @@
+import logging
+import os
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.template import TemplateSyntaxError, engines
+from django.template.backends.django import DjangoTemplates
+from django.template.loaders.cached import Loader as CachedLoader
+
+logger = logging.getLogger("yatube.warmup")
+
+TEMPLATE_EXTENSIONS = (".html", ".txt")
+
+
+def project_template_dirs(engine):
+    """Каталоги DIRS и templates приложений проекта, без сторонних."""
+    dirs = list(engine.dirs)
+    for app_config in apps.get_app_configs():
+        if app_config.path.startswith(settings.BASE_DIR):
+            dirs.append(os.path.join(app_config.path, "templates"))
+    return [directory for directory in dirs if os.path.isdir(directory)]
+
+
+def template_names(directory):
+    for root, _, files in os.walk(directory):
+        for filename in sorted(files):
+            if filename.endswith(TEMPLATE_EXTENSIONS):
+                path = os.path.relpath(os.path.join(root, filename), directory)
+                yield path.replace(os.sep, "/")
+
+
+def is_cached(engine):
+    return any(
+        isinstance(loader, CachedLoader)
+        for loader in engine.engine.template_loaders
+    )
+
+
+def warm_templates():
+    """
+    Компилирует все шаблоны проекта в кеш cached.Loader, чтобы первый
+    запрос после запуска обработчика не разбирал их с диска.
+    Без кеширующего загрузчика ничего не делает.
+    Возвращает число скомпилированных шаблонов.
+    """
+    started = time.perf_counter()
+    count = 0
+    for engine in engines.all():
+        if not isinstance(engine, DjangoTemplates) or not is_cached(engine):
+            continue
+        for directory in project_template_dirs(engine):
+            for name in template_names(directory):
+                try:
+                    engine.get_template(name)
+                except TemplateSyntaxError:
+                    logger.exception("Шаблон %s не компилируется", name)
+                    continue
+                count += 1
+    if count:
+        logger.info(
+            "Скомпилировано шаблонов: %d за %.1f мс",
+            count,
+            (time.perf_counter() - started) * 1000,
+        )
+    return count
@@ -1,6 +1,9 @@
 from django.contrib import admin
 
-from .models import Group, Post
+from .models import (
+    AuthorStats, Group, Post, PostDay, PostMonth, PostPartition
+)
+from .search import has_fts, matching_ids
 
 
 class PostAdmin(admin.ModelAdmin):
@@ -17,6 +20,14 @@ class PostAdmin(admin.ModelAdmin):
     empty_value_display = "-пусто-"
     list_editable = ("group",)
 
+    def get_search_results(self, request, queryset, search_term):
+        # Поиск по тексту через индекс FTS5 вместо LIKE '%term%'
+        if not search_term or not has_fts():
+            return super().get_search_results(
+                request, queryset, search_term
+            )
+        return queryset.filter(pk__in=matching_ids(search_term)), False
+
 
 class GroupAdmin(admin.ModelAdmin):
     list_display = (
@@ -30,5 +41,58 @@ class GroupAdmin(admin.ModelAdmin):
     empty_value_display = "-пусто-"
 
 
+class AuthorStatsAdmin(admin.ModelAdmin):
+    list_display = (
+        "author",
+        "post_count",
+        "follower_count",
+    )
+
+    search_fields = ("author__username",)
+    readonly_fields = ("post_count", "follower_count")
+
+
+class PostMonthAdmin(admin.ModelAdmin):
+    list_display = (
+        "month",
+        "post_count",
+    )
+
+    readonly_fields = ("post_count",)
+
+
+class PostDayAdmin(admin.ModelAdmin):
+    list_display = (
+        "day",
+        "group",
+        "author",
+        "post_count",
+    )
+
+    list_filter = ("day",)
+    readonly_fields = ("post_count",)
+
+
+class PostPartitionAdmin(admin.ModelAdmin):
+    list_display = (
+        "month",
+        "first_id",
+        "last_id",
+    )
+
+    readonly_fields = ("month", "first_id", "last_id")
+
+    # Разделы создаёт и заполняет команда rollover_posts
+    def has_add_permission(self, request):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
 admin.site.register(Post, PostAdmin)
 admin.site.register(Group, GroupAdmin)
+admin.site.register(AuthorStats, AuthorStatsAdmin)
+admin.site.register(PostMonth, PostMonthAdmin)
+admin.site.register(PostDay, PostDayAdmin)
+admin.site.register(PostPartition, PostPartitionAdmin)
@@ -0,0 +1,205 @@
+"""
+JSON API лент только для чтения. Посты выбираются через values() с
+фиксированным набором полей, без моделей и шаблонов.
+"""
+import functools
+from http import HTTPStatus
+
+from django.conf import settings
+from django.http import JsonResponse
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition, require_safe
+
+from core.routers import replica_reads
+
+from . import caching, conditional
+from .models import Group, Post, User
+from .partitions import PartitionedPaginator, find_archived
+
+# Поле ответа -> поле values()
+FIELDS = {
+    "id": "pk",
+    "text": "text",
+    "pub_date": "pub_date",
+    "modified": "modified",
+    "author": "author__username",
+    "group": "group__slug",
+    "image": "image",
+    "image_srcset": "image_srcset",
+}
+# Нужны для курсоров, даже если не запрошены
+CURSOR_FIELDS = ("pk", "pub_date")
+# Параметры запроса лент, кроме page и cursor
+FEED_PARAMS = ("fields",)
+
+JSON_PARAMS = {"ensure_ascii": False, "separators": (",", ":")}
+
+# API листает только по курсору, ?page= в ключ кеша не входит
+cache_feed = functools.partial(
+    caching.cache_feed, prefix="api", params=FEED_PARAMS, paged=False
+)
+
+
+def get_fields(request):
+    """
+    Поля ответа из ?fields=id,text,author, по умолчанию — все.
+    None, если запрошено неизвестное поле.
+    """
+    value = request.GET.get("fields")
+    if not value:
+        return list(FIELDS)
+    fields = [field.strip() for field in value.split(",") if field.strip()]
+    if not fields or set(fields) - FIELDS.keys():
+        return None
+    return list(dict.fromkeys(fields))
+
+
+def lookups(fields):
+    return {FIELDS[field] for field in fields} | set(CURSOR_FIELDS)
+
+
+def serialize(row, fields):
+    data = {field: row[FIELDS[field]] for field in fields}
+    if "image" in data:
+        name = data["image"]
+        storage = Post._meta.get_field("image").storage
+        data["image"] = storage.url(name) if name else None
+    return data
+
+
+def api_response(data, status=HTTPStatus.OK):
+    return JsonResponse(data, status=status, json_dumps_params=JSON_PARAMS)
+
+
+def cache_headers(view):
+    """
+    Ответ не зависит от пользователя, поэтому анонимам он кешируется
+    и прокси; вошедшие пользователи перепроверяют его по ETag, чтобы
+    сразу видеть свои записи.
+    """
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        response = view(request, *args, **kwargs)
+        if response.status_code not in (
+            HTTPStatus.OK, HTTPStatus.NOT_MODIFIED
+        ):
+            return response
+        if request.user.is_authenticated:
+            patch_cache_control(response, private=True, no_cache=True)
+        else:
+            patch_cache_control(
+                response, public=True, max_age=settings.API_CACHE_MAX_AGE
+            )
+        return response
+    return wrapper
+
+
+def error_response(status, detail):
+    return api_response({"detail": detail}, status)
+
+
+def fields_error():
+    return error_response(
+        HTTPStatus.BAD_REQUEST,
+        "Неизвестное поле. Доступны: " + ", ".join(FIELDS),
+    )
+
+
+def feed_response(request, **filters):
+    """
+    Страница ленты постов с условиями filters по курсору ?cursor=...
+    (без курсора — первая) из горячей таблицы и архивных разделов.
+    """
+    fields = get_fields(request)
+    if fields is None:
+        return fields_error()
+    values = lookups(fields)
+    paginator = PartitionedPaginator(
+        Post.objects.filter(**filters).values(*values),
+        settings.POST_COUNT,
+        scope=filters,
+        shape=lambda queryset: queryset.values(*values),
+    )
+    page = paginator.get_cursor_page(request.GET.get("cursor"))
+    return api_response({
+        "results": [serialize(row, fields) for row in page],
+        "next_cursor": page.next_cursor,
+        "previous_cursor": page.previous_cursor,
+    })
+
+
+def api_condition(etag_func, last_modified_func=None, **etag_kwargs):
+    """
+    Условные GET-запросы с валидаторами HTML-страниц, но со своим
+    ETag: в него входит набор полей ответа. API не знает ?page=,
+    и для такого запроса валидатор HTML-страницы не подходит.
+    etag_kwargs передаются в etag_func.
+    """
+    def etag(request, *args, **kwargs):
+        if "page" in request.GET:
+            return None
+        tag = etag_func(request, *args, **kwargs, **etag_kwargs)
+        if tag is None:
+            return None
+        return conditional.make_etag(
+            request, "api", tag, request.GET.get("fields")
+        )
+    return condition(etag_func=etag, last_modified_func=last_modified_func)
+
+
+@replica_reads
+@require_safe
+@cache_headers
+@api_condition(conditional.index_etag, params=FEED_PARAMS)
+@cache_feed(caching.index_scope)
+def index(request):
+    return feed_response(request)
+
+
+@replica_reads
+@require_safe
+@cache_headers
+@api_condition(conditional.group_etag, params=FEED_PARAMS)
+@cache_feed(caching.group_scope)
+def group_posts(request, slug):
+    group_id = Group.objects.filter(slug=slug).values_list(
+        "pk", flat=True
+    ).first()
+    if group_id is None:
+        return error_response(HTTPStatus.NOT_FOUND, "Нет группы")
+    return feed_response(request, group_id=group_id)
+
+
+@replica_reads
+@require_safe
+@cache_headers
+@api_condition(conditional.profile_etag, params=FEED_PARAMS)
+@cache_feed(caching.profile_scope)
+def profile(request, username):
+    author_id = User.objects.filter(username=username).values_list(
+        "pk", flat=True
+    ).first()
+    if author_id is None:
+        return error_response(HTTPStatus.NOT_FOUND, "Нет пользователя")
+    return feed_response(request, author_id=author_id)
+
+
+@replica_reads
+@require_safe
+@cache_headers
+@api_condition(
+    conditional.post_detail_etag, conditional.post_detail_last_modified
+)
+def post_detail(request, post_id):
+    fields = get_fields(request)
+    if fields is None:
+        return fields_error()
+    values = lookups(fields)
+    row = Post.objects.filter(pk=post_id).values(*values).first()
+    if row is None:
+        row = find_archived(
+            post_id, lambda queryset: queryset.values(*values)
+        )
+    if row is None:
+        return error_response(HTTPStatus.NOT_FOUND, "Нет поста")
+    return api_response(serialize(row, fields))
@@ -0,0 +1,166 @@
+"""
+Архив постов по годам, месяцам и дням для общей ленты, групп и
+авторов. Навигация строится по таблице PostDay, посты периода
+листаются как обычная лента по горячей таблице и архивным разделам
+этого периода.
+"""
+import datetime
+import functools
+
+from django.db.models import Sum
+from django.db.models.functions import ExtractDay, ExtractMonth, ExtractYear
+from django.http import Http404
+from django.shortcuts import get_object_or_404, render
+from django.urls import reverse
+from django.utils.formats import date_format
+
+from core.routers import replica_reads
+
+from .feeds import author_name
+from .models import Group, Post, PostDay, User
+from .paginators import get_page_obj
+from .partitions import as_datetime, next_month, partitioned
+
+
+def get_period(year, month=None, day=None):
+    """Даты [начало, конец) периода. Http404 для несуществующей даты."""
+    try:
+        start = datetime.date(year, month or 1, day or 1)
+        if day is not None:
+            end = start + datetime.timedelta(days=1)
+        elif month is not None:
+            end = next_month(start)
+        else:
+            end = start.replace(year=year + 1)
+    except (ValueError, OverflowError):
+        raise Http404("Нет такой даты")
+    return start, end
+
+
+def period_url(name, *args):
+    """Функция, которая строит ссылку на период архива name."""
+    def url(*parts):
+        return reverse(name, args=args + parts)
+    return url
+
+
+def level(days, part, selected, label, url):
+    """
+    Уровень навигации: годы, месяцы или дни с числом постов в каждом.
+    part — выражение, которое выделяет из PostDay.day год, месяц
+    или день.
+    """
+    rows = (
+        days.order_by()
+        .annotate(value=part)
+        .values_list("value")
+        .annotate(count=Sum("post_count"))
+        .order_by("value")
+    )
+    return [
+        {
+            "label": label(value),
+            "count": count,
+            "url": url(value),
+            "active": value == selected,
+        }
+        for value, count in rows
+    ]
+
+
+def archive_context(
+    request, days, post_list, lookups, url, year=None, month=None, day=None
+):
+    """
+    Навигация архива и страница постов периода. days — строки PostDay
+    области, post_list и lookups — посты области и их условия для
+    архивных разделов, url(*parts) — ссылка на период. Без года —
+    только годы.
+    """
+    days = days.filter(post_count__gt=0)
+    navigation = [level(days, ExtractYear("day"), year, str, url)]
+    if year is None:
+        return {"navigation": navigation}
+    start, end = get_period(year, month, day)
+    year_start, year_end = get_period(year)
+    navigation.append(level(
+        days.filter(day__gte=year_start, day__lt=year_end),
+        ExtractMonth("day"),
+        month,
+        lambda value: date_format(datetime.date(year, value, 1), "F"),
+        functools.partial(url, year),
+    ))
+    if month is not None:
+        month_start, month_end = get_period(year, month)
+        navigation.append(level(
+            days.filter(day__gte=month_start, day__lt=month_end),
+            ExtractDay("day"),
+            day,
+            str,
+            functools.partial(url, year, month),
+        ))
+    if day is not None:
+        period, selected = date_format(start, "j E Y"), navigation[2]
+    elif month is not None:
+        period, selected = date_format(start, "F Y"), navigation[1]
+    else:
+        period, selected = str(year), navigation[0]
+    if not any(item["count"] for item in selected if item["active"]):
+        raise Http404("Нет записей за этот период")
+    post_list = post_list.filter(
+        pub_date__gte=as_datetime(start), pub_date__lt=as_datetime(end)
+    )
+    return {
+        "navigation": navigation,
+        "period": period,
+        "page_obj": get_page_obj(
+            request,
+            post_list,
+            partitioned(period=(start, end), **lookups),
+        ),
+    }
+
+
+@replica_reads
+def index_archive(request, year=None, month=None, day=None):
+    context = archive_context(
+        request,
+        PostDay.objects.filter(group=None, author=None),
+        Post.objects.feed(),
+        {},
+        period_url("posts:index_archive"),
+        year, month, day,
+    )
+    context["title"] = "Архив записей"
+    return render(request, "posts/archive.html", context)
+
+
+@replica_reads
+def group_archive(request, slug, year=None, month=None, day=None):
+    group = get_object_or_404(Group, slug=slug)
+    context = archive_context(
+        request,
+        group.days.filter(author=None),
+        group.posts.feed(),
+        {"group": group},
+        period_url("posts:group_archive", slug),
+        year, month, day,
+    )
+    context["title"] = f"Архив сообщества {group.title}"
+    return render(request, "posts/archive.html", context)
+
+
+@replica_reads
+def profile_archive(request, username, year=None, month=None, day=None):
+    author = get_object_or_404(User, username=username)
+    context = archive_context(
+        request,
+        author.days.filter(group=None),
+        author.posts.feed(),
+        {"author": author},
+        period_url("posts:profile_archive", username),
+        year, month, day,
+    )
+    name = author_name(author.first_name, author.last_name, username)
+    context["title"] = f"Архив записей {name}"
+    return render(request, "posts/archive.html", context)
@@ -0,0 +1,161 @@
+import functools
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+
+from core.instrumentation import record_cache
+from core.routers import primary_reads
+
+from .paginators import decode_cursor
+
+HITS_KEY = "feed_cache:hits"
+MISSES_KEY = "feed_cache:misses"
+
+
+def get_cache():
+    return caches[settings.FEED_CACHE_ALIAS]
+
+
+def _version_key(scope):
+    return f"feed_version:{scope}"
+
+
+def get_version(scope):
+    """
+    Текущая версия области кеша. Если версия вытеснена из кеша,
+    создаётся новая, и старые страницы становятся недоступны.
+    """
+    cache = get_cache()
+    version = cache.get(_version_key(scope))
+    if version is None:
+        cache.add(_version_key(scope), uuid.uuid4().hex, None)
+        version = cache.get(_version_key(scope))
+    return version
+
+
+def invalidate(*scopes):
+    """Сбрасывает закешированные страницы указанных областей."""
+    get_cache().set_many(
+        {_version_key(scope): uuid.uuid4().hex for scope in scopes}, None
+    )
+
+
+def index_scope():
+    return "index"
+
+
+def group_scope(slug):
+    return f"group:{slug}"
+
+
+def profile_scope(username):
+    return f"profile:{username}"
+
+
+def _count(key):
+    cache = get_cache()
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, None)
+        cache.incr(key)
+
+
+def get_stats():
+    """Счётчики попаданий и промахов кеша лент."""
+    values = get_cache().get_many((HITS_KEY, MISSES_KEY))
+    return {
+        "hits": values.get(HITS_KEY, 0),
+        "misses": values.get(MISSES_KEY, 0),
+    }
+
+
+def page_key(request, params=(), paged=True):
+    """
+    Ключ страницы внутри области или None, если страница не кешируется.
+    Кешируются первая страница, страницы по номеру и по курсору.
+    params — другие допустимые параметры запроса, в ключ они не входят.
+    Без paged номер страницы не читается и в ключ не входит.
+    """
+    if request.GET.keys() - {"page", "cursor", *params}:
+        return None
+    page = request.GET.get("page") if paged else None
+    cursor = request.GET.get("cursor")
+    if page is not None:
+        if cursor is None and page.isdigit():
+            return f"page={int(page)}"
+        return None
+    if cursor is not None:
+        if decode_cursor(cursor) is not None:
+            return f"cursor={cursor}"
+        return None
+    return "first"
+
+
+def is_cached_page(scope, key):
+    """
+    Сбрасывается ли страница при изменении постов области.
+    Для index это только первые FEED_CACHE_INDEX_PAGES страниц.
+    """
+    if key is None:
+        return False
+    if scope != index_scope() or key == "first":
+        return True
+    if not key.startswith("page="):
+        return False
+    return int(key[len("page="):]) <= settings.FEED_CACHE_INDEX_PAGES
+
+
+def cache_feed(get_scope, prefix="feed", params=(), paged=True):
+    """
+    Кеширует страницы ленты для анонимных пользователей. Промах
+    рендерится с основной БД, а не с реплики.
+    get_scope получает аргументы представления и возвращает область
+    кеша: при изменении постов сбрасываются только затронутые области.
+    prefix отделяет разные представления одной ленты, params —
+    параметры запроса, от которых зависит ответ, кроме page и cursor.
+    paged=False — для представлений, которые листают только по
+    курсору: ?page= не порождает отдельных копий страницы в кеше.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            scope = get_scope(*args, **kwargs)
+            key = page_key(request, params, paged)
+            if (
+                request.method != "GET"
+                or request.user.is_authenticated
+                or not is_cached_page(scope, key)
+            ):
+                return view(request, *args, **kwargs)
+            cache = get_cache()
+            cache_key = f"{prefix}:{scope}:{get_version(scope)}:{key}"
+            if params:
+                values = repr([request.GET.get(name) for name in params])
+                cache_key += ":" + hashlib.md5(values.encode()).hexdigest()
+            cached = cache.get(cache_key)
+            record_cache(hit=cached is not None)
+            if cached is not None:
+                _count(HITS_KEY)
+                content_type, content = cached
+                response = HttpResponse(content, content_type=content_type)
+                response["X-Feed-Cache"] = "hit"
+                return response
+            _count(MISSES_KEY)
+            # Страница живёт в кеше до следующей смены версии области:
+            # с отставшей реплики в неё попали бы старые посты
+            with primary_reads():
+                response = view(request, *args, **kwargs)
+            if response.status_code == 200:
+                cache.set(
+                    cache_key,
+                    (response["Content-Type"], response.content),
+                    settings.FEED_CACHE_TIMEOUT,
+                )
+            response["X-Feed-Cache"] = "miss"
+            return response
+        return wrapper
+    return decorator
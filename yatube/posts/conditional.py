@@ -0,0 +1,94 @@
+import hashlib
+
+from django.views.decorators.http import condition
+
+from . import caching
+from .models import Post
+from .paginators import get_page_keys
+from .partitions import find_archived, partitioned
+
+
+def make_etag(request, *parts):
+    """
+    ETag из частей страницы. Шапка сайта зависит от пользователя,
+    поэтому в тег входит его id.
+    """
+    data = repr((request.user.pk,) + parts).encode()
+    return hashlib.md5(data).hexdigest()
+
+
+def feed_etag(request, scope, lookups, params=()):
+    """
+    Для страниц, которые сбрасывает кеш лент, ETag строится из версии
+    области кеша без запросов к БД. Для остальных страниц — из
+    (id, modified) постов страницы узкими запросами к горячей таблице
+    и архивным разделам. lookups — условия ленты, params — как
+    в caching.page_key().
+    """
+    key = caching.page_key(request, params)
+    if caching.is_cached_page(scope, key):
+        return make_etag(request, scope, caching.get_version(scope), key)
+    return make_etag(
+        request,
+        scope,
+        get_page_keys(
+            request, Post.objects.filter(**lookups), partitioned(**lookups)
+        ),
+    )
+
+
+def index_etag(request, params=()):
+    return feed_etag(request, caching.index_scope(), {}, params)
+
+
+def group_etag(request, slug, params=()):
+    return feed_etag(
+        request, caching.group_scope(slug), {"group__slug": slug}, params
+    )
+
+
+def profile_etag(request, username, params=()):
+    return feed_etag(
+        request,
+        caching.profile_scope(username),
+        {"author__username": username},
+        params,
+    )
+
+
+def validator_values(queryset):
+    return queryset.values_list("modified", "author__stats__post_count")
+
+
+def get_post_validators(request, post_id):
+    # Оба валидатора считаются одним запросом, для поста из архива —
+    # ещё запросами к каталогу разделов и к разделу
+    if not hasattr(request, "_post_validators"):
+        request._post_validators = (
+            validator_values(Post.objects.filter(pk=post_id)).first()
+            or find_archived(post_id, validator_values)
+        )
+    return request._post_validators
+
+
+def post_detail_etag(request, post_id):
+    validators = get_post_validators(request, post_id)
+    if validators is None:
+        return None
+    return make_etag(request, post_id, *validators)
+
+
+def post_detail_last_modified(request, post_id):
+    validators = get_post_validators(request, post_id)
+    if validators is None:
+        return None
+    return validators[0]
+
+
+index_condition = condition(etag_func=index_etag)
+group_condition = condition(etag_func=group_etag)
+profile_condition = condition(etag_func=profile_etag)
+post_detail_condition = condition(
+    etag_func=post_detail_etag,
+    last_modified_func=post_detail_last_modified,
+)
@@ -0,0 +1,249 @@
+"""
+RSS и Atom для главной ленты, групп и авторов. Посты читаются одним
+узким запросом values(), XML отдаётся по частям, готовая лента
+кешируется в области кеша лент (posts.caching) и сбрасывается вместе
+с ней.
+"""
+import hashlib
+import io
+
+from django.conf import settings
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.feedgenerator import Atom1Feed, Rss201rev2Feed
+from django.utils.http import http_date, quote_etag
+from django.utils.text import Truncator
+from django.utils.xmlutils import SimplerXMLGenerator
+from django.views.decorators.http import require_safe
+
+from core.routers import primary_reads, replica_reads
+
+from . import caching
+from .models import Group, Post, User
+from .partitions import PartitionedPaginator
+
+FORMATS = {
+    "rss": Rss201rev2Feed,
+    "atom": Atom1Feed,
+}
+
+ITEM_FIELDS = (
+    "pk",
+    "text",
+    "pub_date",
+    "modified",
+    "author__username",
+    "author__first_name",
+    "author__last_name",
+    "group__title",
+)
+
+
+def get_feed_class(feed_format):
+    try:
+        return FORMATS[feed_format]
+    except KeyError:
+        raise Http404("Неизвестный формат ленты")
+
+
+def author_name(first_name, last_name, username):
+    return f"{first_name} {last_name}".strip() or username
+
+
+def make_item(request, row):
+    link = request.build_absolute_uri(
+        reverse("posts:post_detail", args=(row["pk"],))
+    )
+    return {
+        "title": Truncator(row["text"]).words(8),
+        "link": link,
+        "description": row["text"],
+        "author_name": author_name(
+            row["author__first_name"],
+            row["author__last_name"],
+            row["author__username"],
+        ),
+        "pubdate": row["pub_date"],
+        "updateddate": row["modified"],
+        "unique_id": link,
+        "categories": [row["group__title"]] if row["group__title"] else (),
+    }
+
+
+def stream(feed):
+    """
+    Пишет ленту по частям: заголовок, каждую запись, окончание.
+    Повторяет feed.write(), но клиент получает начало ленты, не
+    дожидаясь, пока она будет собрана целиком.
+    """
+    buffer = io.StringIO()
+    handler = SimplerXMLGenerator(buffer, "utf-8", short_empty_elements=True)
+
+    def drain():
+        chunk = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return chunk.encode()
+
+    handler.startDocument()
+    if isinstance(feed, Atom1Feed):
+        handler.startElement("feed", feed.root_attributes())
+        closing = ("feed",)
+        item_element = "entry"
+    else:
+        handler.startElement("rss", feed.rss_attributes())
+        handler.startElement("channel", feed.root_attributes())
+        closing = ("channel", "rss")
+        item_element = "item"
+    feed.add_root_elements(handler)
+    yield drain()
+    for item in feed.items:
+        handler.startElement(item_element, feed.item_attributes(item))
+        feed.add_item_elements(handler, item)
+        handler.endElement(item_element)
+        yield drain()
+    for element in closing:
+        handler.endElement(element)
+    yield drain()
+
+
+def cache_chunks(chunks, cache_key, last_modified):
+    """Отдаёт части ленты и кеширует её, когда она отдана целиком."""
+    content = []
+    for chunk in chunks:
+        content.append(chunk)
+        yield chunk
+    caching.get_cache().set(
+        cache_key,
+        (last_modified, b"".join(content)),
+        settings.FEED_CACHE_TIMEOUT,
+    )
+
+
+def latest_rows(lookups):
+    """
+    Последние SYNDICATION_ITEMS постов с условиями lookups из горячей
+    таблицы и, если её не хватает, из архивных разделов.
+    """
+    paginator = PartitionedPaginator(
+        Post.objects.filter(**lookups).values(*ITEM_FIELDS),
+        settings.SYNDICATION_ITEMS,
+        scope=lookups,
+        shape=lambda queryset: queryset.values(*ITEM_FIELDS),
+    )
+    return paginator.cursor_rows(None)[:settings.SYNDICATION_ITEMS]
+
+
+def feed_response(request, feed_format, scope, get_feed, lookups):
+    """
+    Лента в формате feed_format. ETag строится из версии области кеша
+    без запросов к БД. Last-Modified — самое позднее изменение постов
+    ленты. get_feed() возвращает (title, link, description),
+    lookups — условия постов ленты.
+    """
+    feed_class = get_feed_class(feed_format)
+    cache_key = (
+        f"syndication:{scope}:{caching.get_version(scope)}:"
+        f"{feed_format}:{request.get_host()}"
+    )
+    etag = quote_etag(hashlib.md5(cache_key.encode()).hexdigest())
+    cached = caching.get_cache().get(cache_key)
+    if cached is not None:
+        last_modified, content = cached
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = HttpResponse(
+                content, content_type=feed_class.content_type
+            )
+    else:
+        # Лента живёт в кеше до следующей смены версии области: с
+        # отставшей реплики в неё попали бы старые посты
+        with primary_reads():
+            title, link, description = get_feed()
+            rows = latest_rows(lookups)
+            last_modified = max(
+                (int(row["modified"].timestamp()) for row in rows),
+                default=None,
+            )
+            response = get_conditional_response(
+                request, etag=etag, last_modified=last_modified
+            )
+            if response is None:
+                feed = feed_class(
+                    title=title,
+                    link=request.build_absolute_uri(link),
+                    description=description,
+                    feed_url=request.build_absolute_uri(),
+                    language=settings.LANGUAGE_CODE,
+                )
+                for row in rows:
+                    feed.add_item(**make_item(request, row))
+                response = StreamingHttpResponse(
+                    cache_chunks(stream(feed), cache_key, last_modified),
+                    content_type=feed_class.content_type,
+                )
+    response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified)
+    return response
+
+
+@replica_reads
+@require_safe
+def index_feed(request, feed_format):
+    return feed_response(
+        request,
+        feed_format,
+        caching.index_scope(),
+        lambda: (
+            "Yatube: последние записи",
+            reverse("posts:index"),
+            "Последние обновления на сайте",
+        ),
+        {},
+    )
+
+
+@replica_reads
+@require_safe
+def group_feed(request, feed_format, slug):
+    def get_feed():
+        group = get_object_or_404(Group, slug=slug)
+        return (
+            f"Yatube: {group.title}",
+            reverse("posts:group_list", args=(slug,)),
+            group.description,
+        )
+
+    return feed_response(
+        request,
+        feed_format,
+        caching.group_scope(slug),
+        get_feed,
+        {"group__slug": slug},
+    )
+
+
+@replica_reads
+@require_safe
+def profile_feed(request, feed_format, username):
+    def get_feed():
+        author = get_object_or_404(User, username=username)
+        name = author_name(author.first_name, author.last_name, username)
+        return (
+            f"Yatube: {name}",
+            reverse("posts:profile", args=(username,)),
+            f"Записи пользователя {name}",
+        )
+
+    return feed_response(
+        request,
+        feed_format,
+        caching.profile_scope(username),
+        get_feed,
+        {"author__username": username},
+    )
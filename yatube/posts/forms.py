@@ -7,12 +7,14 @@ class PostForm(forms.ModelForm):
 
     class Meta:
         model = Post
-        fields = ("text", "group")
+        fields = ("text", "group", "image")
         help_texts = {
             "text": "Текст нового поста",
             "group": "Группа, к которой будет относиться пост",
+            "image": "Картинка к посту",
         }
         labels = {
             "text": "Текст поста",
             "group": "Группа",
+            "image": "Картинка",
         }
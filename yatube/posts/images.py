@@ -0,0 +1,32 @@
+import hashlib
+import os
+
+from django.conf import settings
+from sorl.thumbnail import get_thumbnail
+
+
+def post_image_path(instance, filename):
+    """
+    posts/<ab>/<sha256>.<ext>: имя меняется вместе с содержимым,
+    поэтому картинку и её превью можно кешировать навсегда.
+    """
+    digest = hashlib.sha256()
+    for chunk in instance.image.chunks():
+        digest.update(chunk)
+    digest = digest.hexdigest()
+    extension = os.path.splitext(filename)[1].lower()
+    return f"posts/{digest[:2]}/{digest}{extension}"
+
+
+def make_srcset(image):
+    """
+    Создаёт превью шириной POST_IMAGE_WIDTHS (не шире оригинала)
+    и возвращает значение атрибута srcset.
+    """
+    candidates = {}
+    for width in settings.POST_IMAGE_WIDTHS:
+        thumbnail = get_thumbnail(image, str(width), upscale=False)
+        candidates.setdefault(thumbnail.width, thumbnail.url)
+    return ", ".join(
+        f"{url} {width}w" for width, url in sorted(candidates.items())
+    )
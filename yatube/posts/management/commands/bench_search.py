@@ -0,0 +1,74 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts.models import Post, User
+from posts.search import matching_ids
+
+WORDS = (
+    "погода", "город", "новости", "кино", "музыка", "спорт", "книга",
+    "путешествие", "работа", "кофе", "поезд", "море", "лес", "праздник",
+    "программа", "сервер", "база", "запрос", "индекс", "страница",
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнивает поиск по индексу FTS5 с LIKE '%term%'. "
+        "Запускайте на отдельной базе: --seed добавляет посты."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--seed", type=int, default=0,
+            help="Сколько постов создать перед замером (например, 1000000).",
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=5,
+            help="Сколько раз повторить каждый запрос.",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=10000,
+        )
+
+    def seed(self, total, batch_size):
+        author, _ = User.objects.get_or_create(username="bench_search")
+        rng = random.Random(0)
+        for start in range(0, total, batch_size):
+            size = min(batch_size, total - start)
+            with transaction.atomic():
+                Post.objects.bulk_create(
+                    Post(
+                        author=author,
+                        text=" ".join(rng.choices(WORDS, k=30)),
+                    )
+                    for _ in range(size)
+                )
+            self.stdout.write(f"Создано постов: {start + size}")
+
+    def measure(self, queryset, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            list(queryset.values_list("pk", flat=True)[:10])
+            queryset.count()
+            timings.append(time.perf_counter() - started)
+        return min(timings) * 1000
+
+    def handle(self, *args, **options):
+        if options["seed"]:
+            self.seed(options["seed"], options["batch_size"])
+        total = Post.objects.count()
+        self.stdout.write(f"Постов в базе: {total}")
+        for term in ("погода", "серв", "кофе поезд"):
+            like = Post.objects.all()
+            for word in term.split():
+                like = like.filter(text__icontains=word)
+            fts = Post.objects.filter(pk__in=matching_ids(term))
+            like_ms = self.measure(like, options["repeat"])
+            fts_ms = self.measure(fts, options["repeat"])
+            self.stdout.write(
+                f"{term!r}: LIKE {like_ms:.1f} мс, FTS5 {fts_ms:.1f} мс"
+            )
@@ -0,0 +1,93 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from posts.models import Group, Post, User, month_of
+from posts.paginators import NEXT, keyset
+from posts.partitions import PartitionedPaginator, locate
+
+
+class Command(BaseCommand):
+    help = (
+        "Выводит EXPLAIN QUERY PLAN для запросов лент из posts.views "
+        "к горячей таблице и к самому новому архивному разделу."
+    )
+
+    @staticmethod
+    def is_slow(plan):
+        """Запрос сортирует во временном дереве или читает всю таблицу."""
+        for line in plan.splitlines():
+            if "TEMP B-TREE" in line:
+                return True
+            if "SCAN" in line and "posts_post" in line and "INDEX" not in line:
+                return True
+        return False
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Завершиться с ошибкой, если запрос сортирует или "
+                 "просматривает всю таблицу постов.",
+        )
+
+    def feed_queries(self):
+        group = Group.objects.first() or Group(pk=1)
+        author = User.objects.first() or User(pk=1)
+        feeds = {
+            "index": (Post.objects.feed(), {}),
+            "group_posts": (group.posts.feed(), {"group": group}),
+            "profile": (author.posts.feed(), {"author": author}),
+        }
+        now = timezone.now()
+        for name, (post_list, scope) in feeds.items():
+            paginator = PartitionedPaginator(
+                post_list, settings.POST_COUNT, scope=scope
+            )
+            yield f"{name}: первая страница", paginator.cursor_queryset(None)
+            yield (
+                f"{name}: страница по курсору",
+                paginator.cursor_queryset(NEXT, now, 1),
+            )
+            # Вторая страница начинается в месяце, который находит
+            # locate() по счётчикам, и читается с его верхней границы
+            month, offset = locate(
+                paginator.months, settings.POST_COUNT
+            ) or (month_of(now), 0)
+            yield (
+                f"{name}: страница по номеру",
+                paginator.month_queryset(month)[
+                    offset:offset + settings.POST_COUNT
+                ],
+            )
+            yield from self.partition_queries(name, paginator, now)
+        yield "post_detail", Post.objects.feed().filter(pk=1)
+
+    @staticmethod
+    def partition_queries(name, paginator, now):
+        """Запросы к самому новому архивному разделу ленты."""
+        for month in paginator.partitions[:1]:
+            archive = paginator.archive_queryset(month)
+            yield (
+                f"{name}: раздел {month:%Y-%m} по курсору",
+                keyset(archive, NEXT, now, 1)[:settings.POST_COUNT + 1],
+            )
+            yield (
+                f"{name}: раздел {month:%Y-%m} по номеру",
+                archive.order_by("-pub_date", "-pk")[
+                    settings.POST_COUNT:settings.POST_COUNT * 2
+                ],
+            )
+
+    def handle(self, *args, **options):
+        slow = []
+        for name, queryset in self.feed_queries():
+            plan = queryset.explain()
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.stdout.write(plan)
+            if self.is_slow(plan):
+                slow.append(name)
+        if options["check"] and slow:
+            raise CommandError(
+                "Запросы без подходящего индекса: " + ", ".join(slow)
+            )
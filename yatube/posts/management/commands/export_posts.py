@@ -0,0 +1,37 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts.transfer import FORMATS, export_rows, guess_format, write_rows
+
+
+class Command(BaseCommand):
+    help = "Выгружает посты в JSON Lines или CSV потоком."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path", nargs="?", default="-",
+            help="Файл для записи, '-' — стандартный вывод.",
+        )
+        parser.add_argument("--format", choices=FORMATS)
+        parser.add_argument(
+            "--chunk-size", type=int, default=2000,
+            help="Сколько строк читать из БД за раз.",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = options["format"] or guess_format(path)
+        rows = export_rows(options["chunk_size"])
+        started = time.perf_counter()
+        if path == "-":
+            count = write_rows(sys.stdout, fmt, rows)
+        else:
+            with open(path, "w", encoding="utf-8", newline="") as stream:
+                count = write_rows(stream, fmt, rows)
+        elapsed = time.perf_counter() - started
+        self.stderr.write(
+            f"Выгружено постов: {count} "
+            f"({count / max(elapsed, 1e-6):.0f} строк/с)"
+        )
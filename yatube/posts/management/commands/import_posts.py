@@ -0,0 +1,51 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts.transfer import FORMATS, guess_format, import_rows, read_rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Загружает посты из JSON Lines или CSV пачками bulk_create. "
+        "Авторы и группы ищутся по username и slug."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path", nargs="?", default="-",
+            help="Файл для чтения, '-' — стандартный ввод.",
+        )
+        parser.add_argument("--format", choices=FORMATS)
+        parser.add_argument(
+            "--batch-size", type=int, default=2000,
+            help="Строк в одной пачке и одной транзакции.",
+        )
+
+    def run(self, stream, fmt, batch_size):
+        def on_error(number, error):
+            self.stderr.write(f"Строка {number} пропущена: {error}")
+
+        created = skipped = 0
+        started = time.perf_counter()
+        for batch_created, batch_skipped in import_rows(
+            read_rows(stream, fmt, on_error), batch_size
+        ):
+            created += batch_created
+            skipped += batch_skipped
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"Создано: {created}, пропущено: {skipped} "
+                f"({created / max(elapsed, 1e-6):.0f} строк/с)"
+            )
+        return created, skipped
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = options["format"] or guess_format(path)
+        if path == "-":
+            self.run(sys.stdin, fmt, options["batch_size"])
+            return
+        with open(path, encoding="utf-8", newline="") as stream:
+            self.run(stream, fmt, options["batch_size"])
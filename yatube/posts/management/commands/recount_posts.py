@@ -0,0 +1,73 @@
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+
+from posts.models import (
+    AuthorStats, GroupStats, PostDay, PostMonth, User, post_models
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Пересчитывает счётчики постов и подписчиков авторов "
+        "(AuthorStats), статистику групп (GroupStats), разделы "
+        "ленты по месяцам (PostMonth) и календарь архива (PostDay)."
+    )
+
+    def handle(self, *args, **options):
+        # Посты авторов и в горячей таблице, и в архивных разделах
+        counts = Counter()
+        for model in post_models():
+            counts.update(dict(
+                model.objects.order_by()
+                .values_list("author")
+                .annotate(count=Count("pk"))
+            ))
+        fixed = 0
+        with transaction.atomic():
+            stats = {
+                item.author_id: item
+                for item in AuthorStats.objects.select_for_update()
+            }
+            for author_id in User.objects.values_list(
+                "pk", flat=True
+            ).iterator():
+                count = counts[author_id]
+                item = stats.get(author_id)
+                if item is None:
+                    if count:
+                        AuthorStats.objects.create(
+                            author_id=author_id, post_count=count
+                        )
+                        fixed += 1
+                elif item.post_count != count:
+                    item.post_count = count
+                    item.save(update_fields=("post_count",))
+                    fixed += 1
+        followers = dict(
+            User.objects.order_by()
+            .annotate(count=Count("following"))
+            .filter(count__gt=0)
+            .values_list("pk", "count")
+        )
+        with transaction.atomic():
+            for item in AuthorStats.objects.select_for_update():
+                count = followers.pop(item.author_id, 0)
+                if item.follower_count != count:
+                    item.follower_count = count
+                    item.save(update_fields=("follower_count",))
+                    fixed += 1
+            for author_id, count in followers.items():
+                AuthorStats.objects.create(
+                    author_id=author_id, follower_count=count
+                )
+                fixed += 1
+        self.stdout.write(f"Исправлено счётчиков: {fixed}")
+        GroupStats.rebuild()
+        self.stdout.write("Статистика групп пересчитана")
+        PostMonth.rebuild()
+        self.stdout.write("Разделы ленты по месяцам пересчитаны")
+        PostDay.rebuild()
+        self.stdout.write("Календарь архива пересчитан")
@@ -0,0 +1,40 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from posts.models import month_of
+from posts.partitions import roll_over
+
+
+def months_before(month, count):
+    """Первое число месяца, который на count месяцев раньше month."""
+    index = month.year * 12 + month.month - 1 - count
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+class Command(BaseCommand):
+    help = (
+        "Переносит посты старше последних --keep-months месяцев из "
+        "горячей таблицы posts_post в архивные разделы по месяцам. "
+        "Запускайте периодически, например раз в месяц из cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--keep-months", type=int, default=settings.POST_HOT_MONTHS,
+            help="Сколько месяцев, включая текущий, оставить в горячей "
+                 "таблице.",
+        )
+
+    def handle(self, *args, **options):
+        keep = options["keep_months"]
+        if keep < 1:
+            raise CommandError("--keep-months должно быть не меньше 1")
+        before = months_before(month_of(timezone.now()), keep - 1)
+        moved = roll_over(before)
+        for month, count in moved.items():
+            self.stdout.write(f"{month:%Y-%m}: перенесено постов {count}")
+        self.stdout.write(
+            f"Обновлено разделов: {len(moved)}, "
+            f"перенесено постов: {sum(moved.values())}"
+        )
@@ -0,0 +1,88 @@
+# Generated by Django 2.2.6 on 2026-10-18 18:34
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max
+import django.db.models.deletion
+
+
+def fill_group_stats(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    GroupStats = apps.get_model('posts', 'GroupStats')
+    GroupAuthorStats = apps.get_model('posts', 'GroupAuthorStats')
+    grouped = Post.objects.filter(group__isnull=False).order_by()
+    per_author = list(
+        grouped.values('group', 'author', 'author__username')
+        .annotate(count=Count('id'))
+        .order_by('group', '-count', 'author__username')
+    )
+    GroupAuthorStats.objects.bulk_create(
+        GroupAuthorStats(
+            group_id=row['group'],
+            author_id=row['author'],
+            post_count=row['count'],
+        )
+        for row in per_author
+    )
+    top_authors = {}
+    for row in per_author:
+        names = top_authors.setdefault(row['group'], [])
+        if len(names) < 3:
+            names.append(row['author__username'])
+    GroupStats.objects.bulk_create(
+        GroupStats(
+            group_id=row['group'],
+            post_count=row['count'],
+            latest_pub_date=row['latest'],
+            top_authors=','.join(top_authors.get(row['group'], [])),
+        )
+        for row in grouped.values('group').annotate(
+            count=Count('id'), latest=Max('pub_date')
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0009_post_fts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GroupStats',
+            fields=[
+                ('group', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='posts.Group', verbose_name='Группа')),
+                ('post_count', models.PositiveIntegerField(default=0, verbose_name='Число постов')),
+                ('latest_pub_date', models.DateTimeField(blank=True, null=True, verbose_name='Дата последнего поста')),
+                ('top_authors', models.CharField(blank=True, max_length=500, verbose_name='Самые активные авторы')),
+            ],
+            options={
+                'verbose_name': 'Статистика группы',
+                'verbose_name_plural': 'Статистика групп',
+            },
+        ),
+        migrations.CreateModel(
+            name='GroupAuthorStats',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('post_count', models.PositiveIntegerField(default=0, verbose_name='Число постов')),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='group_stats', to=settings.AUTH_USER_MODEL, verbose_name='Автор')),
+                ('group', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='author_stats', to='posts.Group', verbose_name='Группа')),
+            ],
+            options={
+                'verbose_name': 'Статистика автора в группе',
+                'verbose_name_plural': 'Статистика авторов в группах',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='groupauthorstats',
+            index=models.Index(fields=['group', '-post_count'], name='group_author_count_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='groupauthorstats',
+            unique_together={('group', 'author')},
+        ),
+        migrations.RunPython(fill_group_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 2.2.6 on 2026-10-18 19:04
+
+from importlib import import_module
+
+import core.storage
+from django.db import migrations, models
+import posts.images
+
+fts = import_module('posts.migrations.0009_post_fts')
+
+# AddField в SQLite пересоздаёт таблицу posts_post, и триггеры
+# полнотекстового индекса пропадают: их нужно создать заново
+TRIGGERS_SQL = fts.CREATE_SQL[1:4]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0011_follow_timeline'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            migrations.RunPython.noop, fts.run_on_sqlite(TRIGGERS_SQL)
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='image',
+            field=models.ImageField(blank=True, help_text='Загрузите картинку', storage=core.storage.ContentAddressedStorage(), upload_to=posts.images.post_image_path, verbose_name='Картинка'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='image_srcset',
+            field=models.TextField(blank=True, editable=False, verbose_name='Превью картинки'),
+        ),
+        migrations.RunPython(
+            fts.run_on_sqlite(TRIGGERS_SQL), migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 2.2.6 on 2026-10-18 21:05
+
+import datetime
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncMonth
+
+
+def fill_post_months(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    PostMonth = apps.get_model('posts', 'PostMonth')
+    months = Post.objects.order_by().annotate(
+        month=TruncMonth('pub_date', tzinfo=datetime.timezone.utc)
+    ).values('month').annotate(count=Count('id'))
+    PostMonth.objects.bulk_create(
+        PostMonth(month=row['month'].date(), post_count=row['count'])
+        for row in months
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0012_post_image'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostMonth',
+            fields=[
+                ('month', models.DateField(primary_key=True, serialize=False, verbose_name='Месяц')),
+                ('post_count', models.PositiveIntegerField(default=0, verbose_name='Число постов')),
+            ],
+            options={
+                'verbose_name': 'Посты за месяц',
+                'verbose_name_plural': 'Посты по месяцам',
+            },
+        ),
+        migrations.RunPython(fill_post_months, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 2.2.6 on 2026-10-18 19:31
+
+import datetime
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDay
+import django.db.models.deletion
+
+
+def fill_post_days(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    PostDay = apps.get_model('posts', 'PostDay')
+    posts = Post.objects.order_by().annotate(
+        day=TruncDay('pub_date', tzinfo=datetime.timezone.utc)
+    )
+    scopes = (
+        posts.values('day'),
+        posts.filter(group__isnull=False).values('day', 'group'),
+        posts.values('day', 'author'),
+    )
+    for rows in scopes:
+        PostDay.objects.bulk_create(
+            PostDay(
+                day=row['day'].date(),
+                group_id=row.get('group'),
+                author_id=row.get('author'),
+                post_count=row['count'],
+            )
+            for row in rows.annotate(count=Count('id'))
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0013_postmonth'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostDay',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='День')),
+                ('post_count', models.PositiveIntegerField(default=0, verbose_name='Число постов')),
+                ('author', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='days', to=settings.AUTH_USER_MODEL, verbose_name='Автор')),
+                ('group', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='days', to='posts.Group', verbose_name='Группа')),
+            ],
+            options={
+                'verbose_name': 'Посты за день',
+                'verbose_name_plural': 'Посты по дням',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='postday',
+            index=models.Index(fields=['group', 'author', 'day'], name='post_day_scope_idx'),
+        ),
+        migrations.RunPython(fill_post_days, migrations.RunPython.noop),
+    ]
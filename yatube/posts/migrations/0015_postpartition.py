@@ -0,0 +1,49 @@
+from django.db import migrations, models
+
+CREATE_SQL = (
+    """
+    CREATE VIRTUAL TABLE posts_post_archive_fts USING fts5(
+        text, prefix='2 3'
+    )
+    """,
+)
+
+DROP_SQL = (
+    "DROP TABLE IF EXISTS posts_post_archive_fts",
+)
+
+
+def run_on_sqlite(statements):
+    # Индекс текста постов архивных разделов: у них нет триггеров,
+    # строки добавляет и удаляет posts.partitions
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for sql in statements:
+            schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0014_postday'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostPartition',
+            fields=[
+                ('month', models.DateField(primary_key=True, serialize=False, verbose_name='Месяц')),
+                ('first_id', models.PositiveIntegerField(default=0, verbose_name='Первый id')),
+                ('last_id', models.PositiveIntegerField(default=0, verbose_name='Последний id')),
+            ],
+            options={
+                'verbose_name': 'Архивный раздел',
+                'verbose_name_plural': 'Архивные разделы',
+            },
+        ),
+        migrations.RunPython(
+            run_on_sqlite(CREATE_SQL), run_on_sqlite(DROP_SQL)
+        ),
+    ]
@@ -1,5 +1,14 @@
+from collections import Counter
+
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, F, Max, Q
+from django.db.models.functions import TruncDay, TruncMonth
+from django.utils import timezone
+
+from core.storage import ContentAddressedStorage
+
+from .images import post_image_path
 
 User = get_user_model()
 
@@ -13,6 +22,28 @@ class Group(models.Model):
         return self.title
 
 
+class PostQuerySet(models.QuerySet):
+    # Поля, которые выводят шаблоны лент и post_header.html
+    FEED_FIELDS = (
+        "text",
+        "pub_date",
+        "modified",
+        "author",
+        "author__username",
+        "author__first_name",
+        "author__last_name",
+        "group",
+        "group__slug",
+        "group__title",
+        "image",
+        "image_srcset",
+    )
+
+    def feed(self):
+        """Посты для ленты: автор и группа одним запросом, без лишних полей."""
+        return self.select_related("author", "group").only(*self.FEED_FIELDS)
+
+
 class Post(models.Model):
     text = models.TextField(
         "Текст поста",
@@ -22,6 +53,10 @@ class Post(models.Model):
         "Дата публикации",
         auto_now_add=True
     )
+    modified = models.DateTimeField(
+        "Дата изменения",
+        auto_now=True
+    )
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -38,9 +73,605 @@ class Post(models.Model):
         verbose_name="Группа",
         help_text="Выберите группу"
     )
+    image = models.ImageField(
+        "Картинка",
+        upload_to=post_image_path,
+        storage=ContentAddressedStorage(),
+        blank=True,
+        help_text="Загрузите картинку"
+    )
+    # Превью картинки для атрибута srcset, их создаёт фоновая задача
+    image_srcset = models.TextField(
+        "Превью картинки",
+        blank=True,
+        editable=False
+    )
+
+    objects = PostQuerySet.as_manager()
 
     def __str__(self):
         return self.text[:15]
 
+    @property
+    def image_preview_url(self):
+        """Самое маленькое превью: src для браузеров без srcset."""
+        return self.image_srcset.split(" ", 1)[0]
+
+    def save(self, *args, **kwargs):
+        # Счётчики из сигналов обновляются в одной транзакции с постом
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
     class Meta:
         ordering = ("-pub_date",)
+        indexes = (
+            models.Index(
+                fields=("author", "-pub_date", "-id"),
+                name="post_author_pub_date_idx",
+            ),
+            models.Index(
+                fields=("group", "-pub_date", "-id"),
+                name="post_group_pub_date_idx",
+            ),
+            models.Index(
+                fields=("-pub_date", "-id"),
+                name="post_pub_date_id_idx",
+            ),
+        )
+
+
+class AuthorStats(models.Model):
+    author = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="stats",
+        verbose_name="Автор"
+    )
+    post_count = models.PositiveIntegerField(
+        "Число постов",
+        default=0
+    )
+    follower_count = models.PositiveIntegerField(
+        "Число подписчиков",
+        default=0
+    )
+
+    def __str__(self):
+        return f"{self.author_id}: {self.post_count}"
+
+    @classmethod
+    def increment(cls, author_id, count=1):
+        updated = cls.objects.filter(author_id=author_id).update(
+            post_count=F("post_count") + count
+        )
+        if not updated:
+            stats, created = cls.objects.get_or_create(
+                author_id=author_id, defaults={"post_count": count}
+            )
+            if not created:
+                cls.increment(author_id, count)
+
+    @classmethod
+    def decrement(cls, author_id):
+        cls.objects.filter(author_id=author_id, post_count__gt=0).update(
+            post_count=F("post_count") - 1
+        )
+
+    @classmethod
+    def add_follower(cls, author_id):
+        updated = cls.objects.filter(author_id=author_id).update(
+            follower_count=F("follower_count") + 1
+        )
+        if not updated:
+            stats, created = cls.objects.get_or_create(
+                author_id=author_id, defaults={"follower_count": 1}
+            )
+            if not created:
+                cls.add_follower(author_id)
+
+    @classmethod
+    def remove_follower(cls, author_id):
+        cls.objects.filter(author_id=author_id, follower_count__gt=0).update(
+            follower_count=F("follower_count") - 1
+        )
+
+    @classmethod
+    def post_count_for(cls, author):
+        """Число постов автора без COUNT(*) по таблице постов."""
+        try:
+            return author.stats.post_count
+        except cls.DoesNotExist:
+            return 0
+
+    class Meta:
+        verbose_name = "Статистика автора"
+        verbose_name_plural = "Статистика авторов"
+
+
+class GroupAuthorStats(models.Model):
+    group = models.ForeignKey(
+        Group,
+        on_delete=models.CASCADE,
+        related_name="author_stats",
+        verbose_name="Группа"
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="group_stats",
+        verbose_name="Автор"
+    )
+    post_count = models.PositiveIntegerField(
+        "Число постов",
+        default=0
+    )
+
+    def __str__(self):
+        return f"{self.group_id}/{self.author_id}: {self.post_count}"
+
+    class Meta:
+        verbose_name = "Статистика автора в группе"
+        verbose_name_plural = "Статистика авторов в группах"
+        unique_together = ("group", "author")
+        indexes = (
+            models.Index(
+                fields=("group", "-post_count"),
+                name="group_author_count_idx",
+            ),
+        )
+
+
+class GroupStats(models.Model):
+    TOP_AUTHORS = 3
+
+    group = models.OneToOneField(
+        Group,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="stats",
+        verbose_name="Группа"
+    )
+    post_count = models.PositiveIntegerField(
+        "Число постов",
+        default=0
+    )
+    latest_pub_date = models.DateTimeField(
+        "Дата последнего поста",
+        blank=True,
+        null=True
+    )
+    # Имена самых активных авторов через запятую: в username запятой нет
+    top_authors = models.CharField(
+        "Самые активные авторы",
+        max_length=500,
+        blank=True
+    )
+
+    def __str__(self):
+        return f"{self.group_id}: {self.post_count}"
+
+    @property
+    def top_author_names(self):
+        return self.top_authors.split(",") if self.top_authors else []
+
+    @classmethod
+    def add_posts(cls, group_id, author_id, count, latest_pub_date):
+        """Учитывает count новых постов автора в группе."""
+        cls.objects.get_or_create(group_id=group_id)
+        cls.objects.filter(group_id=group_id).update(
+            post_count=F("post_count") + count
+        )
+        cls.objects.filter(
+            Q(latest_pub_date__lt=latest_pub_date)
+            | Q(latest_pub_date__isnull=True),
+            group_id=group_id,
+        ).update(latest_pub_date=latest_pub_date)
+        author_stats, created = GroupAuthorStats.objects.get_or_create(
+            group_id=group_id, author_id=author_id,
+            defaults={"post_count": count},
+        )
+        if not created:
+            GroupAuthorStats.objects.filter(pk=author_stats.pk).update(
+                post_count=F("post_count") + count
+            )
+        cls.refresh_top_authors(group_id)
+
+    @classmethod
+    def remove_post(cls, group_id, author_id):
+        """Учитывает удаление поста из группы (сам пост уже не в ней)."""
+        latest = max(
+            (
+                date
+                for model in post_models()
+                for date in model.objects.filter(group_id=group_id)
+                .aggregate(latest=Max("pub_date")).values()
+                if date is not None
+            ),
+            default=None,
+        )
+        cls.objects.filter(group_id=group_id, post_count__gt=0).update(
+            post_count=F("post_count") - 1
+        )
+        cls.objects.filter(group_id=group_id).update(latest_pub_date=latest)
+        GroupAuthorStats.objects.filter(
+            group_id=group_id, author_id=author_id, post_count__gt=0
+        ).update(post_count=F("post_count") - 1)
+        cls.refresh_top_authors(group_id)
+
+    @classmethod
+    def refresh_top_authors(cls, group_id):
+        names = GroupAuthorStats.objects.filter(
+            group_id=group_id, post_count__gt=0
+        ).order_by("-post_count", "author__username").values_list(
+            "author__username", flat=True
+        )[:cls.TOP_AUTHORS]
+        cls.objects.filter(group_id=group_id).update(
+            top_authors=",".join(names)
+        )
+
+    @classmethod
+    def rebuild(cls):
+        """
+        Пересчитывает статистику всех групп по горячей таблице
+        и архивным разделам.
+        """
+        author_counts = Counter()
+        counts = Counter()
+        latest = {}
+        for model in post_models():
+            grouped = model.objects.filter(group__isnull=False).order_by()
+            for row in grouped.values("group", "author").annotate(
+                count=Count("pk"), latest=Max("pub_date")
+            ):
+                author_counts[row["group"], row["author"]] += row["count"]
+                counts[row["group"]] += row["count"]
+                latest[row["group"]] = max(
+                    latest.get(row["group"], row["latest"]), row["latest"]
+                )
+        with transaction.atomic():
+            GroupAuthorStats.objects.all().delete()
+            cls.objects.all().delete()
+            GroupAuthorStats.objects.bulk_create(
+                GroupAuthorStats(
+                    group_id=group_id, author_id=author_id, post_count=count
+                )
+                for (group_id, author_id), count in author_counts.items()
+            )
+            cls.objects.bulk_create(
+                cls(
+                    group_id=group_id,
+                    post_count=count,
+                    latest_pub_date=latest[group_id],
+                )
+                for group_id, count in counts.items()
+            )
+            for group_id in cls.objects.values_list("pk", flat=True):
+                cls.refresh_top_authors(group_id)
+
+    class Meta:
+        verbose_name = "Статистика группы"
+        verbose_name_plural = "Статистика групп"
+
+
+def day_of(pub_date):
+    """День публикации по UTC: ключ PostDay."""
+    return pub_date.astimezone(timezone.utc).date()
+
+
+def month_of(pub_date):
+    """Первое число месяца публикации по UTC: ключ раздела PostMonth."""
+    return day_of(pub_date).replace(day=1)
+
+
+class PostMonth(models.Model):
+    """
+    Раздел ленты за месяц: число постов, опубликованных в нём.
+    По разделам posts.partitions находит месяц, в котором начинается
+    страница ленты, и считает посты без COUNT(*).
+    """
+
+    month = models.DateField("Месяц", primary_key=True)
+    post_count = models.PositiveIntegerField(
+        "Число постов",
+        default=0
+    )
+
+    def __str__(self):
+        return f"{self.month:%Y-%m}: {self.post_count}"
+
+    @classmethod
+    def increment(cls, month, count=1):
+        updated = cls.objects.filter(month=month).update(
+            post_count=F("post_count") + count
+        )
+        if not updated:
+            stats, created = cls.objects.get_or_create(
+                month=month, defaults={"post_count": count}
+            )
+            if not created:
+                cls.increment(month, count)
+
+    @classmethod
+    def decrement(cls, month):
+        cls.objects.filter(month=month, post_count__gt=0).update(
+            post_count=F("post_count") - 1
+        )
+
+    @classmethod
+    def rebuild(cls):
+        """Пересчитывает разделы по горячей таблице и архивным разделам."""
+        counts = Counter()
+        for model in post_models():
+            months = model.objects.order_by().annotate(
+                month=TruncMonth("pub_date", tzinfo=timezone.utc)
+            ).values("month").annotate(count=Count("pk"))
+            for row in months:
+                counts[month_of(row["month"])] += row["count"]
+        with transaction.atomic():
+            cls.objects.all().delete()
+            cls.objects.bulk_create(
+                cls(month=month, post_count=count)
+                for month, count in counts.items()
+            )
+
+    class Meta:
+        verbose_name = "Посты за месяц"
+        verbose_name_plural = "Посты по месяцам"
+
+
+class PostDay(models.Model):
+    """
+    Число постов за день в общей ленте (группа и автор не указаны),
+    в ленте группы или в ленте автора. По этой таблице строится
+    навигация архива по датам без GROUP BY по всем постам.
+    """
+
+    day = models.DateField("День")
+    group = models.ForeignKey(
+        Group,
+        on_delete=models.CASCADE,
+        blank=True,
+        null=True,
+        related_name="days",
+        verbose_name="Группа"
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        blank=True,
+        null=True,
+        related_name="days",
+        verbose_name="Автор"
+    )
+    post_count = models.PositiveIntegerField(
+        "Число постов",
+        default=0
+    )
+
+    def __str__(self):
+        scope = f"{self.group_id}/{self.author_id}"
+        return f"{self.day} {scope}: {self.post_count}"
+
+    @staticmethod
+    def scopes(group_id, author_id):
+        """(group_id, author_id) строк, в которых учитывается пост."""
+        scopes = [(None, None), (None, author_id)]
+        if group_id is not None:
+            scopes.append((group_id, None))
+        return scopes
+
+    @classmethod
+    def increment(cls, day, group_id=None, author_id=None, count=1):
+        updated = cls.objects.filter(
+            day=day, group_id=group_id, author_id=author_id
+        ).update(post_count=F("post_count") + count)
+        if not updated:
+            stats, created = cls.objects.get_or_create(
+                day=day, group_id=group_id, author_id=author_id,
+                defaults={"post_count": count},
+            )
+            if not created:
+                cls.increment(day, group_id, author_id, count)
+
+    @classmethod
+    def decrement(cls, day, group_id=None, author_id=None):
+        cls.objects.filter(
+            day=day, group_id=group_id, author_id=author_id,
+            post_count__gt=0,
+        ).update(post_count=F("post_count") - 1)
+
+    @classmethod
+    def add_post(cls, pub_date, group_id, author_id):
+        for scope in cls.scopes(group_id, author_id):
+            cls.increment(day_of(pub_date), *scope)
+
+    @classmethod
+    def remove_post(cls, pub_date, group_id, author_id):
+        for scope in cls.scopes(group_id, author_id):
+            cls.decrement(day_of(pub_date), *scope)
+
+    @classmethod
+    def rebuild(cls):
+        """
+        Пересчитывает число постов по дням по горячей таблице
+        и архивным разделам.
+        """
+        counts = Counter()
+        for model in post_models():
+            posts = model.objects.order_by().annotate(
+                day=TruncDay("pub_date", tzinfo=timezone.utc)
+            )
+            scopes = (
+                posts.values("day"),
+                posts.filter(group__isnull=False).values("day", "group"),
+                posts.values("day", "author"),
+            )
+            for rows in scopes:
+                for row in rows.annotate(count=Count("pk")):
+                    day = row["day"].date()
+                    key = (day, row.get("group"), row.get("author"))
+                    counts[key] += row["count"]
+        with transaction.atomic():
+            cls.objects.all().delete()
+            cls.objects.bulk_create(
+                cls(day=day, group_id=group_id, author_id=author_id,
+                    post_count=count)
+                for (day, group_id, author_id), count in counts.items()
+            )
+
+    class Meta:
+        verbose_name = "Посты за день"
+        verbose_name_plural = "Посты по дням"
+        indexes = (
+            models.Index(
+                fields=("group", "author", "day"),
+                name="post_day_scope_idx",
+            ),
+        )
+
+
+class Follow(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="follower",
+        verbose_name="Подписчик"
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="following",
+        verbose_name="Автор"
+    )
+
+    def __str__(self):
+        return f"{self.user_id} -> {self.author_id}"
+
+    class Meta:
+        verbose_name = "Подписка"
+        verbose_name_plural = "Подписки"
+        unique_together = ("user", "author")
+
+
+class TimelineEntry(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="timeline",
+        verbose_name="Читатель"
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name="timeline_entries",
+        verbose_name="Пост"
+    )
+    # Копия Post.pub_date: лента читается одним диапазоном по индексу
+    pub_date = models.DateTimeField("Дата публикации")
+
+    def __str__(self):
+        return f"{self.user_id}: {self.post_id}"
+
+    class Meta:
+        verbose_name = "Запись ленты подписок"
+        verbose_name_plural = "Записи ленты подписок"
+        unique_together = ("user", "post")
+        indexes = (
+            models.Index(
+                fields=("user", "-pub_date", "-post"),
+                name="timeline_user_pub_date_idx",
+            ),
+        )
+
+
+class PostPartition(models.Model):
+    """
+    Архивный раздел: таблица с постами за месяц, которые команда
+    rollover_posts перенесла из горячей таблицы posts_post.
+    first_id и last_id — границы id постов раздела: по ним пост
+    находится по id без просмотра всех разделов.
+    """
+
+    month = models.DateField("Месяц", primary_key=True)
+    first_id = models.PositiveIntegerField("Первый id", default=0)
+    last_id = models.PositiveIntegerField("Последний id", default=0)
+
+    def __str__(self):
+        return f"{self.month:%Y-%m}: {self.first_id}..{self.last_id}"
+
+    class Meta:
+        verbose_name = "Архивный раздел"
+        verbose_name_plural = "Архивные разделы"
+
+
+# Модели таблиц архивных разделов по месяцам
+_archive_models = {}
+
+
+def archive_field(field):
+    """
+    Поле архивной модели с теми же столбцами, что у поля Post.
+    Связи без ограничений в БД и обратных ссылок: удаление автора
+    и группы обрабатывают сигналы posts.signals.
+    """
+    if not field.is_relation:
+        return field.clone()
+    name, path, args, kwargs = field.deconstruct()
+    kwargs.update(
+        related_name="+", db_constraint=False, on_delete=models.DO_NOTHING
+    )
+    return field.__class__(*args, **kwargs)
+
+
+def archive_model(month):
+    """
+    Модель таблицы posts_post_ГГГГ_ММ с постами за месяц month.
+    Столбцы и методы — как у Post, индексы — те, что нужны лентам.
+    """
+    model = _archive_models.get(month)
+    if model is not None:
+        return model
+    suffix = f"{month:%Y%m}"
+    meta = type("Meta", (), {
+        "db_table": f"posts_post_{month:%Y_%m}",
+        "managed": False,
+        "ordering": ("-pub_date",),
+        "verbose_name": f"Архив постов за {month:%m.%Y}",
+        "indexes": (
+            models.Index(
+                fields=("-pub_date", "-id"), name=f"post_{suffix}_feed_idx"
+            ),
+            models.Index(
+                fields=("author", "-pub_date", "-id"),
+                name=f"post_{suffix}_author_idx",
+            ),
+            models.Index(
+                fields=("group", "-pub_date", "-id"),
+                name=f"post_{suffix}_group_idx",
+            ),
+        ),
+    })
+    attrs = {
+        field.name: archive_field(field)
+        for field in Post._meta.local_concrete_fields
+    }
+    attrs.update(
+        __module__=__name__,
+        Meta=meta,
+        objects=PostQuerySet.as_manager(),
+        month=month,
+        __str__=Post.__str__,
+        image_preview_url=Post.image_preview_url,
+    )
+    model = type(f"ArchivedPost{suffix}", (models.Model,), attrs)
+    _archive_models[month] = model
+    return model
+
+
+def post_models():
+    """Post и модели всех архивных разделов: для пересчёта счётчиков."""
+    months = PostPartition.objects.order_by("month").values_list(
+        "month", flat=True
+    )
+    return [Post] + [archive_model(month) for month in months]
@@ -0,0 +1,202 @@
+import base64
+import binascii
+
+from django.conf import settings
+from django.core.paginator import Page, Paginator
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+NEXT = "n"
+PREVIOUS = "p"
+
+# Допустимые id: INTEGER в SQLite — знаковое 64-битное число
+MAX_PK = 2 ** 63 - 1
+
+
+def encode_cursor(direction, pub_date, pk):
+    """Кодирует позицию в ленте (pub_date, id) в строку для URL."""
+    raw = f"{direction}|{pub_date.isoformat()}|{pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """
+    Раскодирует курсор в (direction, pub_date, id).
+    Для повреждённого курсора и id вне диапазона INTEGER возвращает None.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        direction, pub_date, pk = raw.split("|")
+        pub_date = parse_datetime(pub_date)
+        pk = int(pk)
+    except (binascii.Error, UnicodeError, ValueError):
+        return None
+    if direction not in (NEXT, PREVIOUS) or pub_date is None:
+        return None
+    if not -MAX_PK - 1 <= pk <= MAX_PK:
+        return None
+    return direction, pub_date, pk
+
+
+def keyset(queryset, direction, pub_date=None, pk=None, pk_field="pk"):
+    """
+    Строки ленты после (NEXT) или до (PREVIOUS) позиции (pub_date, pk)
+    в порядке ленты; до позиции — в обратном порядке.
+    pk_field — поле, по которому упорядочены строки с одной датой.
+    """
+    queryset = queryset.order_by("-pub_date", f"-{pk_field}")
+    if direction == NEXT:
+        queryset = queryset.filter(
+            Q(pub_date__lt=pub_date)
+            | Q(pub_date=pub_date, **{f"{pk_field}__lt": pk})
+        )
+    elif direction == PREVIOUS:
+        queryset = queryset.filter(
+            Q(pub_date__gt=pub_date)
+            | Q(pub_date=pub_date, **{f"{pk_field}__gt": pk})
+        ).reverse()
+    return queryset
+
+
+class CursorPage(Page):
+    """
+    Страница ленты, полученная поиском по ключу (pub_date, id).
+    Номер страницы неизвестен, переходы возможны только
+    на соседние страницы через курсоры. Строки — посты или словари
+    из values() с ключами pk и pub_date.
+    """
+
+    is_cursor = True
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        super().__init__(object_list, None, paginator)
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return "<CursorPage>"
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    @staticmethod
+    def position(row):
+        if isinstance(row, dict):
+            return row["pub_date"], row["pk"]
+        return row.pub_date, row.pk
+
+    @cached_property
+    def next_cursor(self):
+        if not self._has_next or not self.object_list:
+            return None
+        return encode_cursor(NEXT, *self.position(self.object_list[-1]))
+
+    @cached_property
+    def previous_cursor(self):
+        if not self._has_previous or not self.object_list:
+            return None
+        return encode_cursor(PREVIOUS, *self.position(self.object_list[0]))
+
+
+class CursorPaginator(Paginator):
+    """
+    Пагинатор ленты постов без COUNT(*) и OFFSET.
+
+    cursor_page() выбирает per_page + 1 строк после (или до) курсора,
+    поэтому стоимость перехода не зависит от глубины страницы.
+    Обычные page()/get_page() по номеру страницы работают как раньше.
+    count_limit включает приблизительное число записей:
+    считается не больше count_limit + 1 строк.
+    """
+
+    def __init__(self, object_list, per_page, count_limit=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_limit = count_limit
+
+    @cached_property
+    def approximate_count(self):
+        """Число записей, но не больше count_limit + 1."""
+        if self.count_limit is None:
+            return self.count
+        return self.object_list[:self.count_limit + 1].count()
+
+    @property
+    def count_is_exact(self):
+        return (
+            self.count_limit is None
+            or self.approximate_count <= self.count_limit
+        )
+
+    def get_cursor_page(self, cursor):
+        """Возвращает страницу по курсору, при ошибке — первую."""
+        position = decode_cursor(cursor) if cursor else None
+        if position is None:
+            return self.cursor_page(None)
+        return self.cursor_page(*position)
+
+    def cursor_queryset(self, direction, pub_date=None, pk=None):
+        """Запрос строк страницы после (или до) курсора."""
+        queryset = keyset(self.object_list, direction, pub_date, pk)
+        return queryset[:self.per_page + 1]
+
+    def cursor_rows(self, direction, pub_date=None, pk=None):
+        """До per_page + 1 строк после (или до) курсора."""
+        return list(self.cursor_queryset(direction, pub_date, pk))
+
+    def cursor_page(self, direction, pub_date=None, pk=None):
+        rows = self.cursor_rows(direction, pub_date, pk)
+        if not rows and direction is not None:
+            # Курсор за краем ленты: посты удалены или курсор подделан
+            return self.cursor_page(None)
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if direction == PREVIOUS:
+            rows.reverse()
+            return CursorPage(rows, self, True, has_more)
+        return CursorPage(rows, self, has_more, direction == NEXT)
+
+    def page_keys(self, page_number, cursor):
+        """(id, modified) постов страницы по номеру или по курсору."""
+        if page_number is not None:
+            rows = self.get_page(page_number).object_list
+        else:
+            position = decode_cursor(cursor) if cursor else None
+            rows = self.cursor_queryset(*(position or (None,)))
+            keys = list(rows.values_list("pk", "modified"))
+            if keys or position is None:
+                return keys
+            # Пустая страница по курсору показывается как первая
+            rows = self.cursor_queryset(None)
+        return list(rows.values_list("pk", "modified"))
+
+
+def get_page_obj(request, post_list, paginator_class=CursorPaginator):
+    """
+    Страница ленты для запроса: ?page=N — по номеру страницы,
+    иначе — по курсору ?cursor=... (без курсора — первая страница).
+    """
+    paginator = paginator_class(
+        post_list,
+        settings.POST_COUNT,
+        count_limit=settings.POST_COUNT_LIMIT,
+    )
+    page_number = request.GET.get("page")
+    if page_number is not None:
+        return paginator.get_page(page_number)
+    return paginator.get_cursor_page(request.GET.get("cursor"))
+
+
+def get_page_keys(request, post_list, paginator_class=CursorPaginator):
+    """
+    (id, modified) постов той же страницы, что вернёт get_page_obj(),
+    узкими запросами — для валидаторов условных GET-запросов.
+    """
+    paginator = paginator_class(post_list, settings.POST_COUNT)
+    return paginator.page_keys(
+        request.GET.get("page"), request.GET.get("cursor")
+    )
@@ -0,0 +1,474 @@
+"""
+Хранение постов по месяцам. Свежие посты лежат в горячей таблице
+posts_post, более старые команда rollover_posts переносит в архивные
+разделы posts_post_ГГГГ_ММ — по таблице на месяц, каталог разделов
+хранится в PostPartition.
+
+Ленты читают горячую таблицу и только те разделы, в которые попадает
+страница: по курсору — разделы не новее (для перехода назад — не
+старше) курсора и лишь пока их посты могут попасть на страницу,
+по номеру — раздел месяца, с которого начинается страница. Месяц
+находят счётчики PostMonth и PostDay, без COUNT(*).
+"""
+import datetime
+import functools
+from itertools import chain
+
+from django.db import connection, transaction
+from django.db.models import Max, Min, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+from .models import (
+    Post, PostDay, PostMonth, PostPartition, PostQuerySet, TimelineEntry,
+    archive_model, month_of
+)
+from .paginators import NEXT, PREVIOUS, CursorPage, CursorPaginator, keyset
+
+# Полнотекстовый индекс постов архивных разделов (posts.search)
+ARCHIVE_FTS_TABLE = "posts_post_archive_fts"
+# Сколько id удалять из индекса одной командой
+FTS_BATCH_SIZE = 500
+
+
+def next_month(month):
+    if month.month == 12:
+        return month.replace(year=month.year + 1, month=1)
+    return month.replace(month=month.month + 1)
+
+
+def as_datetime(date):
+    """Начало дня date по UTC."""
+    return datetime.datetime.combine(
+        date, datetime.time(), tzinfo=timezone.utc
+    )
+
+
+def month_end(month):
+    """Начало следующего месяца по UTC: верхняя граница раздела."""
+    return as_datetime(next_month(month))
+
+
+def locate(months, offset):
+    """
+    Раздел, в котором лежит пост ленты номер offset, и номер поста
+    внутри раздела. months — пары (месяц, число постов) от новых
+    к старым. None, если постов меньше.
+    """
+    skipped = 0
+    for month, count in months:
+        if offset < skipped + count:
+            return month, offset - skipped
+        skipped += count
+    return None
+
+
+def get_partitions():
+    """Месяцы архивных разделов от новых к старым."""
+    return list(
+        PostPartition.objects.order_by("-month").values_list(
+            "month", flat=True
+        )
+    )
+
+
+def scope_filter(scope):
+    """
+    Фильтр PostDay для ленты с условиями scope: у PostDay те же
+    связи group и author, что у Post, а связь, которой нет в scope,
+    пустая.
+    """
+    fields = {lookup.split("__")[0] for lookup in scope}
+    filters = dict(scope)
+    for field in ("group", "author"):
+        if field not in fields and f"{field}_id" not in fields:
+            filters[field] = None
+    return filters
+
+
+def scope_months(scope, period=None):
+    """
+    Пары (месяц, число постов) ленты от новых к старым по счётчикам.
+    period — даты [начало, конец) или None.
+    """
+    if not scope and period is None:
+        return list(
+            PostMonth.objects.filter(post_count__gt=0)
+            .order_by("-month")
+            .values_list("month", "post_count")
+        )
+    days = PostDay.objects.filter(**scope_filter(scope), post_count__gt=0)
+    if period is not None:
+        days = days.filter(day__gte=period[0], day__lt=period[1])
+    return list(
+        days.order_by()
+        .annotate(month=TruncMonth("day"))
+        .values_list("month")
+        .annotate(count=Sum("post_count"))
+        .order_by("-month")
+    )
+
+
+def is_beyond(row, month, backward):
+    """
+    Уже не попадут на страницу посты раздела month и следующих
+    за ним, если её последняя строка — row.
+    """
+    pub_date = CursorPage.position(row)[0]
+    if backward:
+        return pub_date < as_datetime(month)
+    return pub_date >= month_end(month)
+
+
+def merge_archive(
+    rows, limit, partitions, get_queryset,
+    direction=None, pub_date=None, pk=None,
+):
+    """
+    Дополняет строки горячей таблицы rows строками архивных разделов
+    и возвращает первые limit строк после (или до) позиции в порядке
+    выдачи. partitions — месяцы разделов от новых к старым,
+    get_queryset(month) — запрос ленты к разделу.
+    """
+    backward = direction == PREVIOUS
+    if direction is not None:
+        cursor_month = month_of(pub_date)
+        partitions = [
+            month for month in partitions
+            if (month >= cursor_month if backward else month <= cursor_month)
+        ]
+    if backward:
+        partitions = partitions[::-1]
+    rows = list(rows)
+    for month in partitions:
+        if len(rows) >= limit and is_beyond(rows[limit - 1], month, backward):
+            break
+        rows.extend(keyset(get_queryset(month), direction, pub_date, pk)[
+            :limit
+        ])
+        rows.sort(key=CursorPage.position, reverse=not backward)
+        del rows[limit:]
+    return rows
+
+
+class PartitionedPaginator(CursorPaginator):
+    """
+    Пагинатор ленты по горячей таблице и архивным разделам.
+
+    object_list — посты ленты в горячей таблице, scope — те же условия
+    в виде фильтра для разделов, period — даты [начало, конец) архива
+    или None, shape(queryset) — выбор полей запроса к разделу, по
+    умолчанию как у PostQuerySet.feed(). Число постов — сумма
+    счётчиков PostMonth или PostDay.
+    """
+
+    # Поля для валидаторов условных GET-запросов
+    KEY_FIELDS = ("pk", "pub_date", "modified")
+
+    def __init__(
+        self, object_list, per_page, scope=None, period=None, shape=None,
+        **kwargs
+    ):
+        super().__init__(object_list, per_page, **kwargs)
+        self.scope = scope or {}
+        self.period = period
+        self.shape = shape or PostQuerySet.feed
+
+    @cached_property
+    def partitions(self):
+        partitions = PostPartition.objects.order_by("-month")
+        if self.period is not None:
+            start, end = self.period
+            partitions = partitions.filter(
+                month__gte=start.replace(day=1), month__lt=end
+            )
+        return list(partitions.values_list("month", flat=True))
+
+    @cached_property
+    def months(self):
+        return scope_months(self.scope, self.period)
+
+    @cached_property
+    def count(self):
+        return sum(count for _, count in self.months)
+
+    @cached_property
+    def approximate_count(self):
+        return self.count
+
+    def archive_queryset(self, month):
+        """Посты ленты в разделе month."""
+        queryset = archive_model(month).objects.filter(**self.scope)
+        if self.period is not None:
+            start, end = self.period
+            queryset = queryset.filter(
+                pub_date__gte=as_datetime(start),
+                pub_date__lt=as_datetime(end),
+            )
+        return self.shape(queryset)
+
+    def cursor_rows(self, direction, pub_date=None, pk=None):
+        rows = super().cursor_rows(direction, pub_date, pk)
+        return merge_archive(
+            rows, self.per_page + 1, self.partitions, self.archive_queryset,
+            direction, pub_date, pk,
+        )
+
+    def month_queryset(self, month):
+        """Посты горячей таблицы за месяц month и старше."""
+        return self.object_list.filter(
+            pub_date__lt=month_end(month)
+        ).order_by("-pub_date", "-pk")
+
+    def month_slice(self, month, offset, stop):
+        """Посты ленты за месяц month с номерами [offset, stop)."""
+        hot = self.month_queryset(month).filter(
+            pub_date__gte=as_datetime(month)
+        )
+        if month not in self.partitions:
+            return list(hot[offset:stop])
+        partition = self.archive_queryset(month).order_by("-pub_date", "-pk")
+        if not hot.exists():
+            return list(partition[offset:stop])
+        rows = sorted(
+            chain(hot[:stop], partition[:stop]),
+            key=CursorPage.position,
+            reverse=True,
+        )
+        return rows[offset:stop]
+
+    def month_rows(self, month, offset):
+        """Страница ленты с поста номер offset месяца month."""
+        stop = offset + self.per_page
+        if not any(partition <= month for partition in self.partitions):
+            # Дальше в ленте только горячая таблица
+            return list(self.month_queryset(month)[offset:stop])
+        rows = self.month_slice(month, offset, stop)
+        if rows and len(rows) < self.per_page:
+            rows += self.cursor_rows(
+                NEXT, *CursorPage.position(rows[-1])
+            )[:self.per_page - len(rows)]
+        return rows
+
+    def page(self, number):
+        number = self.validate_number(number)
+        position = locate(self.months, (number - 1) * self.per_page)
+        rows = [] if position is None else self.month_rows(*position)
+        return self._get_page(rows, number, self)
+
+    def page_keys(self, page_number, cursor):
+        fields = self.KEY_FIELDS
+        paginator = type(self)(
+            self.object_list.values(*fields),
+            self.per_page,
+            scope=self.scope,
+            period=self.period,
+            shape=lambda queryset: queryset.values(*fields),
+        )
+        if page_number is not None:
+            page = paginator.get_page(page_number)
+        else:
+            page = paginator.get_cursor_page(cursor)
+        return [(row["pk"], row["modified"]) for row in page]
+
+
+def partitioned(period=None, shape=None, **scope):
+    """Пагинатор ленты с условиями scope для get_page_obj()."""
+    return functools.partial(
+        PartitionedPaginator, scope=scope, period=period, shape=shape
+    )
+
+
+def candidate_partitions(first_id, last_id):
+    """Разделы, в которых могут быть посты с id из [first_id, last_id]."""
+    return PostPartition.objects.filter(
+        first_id__lte=last_id, last_id__gte=first_id
+    ).values_list("month", flat=True)
+
+
+def find_archived(post_id, shape=None):
+    """Пост архивного раздела по id или None."""
+    shape = shape or PostQuerySet.feed
+    for month in candidate_partitions(post_id, post_id):
+        post = shape(archive_model(month).objects.filter(pk=post_id)).first()
+        if post is not None:
+            return post
+    return None
+
+
+def archived_in_bulk(ids):
+    """Посты архивных разделов для ленты: словарь {id: пост}."""
+    if not ids:
+        return {}
+    posts = {}
+    for month in candidate_partitions(min(ids), max(ids)):
+        posts.update(archive_model(month).objects.feed().in_bulk(ids))
+    return posts
+
+
+def as_post(archived):
+    """Несохранённый Post с полями поста из архива, например для формы."""
+    return Post(**{
+        field.attname: getattr(archived, field.attname)
+        for field in Post._meta.local_concrete_fields
+    })
+
+
+def has_archive_fts():
+    return connection.vendor == "sqlite"
+
+
+def unindex_archived(cursor, ids):
+    """Удаляет посты из полнотекстового индекса архива."""
+    if not has_archive_fts():
+        return
+    ids = list(ids)
+    for start in range(0, len(ids), FTS_BATCH_SIZE):
+        batch = ids[start:start + FTS_BATCH_SIZE]
+        cursor.execute(
+            f"DELETE FROM {ARCHIVE_FTS_TABLE} WHERE rowid IN "
+            f"({', '.join(['%s'] * len(batch))})",
+            batch,
+        )
+
+
+def create_table(model):
+    """
+    Создаёт таблицу и индексы модели раздела. В SQLite schema_editor()
+    нельзя открыть внутри транзакции, поэтому его команды выполняются
+    напрямую: DDL в SQLite откатывается вместе с транзакцией. Индексы
+    неуправляемой модели create_model() не создаёт.
+    """
+    editor = connection.schema_editor()
+    editor.deferred_sql = []
+    editor.create_model(model)
+    for index in model._meta.indexes:
+        editor.add_index(model, index)
+    for sql in editor.deferred_sql:
+        editor.execute(sql)
+
+
+def column_list():
+    quote = connection.ops.quote_name
+    return ", ".join(
+        quote(field.column) for field in Post._meta.local_concrete_fields
+    )
+
+
+def archive_month(month):
+    """
+    Переносит посты за месяц month из горячей таблицы в архивный
+    раздел, создавая его при необходимости. Посты уходят из лент
+    подписок (TimelineEntry) и из индекса поиска горячей таблицы
+    в индекс архива. Возвращает число перенесённых постов.
+    """
+    model = archive_model(month)
+    table = model._meta.db_table
+    posts = Post.objects.filter(
+        pub_date__gte=as_datetime(month), pub_date__lt=month_end(month)
+    ).order_by()
+    rows_sql, rows_params = posts.values_list(*(
+        field.attname for field in Post._meta.local_concrete_fields
+    )).query.sql_with_params()
+    with transaction.atomic():
+        partition, created = PostPartition.objects.get_or_create(month=month)
+        if created:
+            create_table(model)
+        TimelineEntry.objects.filter(post__in=posts).delete()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {table} ({column_list()}) {rows_sql}",
+                rows_params,
+            )
+            moved = cursor.rowcount
+            if has_archive_fts():
+                text_sql, text_params = posts.values_list(
+                    "pk", "text"
+                ).query.sql_with_params()
+                cursor.execute(
+                    f"INSERT INTO {ARCHIVE_FTS_TABLE}(rowid, text) "
+                    f"{text_sql}",
+                    text_params,
+                )
+            ids_sql, ids_params = posts.values("pk").query.sql_with_params()
+            cursor.execute(
+                f"DELETE FROM {Post._meta.db_table} "
+                f"WHERE {Post._meta.pk.column} IN ({ids_sql})",
+                ids_params,
+            )
+        bounds = model.objects.aggregate(first=Min("pk"), last=Max("pk"))
+        PostPartition.objects.filter(month=month).update(
+            first_id=bounds["first"] or 0, last_id=bounds["last"] or 0
+        )
+    return moved
+
+
+def roll_over(before):
+    """
+    Переносит в архивные разделы посты горячей таблицы, опубликованные
+    раньше месяца before. Возвращает {месяц: число постов}.
+    """
+    months = Post.objects.filter(
+        pub_date__lt=as_datetime(before)
+    ).order_by().annotate(
+        month=TruncMonth("pub_date", tzinfo=timezone.utc)
+    ).values_list("month", flat=True).distinct()
+    return {
+        month: archive_month(month)
+        for month in sorted({month_of(value) for value in months})
+    }
+
+
+def restore(post_id):
+    """
+    Возвращает пост из архивного раздела в горячую таблицу, например
+    перед правкой: у разделов нет сигналов, которые обновляют
+    счётчики и кеш. False, если поста нет в архиве.
+    """
+    archived = find_archived(post_id, lambda queryset: queryset.only("pk"))
+    if archived is None:
+        return False
+    table = archived._meta.db_table
+    pk_column = Post._meta.pk.column
+    columns = column_list()
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {Post._meta.db_table} ({columns}) "
+            f"SELECT {columns} FROM {table} WHERE {pk_column} = %s",
+            [post_id],
+        )
+        cursor.execute(
+            f"DELETE FROM {table} WHERE {pk_column} = %s", [post_id]
+        )
+        unindex_archived(cursor, [post_id])
+    return True
+
+
+def delete_archived(**filters):
+    """
+    Удаляет посты архивных разделов по условию filters, например
+    посты удалённого автора. Возвращает (pub_date, group_id, author_id)
+    удалённых постов: счётчики по ним обновляет вызывающий.
+    """
+    deleted = []
+    for month in get_partitions():
+        queryset = archive_model(month).objects.filter(**filters)
+        rows = list(queryset.values_list(
+            "pk", "pub_date", "group_id", "author_id"
+        ))
+        if not rows:
+            continue
+        queryset.delete()
+        with connection.cursor() as cursor:
+            unindex_archived(cursor, (row[0] for row in rows))
+        deleted.extend(row[1:] for row in rows)
+    return deleted
+
+
+def detach_group(group_id):
+    """Убирает удалённую группу из постов архивных разделов."""
+    for month in get_partitions():
+        archive_model(month).objects.filter(group_id=group_id).update(
+            group=None
+        )
@@ -0,0 +1,141 @@
+import re
+from itertools import chain
+
+from django.db import connection
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .models import Post, post_models
+from .partitions import ARCHIVE_FTS_TABLE, archived_in_bulk
+
+FTS_TABLE = "posts_post_fts"
+# Маркеры подсветки, которых не бывает в тексте постов
+MARK_START = "\ue000"
+MARK_END = "\ue001"
+SNIPPET_TOKENS = 16
+WORD_RE = re.compile(r"\w+")
+
+
+def has_fts():
+    return connection.vendor == "sqlite"
+
+
+def to_match_query(query):
+    """
+    Пользовательский запрос в выражение MATCH: каждое слово ищется
+    по префиксу, операторы FTS5 из запроса не интерпретируются.
+    """
+    words = WORD_RE.findall(query)
+    return " ".join(f'"{word}"*' for word in words)
+
+
+def highlight(snippet):
+    """Экранирует фрагмент и заменяет маркеры на <mark>."""
+    return mark_safe(
+        escape(snippet)
+        .replace(MARK_START, "<mark>")
+        .replace(MARK_END, "</mark>")
+    )
+
+
+def match_sql(table):
+    """Запрос id, фрагмента и релевантности найденных в индексе table."""
+    return (
+        f"SELECT rowid, snippet({table}, 0, %s, %s, '…', %s), rank AS score "
+        f"FROM {table} WHERE {table} MATCH %s"
+    )
+
+
+def matching_ids(query):
+    """Подзапрос id постов, найденных по индексу, для фильтра pk__in."""
+    return RawSQL(
+        f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s",
+        (to_match_query(query),),
+    )
+
+
+class SearchResults:
+    """
+    Найденные посты горячей таблицы и архивных разделов в порядке
+    релевантности (bm25). Поддерживает len() и срезы, поэтому подходит
+    для Paginator: из индексов читается только запрошенная страница.
+    """
+
+    def __init__(self, query):
+        self.query = query
+        self.match = to_match_query(query)
+
+    def __len__(self):
+        return self.count()
+
+    def count(self):
+        if not self.match:
+            return 0
+        if not has_fts():
+            return sum(
+                model.objects.filter(text__icontains=self.query).count()
+                for model in post_models()
+            )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT (SELECT COUNT(*) FROM {FTS_TABLE} "
+                f"WHERE {FTS_TABLE} MATCH %s) + (SELECT COUNT(*) "
+                f"FROM {ARCHIVE_FTS_TABLE} WHERE {ARCHIVE_FTS_TABLE} "
+                "MATCH %s)",
+                (self.match, self.match),
+            )
+            return cursor.fetchone()[0]
+
+    def like_slice(self, offset, stop):
+        """Страница поиска через LIKE, если FTS5 нет."""
+        posts = sorted(
+            chain.from_iterable(
+                model.objects.feed().filter(
+                    text__icontains=self.query
+                ).order_by("-pub_date", "-pk")[:stop]
+                for model in post_models()
+            ),
+            key=lambda post: (post.pub_date, post.pk),
+            reverse=True,
+        )[offset:stop]
+        for post in posts:
+            post.snippet = post.text
+        return posts
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        offset = index.start or 0
+        limit = index.stop - offset
+        if not self.match or limit <= 0:
+            return []
+        if not has_fts():
+            return self.like_slice(offset, index.stop)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"{match_sql(FTS_TABLE)} UNION ALL "
+                f"{match_sql(ARCHIVE_FTS_TABLE)} "
+                "ORDER BY score LIMIT %s OFFSET %s",
+                (
+                    MARK_START, MARK_END, SNIPPET_TOKENS, self.match,
+                    MARK_START, MARK_END, SNIPPET_TOKENS, self.match,
+                    limit,
+                    offset,
+                ),
+            )
+            rows = cursor.fetchall()
+        ids = [pk for pk, snippet, score in rows]
+        posts = Post.objects.feed().in_bulk(ids)
+        posts.update(archived_in_bulk([pk for pk in ids if pk not in posts]))
+        result = []
+        for pk, snippet, score in rows:
+            post = posts.get(pk)
+            if post is not None:
+                post.snippet = highlight(snippet)
+                result.append(post)
+        return result
+
+
+def search_posts(query):
+    return SearchResults(query)
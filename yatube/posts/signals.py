@@ -0,0 +1,197 @@
+from django.conf import settings
+from django.db.models.signals import (
+    post_delete, post_init, post_save, pre_delete, pre_save
+)
+from django.dispatch import receiver
+
+from . import caching, partitions, tasks
+from .models import (
+    AuthorStats, Group, Post, PostDay, PostMonth, User, day_of, month_of
+)
+
+
+def update_author_stats(post, created):
+    previous = post._saved_author_id
+    if created:
+        AuthorStats.increment(post.author_id)
+    elif previous is not None and previous != post.author_id:
+        AuthorStats.decrement(previous)
+        AuthorStats.increment(post.author_id)
+
+
+def update_post_months(post, created):
+    previous = post._saved_pub_date
+    if created:
+        PostMonth.increment(month_of(post.pub_date))
+    elif previous is not None and month_of(previous) != month_of(
+        post.pub_date
+    ):
+        PostMonth.decrement(month_of(previous))
+        PostMonth.increment(month_of(post.pub_date))
+
+
+def update_post_days(post, created):
+    previous = (
+        post._saved_pub_date, post._saved_group_id, post._saved_author_id
+    )
+    current = (post.pub_date, post.group_id, post.author_id)
+    if created:
+        PostDay.add_post(*current)
+    elif previous[0] is not None and previous[2] is not None and (
+        (day_of(previous[0]), *previous[1:])
+        != (day_of(current[0]), *current[1:])
+    ):
+        PostDay.remove_post(*previous)
+        PostDay.add_post(*current)
+
+
+def update_group_stats(post, created):
+    previous = (post._saved_group_id, post._saved_author_id)
+    current = (post.group_id, post.author_id)
+    if not created and previous == current:
+        return
+    removed = previous if not created and previous[0] is not None else None
+    added = current if current[0] is not None else None
+    if removed or added:
+        tasks.update_group_stats.enqueue(
+            pub_date=post.pub_date.isoformat(),
+            removed=removed,
+            added=added,
+        )
+
+
+def update_timelines(post, created):
+    if created:
+        tasks.fan_out_post.enqueue(
+            key=f"fan_out_post:{post.pk}", post_id=post.pk
+        )
+    elif post._saved_author_id != post.author_id:
+        tasks.fan_out_post.enqueue(
+            key=f"fan_out_post:{post.pk}", post_id=post.pk, reset=True
+        )
+
+
+def image_name(post):
+    # До первого обращения в __dict__ лежит имя, после — FieldFile
+    image = post.__dict__.get("image")
+    return getattr(image, "name", image)
+
+
+def update_thumbnails(post):
+    if post.__dict__.get("image") and not post.image_srcset:
+        tasks.make_thumbnails.enqueue(
+            key=f"make_thumbnails:{post.pk}", post_id=post.pk
+        )
+
+
+def is_on_cached_index_pages(post):
+    """Попадает ли пост на закешированные первые страницы index."""
+    limit = settings.FEED_CACHE_INDEX_PAGES * settings.POST_COUNT
+    newer = Post.objects.filter(pub_date__gt=post.pub_date)[:limit].count()
+    return newer < limit
+
+
+def invalidate_feed_cache(post, created=False):
+    """Сбрасывает кеш лент, в которых был или появился пост."""
+    group_ids = {post.group_id, post._saved_group_id} - {None}
+    author_ids = {post.author_id, post._saved_author_id} - {None}
+    scopes = [
+        caching.group_scope(slug)
+        for slug in Group.objects.filter(
+            pk__in=group_ids
+        ).values_list("slug", flat=True)
+    ]
+    scopes += [
+        caching.profile_scope(username)
+        for username in User.objects.filter(
+            pk__in=author_ids
+        ).values_list("username", flat=True)
+    ]
+    if created or is_on_cached_index_pages(post):
+        scopes.append(caching.index_scope())
+    caching.invalidate(*scopes)
+
+
+@receiver(post_init, sender=Post)
+def remember_saved_state(sender, instance, **kwargs):
+    # __dict__, чтобы не загружать отложенные поля
+    instance._saved_author_id = instance.__dict__.get("author_id")
+    instance._saved_group_id = instance.__dict__.get("group_id")
+    instance._saved_pub_date = instance.__dict__.get("pub_date")
+    instance._saved_image = image_name(instance)
+
+
+@receiver(pre_save, sender=Post)
+def reset_thumbnails(sender, instance, raw, **kwargs):
+    # Превью старой картинки не подходят к новой
+    if "image" in instance.__dict__ and (
+        image_name(instance) != instance._saved_image
+    ):
+        instance.image_srcset = ""
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    update_author_stats(instance, created)
+    update_post_months(instance, created)
+    update_post_days(instance, created)
+    update_group_stats(instance, created)
+    update_timelines(instance, created)
+    update_thumbnails(instance)
+    invalidate_feed_cache(instance, created)
+    instance._saved_author_id = instance.author_id
+    instance._saved_group_id = instance.group_id
+    instance._saved_pub_date = instance.pub_date
+    instance._saved_image = image_name(instance)
+
+
+def forget_post(pub_date, group_id, author_id):
+    """Учитывает удаление поста в счётчиках."""
+    AuthorStats.decrement(author_id)
+    PostMonth.decrement(month_of(pub_date))
+    PostDay.remove_post(pub_date, group_id, author_id)
+    if group_id is not None:
+        tasks.update_group_stats.enqueue(
+            pub_date=pub_date.isoformat(), removed=(group_id, author_id)
+        )
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    forget_post(instance.pub_date, instance.group_id, instance.author_id)
+    invalidate_feed_cache(instance)
+
+
+@receiver(pre_delete, sender=User)
+def delete_archived_posts(sender, instance, **kwargs):
+    # У архивных разделов нет каскадного удаления и сигналов Post
+    deleted = partitions.delete_archived(author_id=instance.pk)
+    for post in deleted:
+        forget_post(*post)
+    if deleted:
+        group_ids = {group_id for _, group_id, _ in deleted} - {None}
+        caching.invalidate(caching.index_scope(), *(
+            caching.group_scope(slug)
+            for slug in Group.objects.filter(
+                pk__in=group_ids
+            ).values_list("slug", flat=True)
+        ))
+
+
+@receiver(post_delete, sender=Group)
+def group_deleted(sender, instance, **kwargs):
+    # Как on_delete=SET_NULL у Post.group
+    partitions.detach_group(instance.pk)
+
+
+@receiver(post_save, sender=Group)
+def group_saved(sender, instance, raw, **kwargs):
+    caching.invalidate(caching.group_scope(instance.slug))
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, raw, **kwargs):
+    # Имя автора выводится в шапке профиля
+    caching.invalidate(caching.profile_scope(instance.username))
@@ -0,0 +1,40 @@
+from django.utils.dateparse import parse_datetime
+
+from core.jobs import task
+
+from . import images, timeline
+from .models import GroupStats, Post, TimelineEntry
+
+
+@task
+def fan_out_post(post_id, reset=False):
+    """Раскладывает пост по лентам подписчиков его текущего автора."""
+    post = Post.objects.filter(pk=post_id).only("author", "pub_date").first()
+    if post is None:
+        return
+    if reset:
+        TimelineEntry.objects.filter(post=post).delete()
+    timeline.fan_out([post])
+
+
+@task
+def update_group_stats(pub_date, removed=None, added=None):
+    """
+    Переносит пост между статистиками групп. pub_date — дата поста
+    в ISO 8601, removed и added — пары [group_id, author_id] или None.
+    """
+    if removed is not None:
+        GroupStats.remove_post(*removed)
+    if added is not None:
+        GroupStats.add_posts(*added, 1, parse_datetime(pub_date))
+
+
+@task
+def make_thumbnails(post_id):
+    """Создаёт превью картинки поста для лент."""
+    post = Post.objects.filter(pk=post_id).first()
+    if post is None or not post.image:
+        return
+    post.image_srcset = images.make_srcset(post.image)
+    # modified сбрасывает фрагменты карточки, сигнал — кеш лент
+    post.save(update_fields=("image_srcset", "modified"))
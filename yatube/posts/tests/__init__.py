@@ -0,0 +1,6 @@
+from mixer.backend.django import mixer
+
+from ..models import Post
+
+# Иначе mixer сохраняет в MEDIA_ROOT картинку для каждого поста
+mixer.register(Post, image="")
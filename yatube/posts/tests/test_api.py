@@ -0,0 +1,137 @@
+import json
+from http import HTTPStatus
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from mixer.backend.django import mixer
+
+from ..models import Group, Post, User
+
+
+@override_settings(POST_COUNT=3)
+class FeedApiTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = mixer.blend(User)
+        cls.group = mixer.blend(Group)
+        cls.posts = [
+            Post.objects.create(
+                text=f"Пост {i}", author=cls.author, group=cls.group
+            )
+            for i in range(7)
+        ]
+        cls.posts.reverse()
+
+    def setUp(self):
+        cache.clear()
+
+    def get_json(self, url, **params):
+        response = self.client.get(url, params)
+        self.assertEqual(response["Content-Type"], "application/json")
+        return response, json.loads(response.content)
+
+    def test_feeds_return_posts(self):
+        """Ленты отдают посты в порядке ленты со всеми полями."""
+        urls = (
+            reverse("posts:api_index"),
+            reverse("posts:api_group_list", args=(self.group.slug,)),
+            reverse("posts:api_profile", args=(self.author.username,)),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response, data = self.get_json(url)
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+                first = data["results"][0]
+                self.assertEqual(first["id"], self.posts[0].pk)
+                self.assertEqual(first["author"], self.author.username)
+                self.assertEqual(first["group"], self.group.slug)
+                self.assertIsNone(first["image"])
+                self.assertEqual(len(data["results"]), 3)
+
+    def test_cursor_pages(self):
+        """Курсоры проходят по всей ленте без пропусков и повторов."""
+        url = reverse("posts:api_index")
+        _, data = self.get_json(url, fields="id")
+        seen = [row["id"] for row in data["results"]]
+        self.assertIsNone(data["previous_cursor"])
+        while data["next_cursor"]:
+            _, data = self.get_json(
+                url, fields="id", cursor=data["next_cursor"]
+            )
+            seen += [row["id"] for row in data["results"]]
+        self.assertEqual(seen, [post.pk for post in self.posts])
+
+    def test_field_selection(self):
+        """?fields= оставляет в ответе только перечисленные поля."""
+        url = reverse("posts:api_post_detail", args=(self.posts[0].pk,))
+        _, data = self.get_json(url, fields="id,text")
+        self.assertEqual(data, {"id": self.posts[0].pk, "text": "Пост 6"})
+        response, data = self.get_json(url, fields="id,password")
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        self.assertIn("detail", data)
+
+    def test_missing_objects(self):
+        """Несуществующие группа, автор и пост — 404 в JSON."""
+        urls = (
+            reverse("posts:api_group_list", args=("missing",)),
+            reverse("posts:api_profile", args=("missing",)),
+            reverse("posts:api_post_detail", args=(0,)),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response, data = self.get_json(url)
+                self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+                self.assertIn("detail", data)
+
+    def test_cache_headers(self):
+        """Анонимам ответ кешируется, вошедшим — перепроверяется по ETag."""
+        url = reverse("posts:api_index")
+        response = self.client.get(url)
+        self.assertIn("public", response["Cache-Control"])
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+        other_fields = self.client.get(url, {"fields": "id"})
+        self.assertNotEqual(other_fields["ETag"], response["ETag"])
+        self.client.force_login(self.author)
+        response = self.client.get(url)
+        self.assertIn("private", response["Cache-Control"])
+        self.assertIn("no-cache", response["Cache-Control"])
+
+    def test_feed_is_single_query(self):
+        """Страница ленты — один запрос к БД вместе с автором и группой."""
+        self.client.force_login(self.author)
+        url = reverse("posts:api_index")
+        # Сессия, пользователь, каталог архивных разделов и сама
+        # страница; ETag — из версии кеша
+        with self.assertNumQueries(4):
+            self.client.get(url, {"fields": "id,author,group"})
+
+    def test_anonymous_feed_is_cached(self):
+        """Анонимам страница отдаётся из кеша лент и сбрасывается с ним."""
+        url = reverse("posts:api_index")
+        first = self.client.get(url, {"fields": "id"})
+        with self.assertNumQueries(0):
+            response = self.client.get(url, {"fields": "id"})
+        self.assertEqual(response["X-Feed-Cache"], "hit")
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertEqual(response.content, first.content)
+        self.assertIn("public", response["Cache-Control"])
+        other = self.client.get(url, {"fields": "text"})
+        self.assertEqual(other["X-Feed-Cache"], "miss")
+        # API не знает ?page=: это та же первая страница
+        for page in ("2", "999"):
+            response = self.client.get(url, {"fields": "id", "page": page})
+            self.assertEqual(response["X-Feed-Cache"], "hit")
+            self.assertEqual(response.content, first.content)
+        Post.objects.create(text="Новый пост", author=self.author)
+        response = self.client.get(url, {"fields": "id"})
+        self.assertEqual(response["X-Feed-Cache"], "miss")
+
+    def test_writes_are_not_allowed(self):
+        """API только для чтения."""
+        response = self.client.post(reverse("posts:api_index"))
+        self.assertEqual(
+            response.status_code, HTTPStatus.METHOD_NOT_ALLOWED
+        )
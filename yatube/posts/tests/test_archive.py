@@ -0,0 +1,123 @@
+import datetime
+from http import HTTPStatus
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from mixer.backend.django import mixer
+
+from ..models import Group, Post, PostDay, User
+
+DAYS = (
+    datetime.datetime(2021, 3, 5, 12, tzinfo=timezone.utc),
+    datetime.datetime(2021, 3, 5, 18, tzinfo=timezone.utc),
+    datetime.datetime(2021, 3, 20, 9, tzinfo=timezone.utc),
+    datetime.datetime(2021, 11, 2, 9, tzinfo=timezone.utc),
+    datetime.datetime(2022, 1, 1, 0, tzinfo=timezone.utc),
+)
+
+
+class ArchiveTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = mixer.blend(User)
+        cls.group = mixer.blend(Group)
+        for pub_date in DAYS:
+            post = Post.objects.create(
+                text="Пост", author=cls.author, group=cls.group
+            )
+            post.pub_date = pub_date
+            post.save()
+        # Пост другого автора без группы
+        other = Post.objects.create(text="Чужой", author=mixer.blend(User))
+        other.pub_date = DAYS[0]
+        other.save()
+
+    def get_navigation(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        return [
+            [(item["label"], item["count"]) for item in items]
+            for items in response.context["navigation"]
+        ], response
+
+    def test_navigation_from_calendar(self):
+        """Навигация по годам, месяцам и дням — из PostDay."""
+        navigation, response = self.get_navigation(
+            reverse("posts:index_archive", args=(2021, 3, 5))
+        )
+        self.assertEqual(navigation, [
+            [("2021", 5), ("2022", 1)],
+            [("Март", 4), ("Ноябрь", 1)],
+            [("5", 3), ("20", 1)],
+        ])
+        self.assertEqual(len(response.context["page_obj"]), 3)
+        self.assertEqual(response.context["period"], "5 марта 2021")
+
+    def test_group_and_profile_archives(self):
+        """Архивы группы и автора считают только свои посты."""
+        urls = (
+            reverse("posts:group_archive", args=(self.group.slug, 2021)),
+            reverse(
+                "posts:profile_archive", args=(self.author.username, 2021)
+            ),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                navigation, response = self.get_navigation(url)
+                self.assertEqual(navigation[0], [("2021", 4), ("2022", 1)])
+                self.assertEqual(len(response.context["page_obj"]), 4)
+
+    def test_archive_root_lists_years(self):
+        """Корень архива показывает только годы."""
+        navigation, response = self.get_navigation(
+            reverse("posts:index_archive")
+        )
+        self.assertEqual(navigation, [[("2021", 5), ("2022", 1)]])
+        self.assertNotIn("page_obj", response.context)
+
+    def test_missing_periods_are_404(self):
+        """Период без постов и несуществующая дата — 404."""
+        urls = (
+            reverse("posts:index_archive", args=(2020,)),
+            reverse("posts:index_archive", args=(2021, 4)),
+            reverse("posts:index_archive", args=(2021, 2, 30)),
+            reverse("posts:index_archive", args=(2021, 13)),
+            reverse("posts:group_archive", args=("missing", 2021)),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_navigation_does_not_count_posts(self):
+        """
+        Страница дня: три запроса навигации, каталог архивных разделов
+        и один — постов.
+        """
+        url = reverse("posts:index_archive", args=(2021, 3, 5))
+        with self.assertNumQueries(5):
+            self.client.get(url)
+
+    def test_delete_and_rebuild(self):
+        """Удаление уменьшает счётчики, recount_posts их пересчитывает."""
+        Post.objects.filter(pub_date=DAYS[3]).delete()
+        self.assertFalse(
+            PostDay.objects.filter(
+                day=DAYS[3].date(), post_count__gt=0
+            ).exists()
+        )
+        expected = set(PostDay.objects.filter(post_count__gt=0).values_list(
+            "day", "group", "author", "post_count"
+        ))
+        PostDay.objects.all().delete()
+        call_command("recount_posts", stdout=StringIO())
+        self.assertEqual(
+            set(PostDay.objects.values_list(
+                "day", "group", "author", "post_count"
+            )),
+            expected,
+        )
@@ -0,0 +1,117 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from mixer.backend.django import mixer
+
+from ..models import AuthorStats, Group, Post, PostMonth, User
+
+
+class ExplainFeedsCommandTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        mixer.blend(Post, author=mixer.blend(User), group=mixer.blend(Group))
+
+    def test_feed_queries_use_indexes(self):
+        """Запросы лент используют индексы без сортировки в памяти."""
+        out = StringIO()
+        call_command("explain_feeds", "--check", stdout=out)
+        self.assertIn("post_pub_date_id_idx", out.getvalue())
+        self.assertIn("post_group_pub_date_idx", out.getvalue())
+        self.assertIn("post_author_pub_date_idx", out.getvalue())
+
+
+class RecountPostsCommandTests(TestCase):
+    def test_recount_repairs_drift(self):
+        """recount_posts исправляет рассинхронизированные счётчики."""
+        author = mixer.blend(User)
+        mixer.cycle(3).blend(Post, author=author)
+        AuthorStats.objects.filter(author=author).update(post_count=7)
+        out = StringIO()
+        call_command("recount_posts", stdout=out)
+        self.assertEqual(AuthorStats.objects.get(author=author).post_count, 3)
+        self.assertIn("1", out.getvalue())
+
+
+class ImportExportCommandTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = mixer.blend(User)
+        cls.group = mixer.blend(Group)
+        mixer.cycle(5).blend(Post, author=cls.author, group=cls.group)
+        mixer.cycle(2).blend(Post, author=cls.author, group=None)
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def roundtrip(self, filename):
+        path = os.path.join(self.tmp_dir.name, filename)
+        expected = list(
+            Post.objects.order_by("pk").values_list(
+                "text", "pub_date", "author", "group"
+            )
+        )
+        call_command("export_posts", path, stderr=StringIO())
+        Post.objects.all().delete()
+        call_command(
+            "import_posts", path, "--batch-size", "3", stdout=StringIO()
+        )
+        imported = list(
+            Post.objects.order_by("pk").values_list(
+                "text", "pub_date", "author", "group"
+            )
+        )
+        self.assertEqual(imported, expected)
+        self.assertEqual(AuthorStats.post_count_for(self.author), 7)
+        self.assertEqual(
+            sum(PostMonth.objects.values_list("post_count", flat=True)), 7
+        )
+
+    def test_jsonl_roundtrip(self):
+        """Выгрузка и загрузка JSON Lines сохраняют посты и даты."""
+        self.roundtrip("posts.jsonl")
+
+    def test_csv_roundtrip(self):
+        """Выгрузка и загрузка CSV сохраняют посты и даты."""
+        self.roundtrip("posts.csv")
+
+    def test_unknown_author_is_skipped(self):
+        """Строки с неизвестным автором или датой пропускаются."""
+        path = os.path.join(self.tmp_dir.name, "posts.jsonl")
+        rows = (
+            {"text": "Пост", "author": self.author.username},
+            {"text": "Пост", "author": "nobody"},
+            {"text": "Пост", "author": self.author.username, "pub_date": "?"},
+            {"text": "Пост", "author": self.author.username, "pub_date": 5},
+        )
+        with open(path, "w", encoding="utf-8") as stream:
+            for row in rows:
+                stream.write(json.dumps(row) + "\n")
+        out = StringIO()
+        call_command("import_posts", path, stdout=out)
+        self.assertIn("Создано: 1, пропущено: 3", out.getvalue())
+
+    def test_malformed_lines_are_skipped(self):
+        """Битый JSON и строки не-объекты пропускаются с номером строки."""
+        path = os.path.join(self.tmp_dir.name, "posts.jsonl")
+        row = json.dumps({"text": "Пост", "author": self.author.username})
+        lines = (row, "{\"text\": ", "[]", "1", "\"x\"", "", row)
+        with open(path, "w", encoding="utf-8") as stream:
+            stream.write("\n".join(lines) + "\n")
+        out, err = StringIO(), StringIO()
+        call_command(
+            "import_posts", path, "--batch-size", "3", stdout=out, stderr=err
+        )
+        self.assertIn("Создано: 2, пропущено: 4", out.getvalue())
+        for number in (2, 3, 4, 5):
+            self.assertIn(f"Строка {number} пропущена", err.getvalue())
+        self.assertNotIn("Строка 6", err.getvalue())
+        self.assertEqual(Post.objects.filter(text="Пост").count(), 2)
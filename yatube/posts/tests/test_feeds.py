@@ -0,0 +1,111 @@
+from http import HTTPStatus
+from xml.etree import ElementTree
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from mixer.backend.django import mixer
+
+from ..models import Group, Post, User
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+
+
+@override_settings(SYNDICATION_ITEMS=3)
+class SyndicationFeedTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = mixer.blend(User, first_name="Лев", last_name="Толстой")
+        cls.group = mixer.blend(Group)
+        cls.posts = [
+            Post.objects.create(
+                text=f"Пост {i}", author=cls.author, group=cls.group
+            )
+            for i in range(5)
+        ]
+        cls.urls = {
+            "index": reverse("posts:index_feed", args=("atom",)),
+            "group": reverse(
+                "posts:group_feed", args=("atom", cls.group.slug)
+            ),
+            "profile": reverse(
+                "posts:profile_feed", args=("atom", cls.author.username)
+            ),
+        }
+
+    def setUp(self):
+        cache.clear()
+
+    def get_entries(self, response):
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        content = b"".join(response.streaming_content)
+        root = ElementTree.fromstring(content)
+        return root.findall(f"{ATOM}entry")
+
+    def test_feeds_list_latest_posts(self):
+        """Ленты отдают последние посты области по частям."""
+        for name, url in self.urls.items():
+            with self.subTest(name=name):
+                response = self.client.get(url)
+                self.assertTrue(response.streaming)
+                self.assertIn("atom+xml", response["Content-Type"])
+                entries = self.get_entries(response)
+                self.assertEqual(len(entries), 3)
+                self.assertEqual(
+                    entries[0].find(f"{ATOM}title").text, "Пост 4"
+                )
+                self.assertEqual(
+                    entries[0].find(f"{ATOM}author/{ATOM}name").text,
+                    "Лев Толстой",
+                )
+
+    def test_rss_format(self):
+        """Тот же поток доступен в RSS."""
+        response = self.client.get(reverse("posts:index_feed", args=("rss",)))
+        content = b"".join(response.streaming_content)
+        root = ElementTree.fromstring(content)
+        self.assertEqual(len(root.findall("channel/item")), 3)
+
+    def test_unknown_feed_is_404(self):
+        """Неизвестные формат, группа и автор — 404."""
+        urls = (
+            reverse("posts:index_feed", args=("json",)),
+            reverse("posts:group_feed", args=("atom", "missing")),
+            reverse("posts:profile_feed", args=("atom", "missing")),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_cached_and_conditional(self):
+        """Повтор из кеша без запросов к БД, валидаторы дают 304."""
+        url = self.urls["group"]
+        first = self.client.get(url)
+        content = b"".join(first.streaming_content)
+        with self.assertNumQueries(0):
+            cached = self.client.get(url)
+        self.assertEqual(cached.content, content)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+        response = self.client.get(
+            url, HTTP_IF_MODIFIED_SINCE=first["Last-Modified"]
+        )
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def test_new_post_invalidates_only_its_feeds(self):
+        """Новый пост сбрасывает ленты своей группы, автора и главную."""
+        for url in self.urls.values():
+            b"".join(self.client.get(url).streaming_content)
+        other = mixer.blend(Group)
+        other_url = reverse("posts:group_feed", args=("atom", other.slug))
+        etag = self.client.get(other_url)["ETag"]
+        Post.objects.create(text="Новый", author=self.author, group=self.group)
+        for name, url in self.urls.items():
+            with self.subTest(name=name):
+                entries = self.get_entries(self.client.get(url))
+                self.assertEqual(
+                    entries[0].find(f"{ATOM}title").text, "Новый"
+                )
+        self.assertEqual(self.client.get(other_url)["ETag"], etag)
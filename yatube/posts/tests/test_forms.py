@@ -1,8 +1,20 @@
-from django.test import Client, TestCase
+import shutil
+import tempfile
+from io import BytesIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
 from django.urls import reverse
+from PIL import Image
+
+from core import jobs
 
 from ..models import Group, Post, User
 
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
 
 class PostFormTests(TestCase):
     @classmethod
@@ -67,3 +79,78 @@ class PostFormTests(TestCase):
         self.assertEqual(edited_post.text, form_data["text"])
         self.assertEqual(edited_post.group, None)
         self.assertEqual(Post.objects.count(), posts_count)
+
+
+def make_image(name="picture.png", size=(1200, 800), color="red"):
+    buffer = BytesIO()
+    Image.new("RGB", size, color).save(buffer, "PNG")
+    return SimpleUploadedFile(name, buffer.getvalue(), "image/png")
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class PostImageTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create(username="ImageAuthor")
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.author)
+
+    def create_post(self, image):
+        self.authorized_client.post(
+            reverse("posts:post_create"),
+            data={"text": "Пост с картинкой", "image": image},
+        )
+        return Post.objects.filter(author=self.author).first()
+
+    def test_image_name_is_content_hash(self):
+        """Одинаковые картинки сохраняются под одним именем."""
+        first = self.create_post(make_image("first.png"))
+        second = self.create_post(make_image("second.png"))
+        other = self.create_post(make_image(color="blue"))
+        self.assertTrue(first.image.name.startswith("posts/"))
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertNotEqual(first.image.name, other.image.name)
+
+    def test_thumbnails_are_made_in_background(self):
+        """Превью создаёт фоновая задача, лента выводит srcset."""
+        post = self.create_post(make_image())
+        self.assertEqual(post.image_srcset, "")
+        response = self.authorized_client.get(reverse("posts:index"))
+        self.assertContains(response, post.image.url)
+        jobs.run_pending()
+        post.refresh_from_db()
+        self.assertIn(" 320w", post.image_srcset)
+        self.assertIn(" 960w", post.image_srcset)
+        response = self.authorized_client.get(reverse("posts:index"))
+        self.assertContains(response, 'loading="lazy"')
+        self.assertContains(response, post.image_srcset)
+        self.assertNotContains(response, f'src="{post.image.url}"')
+
+    def test_small_image_is_not_upscaled(self):
+        """Превью не шире оригинала."""
+        post = self.create_post(make_image(size=(500, 300)))
+        jobs.run_pending()
+        post.refresh_from_db()
+        self.assertIn(" 320w", post.image_srcset)
+        self.assertIn(" 500w", post.image_srcset)
+        self.assertNotIn(" 640w", post.image_srcset)
+
+    def test_new_image_resets_thumbnails(self):
+        """Замена картинки сбрасывает превью старой."""
+        post = self.create_post(make_image())
+        jobs.run_pending()
+        self.authorized_client.post(
+            reverse("posts:post_edit", kwargs={"post_id": post.id}),
+            data={"text": post.text, "image": make_image(color="green")},
+        )
+        post.refresh_from_db()
+        self.assertEqual(post.image_srcset, "")
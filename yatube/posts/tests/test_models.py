@@ -1,7 +1,9 @@
 from django.contrib.auth import get_user_model
 from django.test import TestCase
 
-from ..models import Group, Post
+from core import jobs
+
+from ..models import AuthorStats, Group, GroupStats, Post
 
 User = get_user_model()
 
@@ -56,3 +58,95 @@ class PostModelTest(TestCase):
                     post._meta.get_field(field).help_text,
                     expected_value
                 )
+
+
+class AuthorStatsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username="author")
+        cls.other = User.objects.create_user(username="other")
+
+    def post_count(self, user):
+        return AuthorStats.objects.get(author=user).post_count
+
+    def test_post_count_follows_create_and_delete(self):
+        """Счётчик растёт при создании поста и уменьшается при удалении."""
+        first = Post.objects.create(author=self.user, text="Первый")
+        Post.objects.create(author=self.user, text="Второй")
+        self.assertEqual(self.post_count(self.user), 2)
+        first.delete()
+        self.assertEqual(self.post_count(self.user), 1)
+        Post.objects.filter(author=self.user).delete()
+        self.assertEqual(self.post_count(self.user), 0)
+
+    def test_post_count_follows_author_change(self):
+        """Смена автора переносит пост между счётчиками."""
+        post = Post.objects.create(author=self.user, text="Текст")
+        post = Post.objects.get(pk=post.pk)
+        post.author = self.other
+        post.save()
+        self.assertEqual(self.post_count(self.user), 0)
+        self.assertEqual(self.post_count(self.other), 1)
+
+    def test_post_count_for_author_without_posts(self):
+        """У автора без постов счётчик равен нулю."""
+        self.assertEqual(AuthorStats.post_count_for(self.other), 0)
+
+
+class GroupStatsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username="author")
+        cls.other = User.objects.create_user(username="other")
+        cls.group = Group.objects.create(title="Первая", slug="first")
+        cls.other_group = Group.objects.create(title="Вторая", slug="second")
+
+    def stats(self, group):
+        # Статистика групп обновляется фоновыми задачами
+        jobs.run_pending()
+        return GroupStats.objects.get(group=group)
+
+    def test_stats_follow_create_and_delete(self):
+        """Статистика группы учитывает новые и удалённые посты."""
+        Post.objects.create(author=self.user, text="1", group=self.group)
+        Post.objects.create(author=self.other, text="2", group=self.group)
+        last = Post.objects.create(
+            author=self.other, text="3", group=self.group
+        )
+        stats = self.stats(self.group)
+        self.assertEqual(stats.post_count, 3)
+        self.assertEqual(stats.latest_pub_date, last.pub_date)
+        self.assertEqual(stats.top_author_names, ["other", "author"])
+        Post.objects.filter(pk=last.pk).delete()
+        stats = self.stats(self.group)
+        self.assertEqual(stats.post_count, 2)
+        self.assertLess(stats.latest_pub_date, last.pub_date)
+
+    def test_stats_follow_move_between_groups(self):
+        """Перенос поста в другую группу меняет статистику обеих."""
+        post = Post.objects.create(
+            author=self.user, text="Пост", group=self.group
+        )
+        post = Post.objects.get(pk=post.pk)
+        post.group = self.other_group
+        post.save()
+        self.assertEqual(self.stats(self.group).post_count, 0)
+        self.assertIsNone(self.stats(self.group).latest_pub_date)
+        self.assertEqual(self.stats(self.group).top_author_names, [])
+        self.assertEqual(self.stats(self.other_group).post_count, 1)
+        self.assertEqual(
+            self.stats(self.other_group).top_author_names, ["author"]
+        )
+
+    def test_rebuild_matches_incremental_stats(self):
+        """Пересчёт с нуля совпадает с инкрементальной статистикой."""
+        for author in (self.user, self.other, self.other):
+            Post.objects.create(author=author, text="Пост", group=self.group)
+        expected = self.stats(self.group)
+        GroupStats.rebuild()
+        rebuilt = self.stats(self.group)
+        self.assertEqual(rebuilt.post_count, expected.post_count)
+        self.assertEqual(rebuilt.latest_pub_date, expected.latest_pub_date)
+        self.assertEqual(rebuilt.top_authors, expected.top_authors)
@@ -0,0 +1,116 @@
+import datetime
+from http import HTTPStatus
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from mixer.backend.django import mixer
+
+from ..models import Group, Post, User
+from ..paginators import NEXT, CursorPaginator, decode_cursor, encode_cursor
+
+# Раньше любого поста в тестах
+OLD_DATE = datetime.datetime(2000, 1, 1, tzinfo=timezone.utc)
+
+
+class CursorPaginatorTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = mixer.blend(User)
+        cls.group = mixer.blend(Group)
+        mixer.cycle(23).blend(Post, author=cls.user, group=cls.group)
+        cls.expected = list(Post.objects.order_by("-pub_date", "-pk"))
+
+    def setUp(self):
+        cache.clear()
+
+    def test_cursor_pages_walk_whole_feed(self):
+        """Переходы по курсорам проходят всю ленту без повторов."""
+        paginator = CursorPaginator(Post.objects.all(), 10)
+        page = paginator.get_cursor_page(None)
+        seen = list(page)
+        while page.has_next():
+            page = paginator.get_cursor_page(page.next_cursor)
+            seen.extend(page)
+        self.assertEqual(seen, self.expected)
+        self.assertEqual(len(page), 3)
+
+    def test_previous_cursor_returns_previous_page(self):
+        """Курсор назад возвращает предыдущую страницу."""
+        paginator = CursorPaginator(Post.objects.all(), 10)
+        first = paginator.get_cursor_page(None)
+        second = paginator.get_cursor_page(first.next_cursor)
+        back = paginator.get_cursor_page(second.previous_cursor)
+        self.assertEqual(list(back), list(first))
+        self.assertFalse(back.has_previous())
+        self.assertTrue(back.has_next())
+
+    def test_broken_cursor_returns_first_page(self):
+        """Повреждённый курсор даёт первую страницу."""
+        self.assertIsNone(decode_cursor("not-a-cursor"))
+        paginator = CursorPaginator(Post.objects.all(), 10)
+        page = paginator.get_cursor_page("not-a-cursor")
+        self.assertEqual(list(page), self.expected[:10])
+
+    def test_cursor_past_the_end_returns_first_page(self):
+        """Курсор за краем ленты даёт первую страницу, а не ошибку."""
+        cursor = encode_cursor(NEXT, OLD_DATE, 5)
+        paginator = CursorPaginator(Post.objects.all(), 10)
+        page = paginator.get_cursor_page(cursor)
+        self.assertEqual(list(page), self.expected[:10])
+        self.assertFalse(page.has_previous())
+        urls = (
+            reverse("posts:index"),
+            reverse("posts:group_list", kwargs={"slug": self.group.slug}),
+            reverse("posts:profile", kwargs={"username": self.user.username}),
+            reverse("posts:api_index"),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.client.get(url, {"cursor": cursor})
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_cursor_with_huge_id_is_broken(self):
+        """Курсор с id вне диапазона INTEGER считается повреждённым."""
+        cursor = encode_cursor(NEXT, OLD_DATE, 99999999999999999999999)
+        self.assertIsNone(decode_cursor(cursor))
+        urls = (
+            reverse("posts:index"),
+            reverse("posts:group_list", kwargs={"slug": self.group.slug}),
+            reverse("posts:api_index"),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.client.get(url, {"cursor": cursor})
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_approximate_count_is_bounded(self):
+        """Приблизительное число записей не превышает count_limit + 1."""
+        paginator = CursorPaginator(Post.objects.all(), 10, count_limit=5)
+        self.assertEqual(paginator.approximate_count, 6)
+        self.assertFalse(paginator.count_is_exact)
+
+    def test_cursor_page_has_no_count_query(self):
+        """Страница по курсору не выполняет COUNT(*)."""
+        paginator = CursorPaginator(Post.objects.all(), 10)
+        first = paginator.get_cursor_page(None)
+        with self.assertNumQueries(1):
+            list(paginator.get_cursor_page(first.next_cursor))
+
+    def test_views_accept_cursor(self):
+        """index, group_list и profile листают ленту по курсору."""
+        urls = (
+            reverse("posts:index"),
+            reverse("posts:group_list", kwargs={"slug": self.group.slug}),
+            reverse("posts:profile", kwargs={"username": self.user.username}),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                next_cursor = response.context["page_obj"].next_cursor
+                response = self.client.get(url, {"cursor": next_cursor})
+                self.assertEqual(
+                    list(response.context["page_obj"]), self.expected[10:20]
+                )
@@ -0,0 +1,331 @@
+import datetime
+from http import HTTPStatus
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from mixer.backend.django import mixer
+
+from core import jobs
+
+from .. import timeline
+from ..models import (
+    AuthorStats, Group, GroupStats, Post, PostDay, PostMonth, PostPartition,
+    TimelineEntry, User, archive_model, month_of
+)
+from ..partitions import (
+    PartitionedPaginator, find_archived, locate, month_end, partitioned,
+    roll_over
+)
+from ..search import search_posts
+
+
+def months_ago(count):
+    """Середина месяца count месяцев назад."""
+    now = timezone.now()
+    month = now.month - count - 1
+    return now.replace(
+        year=now.year + month // 12, month=month % 12 + 1, day=15
+    )
+
+
+def walk(paginator):
+    """Все посты ленты, пройденные по курсорам."""
+    page = paginator.get_cursor_page(None)
+    seen = list(page)
+    while page.has_next():
+        page = paginator.get_cursor_page(page.next_cursor)
+        seen.extend(page)
+    return seen
+
+
+class PartitionedPaginatorTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = mixer.blend(User)
+        cls.reader = mixer.blend(User)
+        cls.group = mixer.blend(Group)
+        timeline.follow(cls.reader, cls.author)
+        # 4, 0, 7 и 5 постов в четырёх месяцах подряд, в группе — каждый
+        # второй; посты за два старых месяца уходят в архив
+        for age, count in ((0, 4), (2, 7), (3, 5)):
+            posts = mixer.cycle(count).blend(
+                Post, author=cls.author, group=None
+            )
+            Post.objects.filter(pk__in=[post.pk for post in posts]).update(
+                pub_date=months_ago(age)
+            )
+            Post.objects.filter(
+                pk__in=[post.pk for post in posts[::2]]
+            ).update(group=cls.group)
+        jobs.run_pending()
+        PostMonth.rebuild()
+        PostDay.rebuild()
+        GroupStats.rebuild()
+        cls.expected = [
+            post.pk for post in Post.objects.order_by("-pub_date", "-pk")
+        ]
+        cls.in_group = [
+            post.pk for post in Post.objects.filter(
+                group=cls.group
+            ).order_by("-pub_date", "-pk")
+        ]
+        cls.pub_dates = dict(Post.objects.values_list("pk", "pub_date"))
+        cls.moved = roll_over(month_of(months_ago(1)))
+        cls.archived = cls.expected[4:]
+
+    def setUp(self):
+        cache.clear()
+
+    def pks(self, posts):
+        return [post.pk for post in posts]
+
+    def test_locate(self):
+        """Номер поста ленты переводится в раздел и номер в нём."""
+        months = [("март", 4), ("январь", 7)]
+        self.assertEqual(locate(months, 0), ("март", 0))
+        self.assertEqual(locate(months, 4), ("январь", 0))
+        self.assertEqual(locate(months, 10), ("январь", 6))
+        self.assertIsNone(locate(months, 11))
+
+    def test_month_end(self):
+        """Верхняя граница раздела — начало следующего месяца."""
+        self.assertEqual(
+            month_end(datetime.date(2021, 12, 1)),
+            datetime.datetime(2022, 1, 1, tzinfo=timezone.utc),
+        )
+
+    def test_roll_over_moves_old_posts(self):
+        """Старые посты переходят в таблицы разделов по месяцам."""
+        months = [month_of(months_ago(3)), month_of(months_ago(2))]
+        self.assertEqual(self.moved, dict(zip(months, (5, 7))))
+        self.assertEqual(self.pks(Post.objects.all()), self.expected[:4])
+        for month, count in self.moved.items():
+            model = archive_model(month)
+            self.assertEqual(model._meta.db_table, f"posts_post_{month:%Y_%m}")
+            self.assertEqual(model.objects.count(), count)
+        partition = PostPartition.objects.get(month=months[0])
+        self.assertEqual(
+            (partition.first_id, partition.last_id),
+            (min(self.expected[-5:]), max(self.expected[-5:])),
+        )
+        self.assertFalse(
+            TimelineEntry.objects.filter(post_id__in=self.archived).exists()
+        )
+        # Посты из архива по-прежнему посчитаны
+        self.assertEqual(
+            AuthorStats.objects.get(author=self.author).post_count, 16
+        )
+
+    def test_cursor_pages_cross_partitions(self):
+        """Курсоры проходят горячую таблицу и разделы без пропусков."""
+        paginator = PartitionedPaginator(Post.objects.all(), 3)
+        self.assertEqual(self.pks(walk(paginator)), self.expected)
+        group_paginator = partitioned(group=self.group)(
+            self.group.posts.all(), 3
+        )
+        self.assertEqual(self.pks(walk(group_paginator)), self.in_group)
+        first = paginator.get_cursor_page(None)
+        second = paginator.get_cursor_page(first.next_cursor)
+        third = paginator.get_cursor_page(second.next_cursor)
+        back = paginator.get_cursor_page(third.previous_cursor)
+        self.assertEqual(self.pks(back), self.expected[3:6])
+
+    def test_first_page_skips_partitions(self):
+        """Первая страница из горячей таблицы не читает разделы."""
+        paginator = PartitionedPaginator(Post.objects.all(), 3)
+        # Каталог разделов и посты горячей таблицы
+        with self.assertNumQueries(2):
+            list(paginator.get_cursor_page(None))
+
+    def test_pages_match_whole_feed(self):
+        """Страницы по номеру совпадают с лентой до переноса."""
+        paginator = PartitionedPaginator(Post.objects.all(), 3)
+        self.assertEqual(paginator.num_pages, 6)
+        seen = []
+        for number in paginator.page_range:
+            seen.extend(paginator.page(number))
+        self.assertEqual(self.pks(seen), self.expected)
+
+    def test_pages_with_hot_stragglers(self):
+        """Старый пост в горячей таблице встаёт на своё место в разделе."""
+        straggler = Post.objects.create(text="Импорт", author=self.author)
+        Post.objects.filter(pk=straggler.pk).update(
+            pub_date=months_ago(2) + datetime.timedelta(hours=1)
+        )
+        PostMonth.rebuild()
+        paginator = PartitionedPaginator(Post.objects.all(), 3)
+        seen = []
+        for number in paginator.page_range:
+            seen.extend(paginator.page(number))
+        expected = self.expected[:4] + [straggler.pk] + self.expected[4:]
+        self.assertEqual(self.pks(seen), expected)
+        self.assertEqual(self.pks(walk(paginator)), expected)
+
+    def test_count_from_catalog(self):
+        """Число постов берётся из счётчиков без COUNT(*)."""
+        paginator = PartitionedPaginator(Post.objects.all(), 3)
+        with self.assertNumQueries(1):
+            self.assertEqual(paginator.count, 16)
+        group_paginator = partitioned(group=self.group)(
+            self.group.posts.all(), 3
+        )
+        self.assertEqual(group_paginator.count, len(self.in_group))
+
+    def test_feed_views_read_archive(self):
+        """Страницы index, группы и профиля по номеру доходят до архива."""
+        urls = (
+            reverse("posts:index"),
+            reverse("posts:group_list", args=(self.group.slug,)),
+            reverse("posts:profile", args=(self.author.username,)),
+        )
+        with self.settings(POST_COUNT=5):
+            for url in urls:
+                with self.subTest(url=url):
+                    response = self.client.get(url, {"page": 2})
+                    page_obj = response.context["page_obj"]
+                    self.assertIsInstance(
+                        page_obj.paginator, PartitionedPaginator
+                    )
+                    self.assertTrue(
+                        set(self.pks(page_obj)) & set(self.archived)
+                    )
+            response = self.client.get(reverse("posts:index"), {"page": 3})
+        self.assertEqual(
+            self.pks(response.context["page_obj"]), self.expected[10:15]
+        )
+
+    def test_api_and_rss_read_archive(self):
+        """API и RSS дополняют горячую таблицу постами архива."""
+        with self.settings(POST_COUNT=10):
+            response = self.client.get(
+                reverse("posts:api_index"), {"fields": "id"}
+            )
+        ids = [row["id"] for row in response.json()["results"]]
+        self.assertEqual(ids, self.expected[:10])
+        response = self.client.get(
+            reverse("posts:index_feed", args=("rss",))
+        )
+        self.assertContains(
+            response, reverse("posts:post_detail", args=(self.archived[0],))
+        )
+
+    def test_archive_view_reads_partition(self):
+        """Архив за месяц выводит посты раздела."""
+        date = months_ago(3)
+        response = self.client.get(
+            reverse("posts:index_archive", args=(date.year, date.month))
+        )
+        self.assertEqual(
+            self.pks(response.context["page_obj"]), self.expected[-5:]
+        )
+
+    def test_timeline_reads_archive(self):
+        """Лента подписок продолжается постами из архива."""
+        self.client.force_login(self.reader)
+        with self.settings(POST_COUNT=6):
+            response = self.client.get(reverse("posts:follow_index"))
+        self.assertEqual(
+            self.pks(response.context["page_obj"]), self.expected[:6]
+        )
+
+    def test_post_detail_from_archive(self):
+        """Пост из архива открывается по прежнему адресу."""
+        post_id = self.archived[0]
+        response = self.client.get(
+            reverse("posts:post_detail", args=(post_id,))
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(response.context["post"].pk, post_id)
+        etag = response["ETag"]
+        response = self.client.get(
+            reverse("posts:post_detail", args=(post_id,)),
+            HTTP_IF_NONE_MATCH=etag,
+        )
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+        response = self.client.get(
+            reverse("posts:api_post_detail", args=(post_id,))
+        )
+        self.assertEqual(response.json()["id"], post_id)
+
+    def test_edit_restores_post(self):
+        """Правка поста из архива возвращает его в горячую таблицу."""
+        post_id = self.archived[0]
+        self.client.force_login(self.author)
+        url = reverse("posts:post_edit", args=(post_id,))
+        self.assertEqual(self.client.get(url).status_code, HTTPStatus.OK)
+        self.assertIsNotNone(find_archived(post_id))
+        self.client.post(url, {"text": "Исправлено", "group": self.group.pk})
+        self.assertIsNone(find_archived(post_id))
+        post = Post.objects.get(pk=post_id)
+        self.assertEqual(post.text, "Исправлено")
+        self.assertEqual(post.pub_date, self.pub_dates[post_id])
+        self.assertEqual(
+            AuthorStats.objects.get(author=self.author).post_count, 16
+        )
+        self.assertEqual(len(search_posts("Исправлено")), 1)
+
+    def test_search_finds_archived_posts(self):
+        """Поиск находит посты в горячей таблице и в архиве."""
+        archived = archive_model(month_of(months_ago(2))).objects.first()
+        word = archived.text.split()[0]
+        results = search_posts(word)
+        self.assertGreaterEqual(len(results), 1)
+        self.assertIn(archived.pk, self.pks(results[0:20]))
+
+    def test_delete_author_deletes_archived_posts(self):
+        """Удаление автора удаляет его посты из архива и из счётчиков."""
+        User.objects.get(pk=self.author.pk).delete()
+        for month in self.moved:
+            self.assertFalse(archive_model(month).objects.exists())
+        self.assertEqual(PostMonth.objects.filter(post_count__gt=0).count(), 0)
+        self.assertFalse(PostDay.objects.filter(post_count__gt=0).exists())
+
+    def test_delete_group_detaches_archived_posts(self):
+        """Удаление группы убирает её из постов архива."""
+        Group.objects.get(pk=self.group.pk).delete()
+        for month in self.moved:
+            self.assertFalse(
+                archive_model(month).objects.exclude(group=None).exists()
+            )
+
+    def test_recount_includes_archive(self):
+        """recount_posts считает посты архивных разделов."""
+        PostMonth.objects.all().delete()
+        AuthorStats.objects.filter(author=self.author).update(post_count=0)
+        call_command("recount_posts", stdout=StringIO())
+        self.assertEqual(
+            list(
+                PostMonth.objects.order_by("-month").values_list(
+                    "post_count", flat=True
+                )
+            ),
+            [4, 7, 5],
+        )
+        self.assertEqual(
+            AuthorStats.objects.get(author=self.author).post_count, 16
+        )
+        self.assertEqual(
+            GroupStats.objects.get(group=self.group).post_count,
+            len(self.in_group),
+        )
+
+    @override_settings(POST_HOT_MONTHS=1)
+    def test_rollover_command(self):
+        """rollover_posts оставляет в горячей таблице текущий месяц."""
+        Post.objects.filter(pk=self.expected[0]).update(
+            pub_date=months_ago(1)
+        )
+        out = StringIO()
+        call_command("rollover_posts", stdout=out)
+        self.assertIn("перенесено постов: 1", out.getvalue())
+        self.assertEqual(Post.objects.count(), 3)
+        expected = self.expected[1:4] + self.expected[:1] + self.archived
+        self.assertEqual(
+            self.pks(walk(PartitionedPaginator(Post.objects.all(), 5))),
+            expected,
+        )
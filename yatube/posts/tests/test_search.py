@@ -0,0 +1,64 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from mixer.backend.django import mixer
+
+from ..models import Post, User
+from ..search import search_posts, to_match_query
+
+
+class PostSearchTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = mixer.blend(User)
+        cls.weather = Post.objects.create(
+            text="Сегодня отличная погода для прогулки", author=cls.author
+        )
+        cls.coffee = Post.objects.create(
+            text="Кофе и погода, погода и кофе", author=cls.author
+        )
+        mixer.cycle(5).blend(Post, author=cls.author, text="Про кино")
+
+    def setUp(self):
+        cache.clear()
+
+    def test_search_ranks_and_highlights(self):
+        """Поиск находит посты по префиксу слова и подсвечивает совпадения."""
+        results = search_posts("погод")
+        self.assertEqual(len(results), 2)
+        posts = results[0:10]
+        self.assertEqual(posts[0], self.coffee)
+        self.assertIn("<mark>погода</mark>", posts[0].snippet)
+
+    def test_index_follows_edit_and_delete(self):
+        """Индекс обновляется при изменении и удалении поста."""
+        weather = Post.objects.get(pk=self.weather.pk)
+        weather.text = "Сегодня дождь"
+        weather.save()
+        self.assertEqual(len(search_posts("дождь")), 1)
+        self.assertEqual(len(search_posts("погода")), 1)
+        Post.objects.filter(pk=self.coffee.pk).delete()
+        self.assertEqual(len(search_posts("погода")), 0)
+
+    def test_query_syntax_is_not_interpreted(self):
+        """Операторы FTS5 в запросе не приводят к ошибке."""
+        self.assertEqual(
+            to_match_query('кофе" OR NEAR('), '"кофе"* "OR"* "NEAR"*'
+        )
+        self.assertEqual(len(search_posts('"')), 0)
+
+    def test_search_page(self):
+        """Страница поиска выводит найденные посты с подсветкой."""
+        response = self.client.get(reverse("posts:search"), {"q": "кофе"})
+        self.assertEqual(response.context["page_obj"].paginator.count, 1)
+        self.assertContains(response, "<mark>Кофе</mark>")
+
+    def test_admin_search_uses_index(self):
+        """Поиск в админке находит посты через индекс."""
+        admin = User.objects.create_superuser("admin", "a@a.ru", "pass")
+        self.client.force_login(admin)
+        response = self.client.get(
+            reverse("admin:posts_post_changelist"), {"q": "прогулк"}
+        )
+        self.assertEqual(response.context["cl"].result_count, 1)
@@ -0,0 +1,154 @@
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from mixer.backend.django import mixer
+
+from core import jobs
+
+from .. import timeline
+from ..models import AuthorStats, Follow, Post, TimelineEntry, User
+
+
+class FollowViewsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = mixer.blend(User)
+        cls.reader = mixer.blend(User)
+        cls.post = Post.objects.create(text="Старый пост", author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.reader)
+
+    def follow_url(self, action, user):
+        return reverse(f"posts:{action}", kwargs={"username": user.username})
+
+    def test_follow_and_unfollow(self):
+        """Подписка переносит посты автора в ленту, отписка — убирает."""
+        self.client.get(self.follow_url("profile_follow", self.author))
+        self.assertTrue(
+            Follow.objects.filter(user=self.reader, author=self.author)
+        )
+        self.assertEqual(self.author.stats.follower_count, 1)
+        response = self.client.get(reverse("posts:follow_index"))
+        self.assertIn(self.post, response.context["page_obj"])
+        self.client.get(self.follow_url("profile_unfollow", self.author))
+        self.assertFalse(Follow.objects.exists())
+        self.assertFalse(TimelineEntry.objects.exists())
+        self.assertEqual(
+            AuthorStats.objects.get(author=self.author).follower_count, 0
+        )
+
+    def test_cannot_follow_self_or_twice(self):
+        """Подписка на себя и повторная подписка не создаются."""
+        self.client.get(self.follow_url("profile_follow", self.reader))
+        self.client.get(self.follow_url("profile_follow", self.author))
+        self.client.get(self.follow_url("profile_follow", self.author))
+        self.assertEqual(Follow.objects.count(), 1)
+        self.assertEqual(self.author.stats.follower_count, 1)
+
+    def test_new_post_reaches_only_followers(self):
+        """Новый пост появляется в ленте подписчика и только в ней."""
+        timeline.follow(self.reader, self.author)
+        other = Client()
+        other.force_login(mixer.blend(User))
+        new_post = Post.objects.create(text="Новый пост", author=self.author)
+        jobs.run_pending()
+        response = self.client.get(reverse("posts:follow_index"))
+        self.assertEqual(response.context["page_obj"][0], new_post)
+        response = other.get(reverse("posts:follow_index"))
+        self.assertEqual(len(response.context["page_obj"]), 0)
+
+    def test_profile_shows_follow_state(self):
+        """Кнопка подписки на профиле меняется после подписки."""
+        url = reverse(
+            "posts:profile", kwargs={"username": self.author.username}
+        )
+        self.assertContains(self.client.get(url), "Подписаться")
+        timeline.follow(self.reader, self.author)
+        response = self.client.get(url)
+        self.assertContains(response, "Отписаться")
+        self.assertContains(response, "Подписчиков: 1")
+
+
+@override_settings(TIMELINE_FANOUT_LIMIT=1, POST_COUNT=3)
+class HybridTimelineTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = mixer.blend(User)
+        cls.author = mixer.blend(User)
+        cls.popular = mixer.blend(User)
+
+    def setUp(self):
+        cache.clear()
+        timeline.follow(self.reader, self.author)
+        timeline.follow(self.reader, self.popular)
+        timeline.follow(mixer.blend(User), self.popular)
+
+    def create_posts(self):
+        posts = [
+            Post.objects.create(text=str(i), author=author)
+            for i in range(4)
+            for author in (self.author, self.popular)
+        ]
+        jobs.run_pending()
+        return posts
+
+    def test_popular_author_is_read_on_request(self):
+        """Посты автора с большим числом подписчиков не копируются."""
+        self.create_posts()
+        self.assertFalse(
+            TimelineEntry.objects.filter(post__author=self.popular)
+        )
+        self.assertEqual(
+            TimelineEntry.objects.filter(user=self.reader).count(), 4
+        )
+
+    def test_cursor_pages_merge_both_sources(self):
+        """Курсоры проходят по слитой ленте без пропусков и повторов."""
+        posts = self.create_posts()
+        paginator = timeline.TimelinePaginator(self.reader, 3)
+        page = paginator.get_cursor_page(None)
+        seen = list(page)
+        while page.has_next():
+            page = paginator.get_cursor_page(page.next_cursor)
+            seen += list(page)
+        expected = sorted(
+            posts, key=lambda post: (post.pub_date, post.pk), reverse=True
+        )
+        self.assertEqual(seen, expected)
+        back = paginator.get_cursor_page(page.previous_cursor)
+        self.assertEqual(list(back), expected[3:6])
+
+    def test_unfollow_below_limit_restores_fan_out(self):
+        """Когда подписчиков становится не больше лимита, посты копируются."""
+        self.create_posts()
+        timeline.unfollow(self.reader, self.popular)
+        timeline.follow(self.reader, self.popular)
+        self.assertFalse(
+            TimelineEntry.objects.filter(
+                user=self.reader, post__author=self.popular
+            )
+        )
+        follower = Follow.objects.exclude(user=self.reader).get(
+            author=self.popular
+        ).user
+        timeline.unfollow(self.reader, self.popular)
+        self.assertEqual(
+            TimelineEntry.objects.filter(
+                user=follower, post__author=self.popular
+            ).count(),
+            4,
+        )
+
+    def test_follow_feed_is_range_lookup(self):
+        """Лента подписок не делает запросов на каждый пост."""
+        self.create_posts()
+        client = Client()
+        client.force_login(self.reader)
+        # Сессия и пользователь, авторы для чтения, записи ленты, посты,
+        # каталог архивных разделов
+        with self.assertNumQueries(6):
+            client.get(reverse("posts:follow_index"))
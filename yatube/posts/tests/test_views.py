@@ -1,12 +1,18 @@
 import datetime
+from http import HTTPStatus
 
 from django import forms
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
 from django.forms.models import model_to_dict
-from django.test import Client, TestCase
+from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 from mixer.backend.django import mixer
 
+from core import jobs
+
+from .. import caching
 from ..models import Group, Post, User
 
 User = get_user_model()
@@ -33,6 +39,7 @@ class PostPagesTests(TestCase):
         cls.test_post.save()
 
     def setUp(self):
+        cache.clear()
         self.guest_client = Client()
         self.authorized_client_author = Client()
         self.authorized_client_author.force_login(self.test_author)
@@ -204,3 +211,239 @@ class PostPagesTests(TestCase):
             reverse("posts:group_list", kwargs={"slug": self.group_1.slug})
         )
         self.assertNotIn(new_post, response.context["page_obj"])
+
+
+class FeedQueryBudgetTests(TestCase):
+    # Запросов на страницу ленты, независимо от числа постов на ней;
+    # в лентах один из них — к каталогу архивных разделов
+    QUERY_BUDGET = {
+        "posts:index": 3,
+        "posts:group_list": 4,
+        "posts:profile": 4,
+        "posts:post_detail": 3,
+    }
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.group = mixer.blend(Group)
+        cls.author = mixer.blend(User)
+        for _ in range(25):
+            mixer.blend(Post, author=mixer.blend(User), group=cls.group)
+            mixer.blend(Post, author=cls.author, group=mixer.blend(Group))
+        cls.post = Post.objects.filter(author=cls.author).first()
+
+    def setUp(self):
+        cache.clear()
+
+    def test_feed_views_fit_query_budget(self):
+        """Ленты не делают запросов на каждый пост (нет N+1)."""
+        urls = {
+            "posts:index": reverse("posts:index"),
+            "posts:group_list": reverse(
+                "posts:group_list", kwargs={"slug": self.group.slug}
+            ),
+            "posts:profile": reverse(
+                "posts:profile", kwargs={"username": self.author.username}
+            ),
+            "posts:post_detail": reverse(
+                "posts:post_detail", kwargs={"post_id": self.post.id}
+            ),
+        }
+        for name, url in urls.items():
+            for query in ({}, {"page": 2}):
+                with self.subTest(url=url, query=query):
+                    with self.assertNumQueries(self.QUERY_BUDGET[name]):
+                        self.client.get(url, query)
+
+
+class GroupIndexTests(TestCase):
+    def test_group_index_is_one_query(self):
+        """Каталог групп строится одним запросом со статистикой."""
+        author = mixer.blend(User)
+        for group in mixer.cycle(5).blend(Group):
+            mixer.cycle(2).blend(Post, author=author, group=group)
+        mixer.blend(Group)
+        jobs.run_pending()
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("posts:group_index"))
+        self.assertEqual(len(response.context["groups"]), 6)
+        self.assertContains(response, "Постов: 2", count=5)
+        self.assertContains(response, "Постов: 0", count=1)
+
+
+class FeedCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = mixer.blend(User)
+        cls.group = mixer.blend(Group)
+        cls.other_group = mixer.blend(Group)
+        cls.post = Post.objects.create(
+            text="Текст поста", author=cls.author, group=cls.group
+        )
+        cls.group_url = reverse(
+            "posts:group_list", kwargs={"slug": cls.group.slug}
+        )
+        cls.other_group_url = reverse(
+            "posts:group_list", kwargs={"slug": cls.other_group.slug}
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_second_request_is_served_from_cache(self):
+        """Повторный запрос страницы отдаётся из кеша без запросов к БД."""
+        first = self.client.get(reverse("posts:index"))
+        with self.assertNumQueries(0):
+            second = self.client.get(reverse("posts:index"))
+        self.assertEqual(first["X-Feed-Cache"], "miss")
+        self.assertEqual(second["X-Feed-Cache"], "hit")
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(caching.get_stats(), {"hits": 1, "misses": 1})
+
+    def test_new_post_invalidates_only_its_scopes(self):
+        """Новый пост сбрасывает кеш своей группы, но не чужой."""
+        self.client.get(self.group_url)
+        self.client.get(self.other_group_url)
+        Post.objects.create(text="Новый", author=self.author, group=self.group)
+        response = self.client.get(self.group_url)
+        self.assertEqual(response["X-Feed-Cache"], "miss")
+        self.assertContains(response, "Новый")
+        response = self.client.get(self.other_group_url)
+        self.assertEqual(response["X-Feed-Cache"], "hit")
+
+    def test_edit_invalidates_old_and_new_group(self):
+        """Перенос поста в другую группу сбрасывает кеш обеих групп."""
+        self.client.get(self.group_url)
+        self.client.get(self.other_group_url)
+        client = Client()
+        client.force_login(self.author)
+        client.post(
+            reverse("posts:post_edit", kwargs={"post_id": self.post.id}),
+            data={"text": "Перенесённый пост", "group": self.other_group.id},
+        )
+        response = self.client.get(self.group_url)
+        self.assertNotContains(response, "Перенесённый пост")
+        response = self.client.get(self.other_group_url)
+        self.assertContains(response, "Перенесённый пост")
+
+    def test_authorized_user_is_not_cached(self):
+        """Страницы авторизованных пользователей не кешируются."""
+        client = Client()
+        client.force_login(self.author)
+        client.get(reverse("posts:index"))
+        response = client.get(reverse("posts:index"))
+        self.assertFalse(response.has_header("X-Feed-Cache"))
+
+
+class PostFragmentCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = mixer.blend(User)
+        cls.post = Post.objects.create(text="Старый текст", author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.author)
+
+    def fragment_key(self, post):
+        return make_template_fragment_key(
+            "post_text", [post.pk, post.modified.isoformat()]
+        )
+
+    def test_post_card_is_shared_between_pages(self):
+        """Карточка поста кешируется один раз для ленты и страницы поста."""
+        self.authorized_client.get(reverse("posts:index"))
+        self.assertIsNotNone(cache.get(self.fragment_key(self.post)))
+        response = self.authorized_client.get(
+            reverse("posts:post_detail", kwargs={"post_id": self.post.id})
+        )
+        self.assertContains(response, "Старый текст")
+
+    def test_edit_replaces_post_fragment(self):
+        """Редактирование поста меняет ключ его фрагмента."""
+        detail_url = reverse(
+            "posts:post_detail", kwargs={"post_id": self.post.id}
+        )
+        self.authorized_client.get(detail_url)
+        self.authorized_client.post(
+            reverse("posts:post_edit", kwargs={"post_id": self.post.id}),
+            data={"text": "Новый текст"},
+        )
+        edited = Post.objects.get(pk=self.post.pk)
+        self.assertNotEqual(edited.modified, self.post.modified)
+        self.assertIsNone(cache.get(self.fragment_key(edited)))
+        response = self.authorized_client.get(detail_url)
+        self.assertContains(response, "Новый текст")
+        self.assertIsNotNone(cache.get(self.fragment_key(edited)))
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = mixer.blend(User)
+        cls.post = Post.objects.create(text="Текст поста", author=cls.author)
+        cls.detail_url = reverse(
+            "posts:post_detail", kwargs={"post_id": cls.post.id}
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def assert_not_modified_until_new_post(self, url):
+        response = self.client.get(url)
+        etag = response["ETag"]
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+        Post.objects.create(text="Новый пост", author=self.author)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_feed_answers_not_modified(self):
+        """Ленты отвечают 304, пока посты на странице не изменились."""
+        urls = (
+            reverse("posts:index"),
+            reverse("posts:profile", kwargs={"username": self.author}),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                self.assert_not_modified_until_new_post(url)
+
+    @override_settings(FEED_CACHE_INDEX_PAGES=0)
+    def test_uncached_page_etag_uses_page_rows(self):
+        """Для некешируемых страниц ETag строится по постам страницы."""
+        self.assert_not_modified_until_new_post(
+            reverse("posts:index") + "?page=1"
+        )
+
+    def test_etag_depends_on_user(self):
+        """ETag ленты различается для разных пользователей."""
+        client = Client()
+        client.force_login(self.author)
+        self.assertNotEqual(
+            self.client.get(reverse("posts:index"))["ETag"],
+            client.get(reverse("posts:index"))["ETag"],
+        )
+
+    def test_post_detail_uses_modified(self):
+        """post_detail отвечает 304 до редактирования поста."""
+        response = self.client.get(self.detail_url)
+        last_modified = response["Last-Modified"]
+        response = self.client.get(
+            self.detail_url, HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+        client = Client()
+        client.force_login(self.author)
+        client.post(
+            reverse("posts:post_edit", kwargs={"post_id": self.post.id}),
+            data={"text": "Изменённый текст"},
+        )
+        response = self.client.get(
+            self.detail_url, HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
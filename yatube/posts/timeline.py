@@ -0,0 +1,182 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.functional import cached_property
+
+from . import caching
+from .models import (
+    AuthorStats, Follow, Post, PostQuerySet, TimelineEntry, archive_model
+)
+from .paginators import PREVIOUS, CursorPaginator, keyset
+from .partitions import get_partitions, merge_archive
+
+BATCH_SIZE = 1000
+
+
+def follower_count(author_id):
+    return AuthorStats.objects.filter(author_id=author_id).values_list(
+        "follower_count", flat=True
+    ).first() or 0
+
+
+def is_fanned_out(count):
+    """Раскладываются ли посты автора с count подписчиками при записи."""
+    return count <= settings.TIMELINE_FANOUT_LIMIT
+
+
+def add_entries(user_ids, posts):
+    """Добавляет посты (id, pub_date) в ленты пользователей."""
+    TimelineEntry.objects.bulk_create(
+        (
+            TimelineEntry(user_id=user_id, post_id=post_id, pub_date=pub_date)
+            for user_id in user_ids
+            for post_id, pub_date in posts
+        ),
+        batch_size=BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def backfill(user_ids, author_id):
+    """Переносит в ленты последние TIMELINE_BACKFILL постов автора."""
+    posts = list(
+        Post.objects.filter(author_id=author_id).order_by(
+            "-pub_date", "-pk"
+        ).values_list("pk", "pub_date")[:settings.TIMELINE_BACKFILL]
+    )
+    if posts:
+        add_entries(user_ids, posts)
+
+
+def fan_out(posts):
+    """
+    Раскладывает посты по лентам подписчиков их авторов.
+    Посты авторов с числом подписчиков больше TIMELINE_FANOUT_LIMIT
+    не копируются: TimelinePaginator читает их из Post.
+    """
+    by_author = defaultdict(list)
+    for post in posts:
+        by_author[post.author_id].append((post.pk, post.pub_date))
+    authors = AuthorStats.objects.filter(
+        author_id__in=by_author,
+        follower_count__gt=0,
+        follower_count__lte=settings.TIMELINE_FANOUT_LIMIT,
+    ).values_list("author_id", flat=True)
+    followers = defaultdict(list)
+    for author_id, user_id in Follow.objects.filter(
+        author_id__in=list(authors)
+    ).values_list("author_id", "user_id"):
+        followers[author_id].append(user_id)
+    for author_id, user_ids in followers.items():
+        add_entries(user_ids, by_author[author_id])
+
+
+def follow(user, author):
+    """
+    Подписывает user на author. Возвращает False, если подписка
+    уже есть или пользователь подписывается на себя.
+    """
+    if user.pk == author.pk:
+        return False
+    with transaction.atomic():
+        _, created = Follow.objects.get_or_create(
+            user=user, author=author
+        )
+        if not created:
+            return False
+        AuthorStats.add_follower(author.pk)
+        if is_fanned_out(follower_count(author.pk)):
+            backfill([user.pk], author.pk)
+    caching.invalidate(caching.profile_scope(author.username))
+    return True
+
+
+def unfollow(user, author):
+    """Отменяет подписку. Возвращает False, если её не было."""
+    with transaction.atomic():
+        deleted, _ = Follow.objects.filter(user=user, author=author).delete()
+        if not deleted:
+            return False
+        AuthorStats.remove_follower(author.pk)
+        TimelineEntry.objects.filter(user=user, post__author=author).delete()
+        if follower_count(author.pk) == settings.TIMELINE_FANOUT_LIMIT:
+            # Автор снова раскладывается при записи: в лентах нет постов,
+            # которые читались из Post, пока подписчиков было больше
+            backfill(
+                Follow.objects.filter(author=author).values_list(
+                    "user_id", flat=True
+                ),
+                author.pk,
+            )
+    caching.invalidate(caching.profile_scope(author.username))
+    return True
+
+
+class TimelinePaginator(CursorPaginator):
+    """
+    Лента подписок пользователя, только по курсорам.
+
+    Посты обычных авторов читаются одним диапазоном индекса
+    (user, -pub_date, -post) таблицы TimelineEntry вместе с автором
+    и группой. Посты авторов, которые не раскладываются при записи,
+    читаются из Post по индексу (author, -pub_date, -id) и сливаются
+    с лентой по (pub_date, id). Посты всех подписок, перенесённые
+    в архивные разделы, добавляются так же, когда страница доходит
+    до месяца раздела.
+    """
+
+    ENTRY_FIELDS = ("pub_date", "post") + tuple(
+        f"post__{field}" for field in PostQuerySet.FEED_FIELDS
+    )
+
+    def __init__(self, user, per_page, **kwargs):
+        super().__init__(Post.objects.none(), per_page, **kwargs)
+        self.user = user
+
+    @cached_property
+    def read_authors(self):
+        """Авторы подписок, чьи посты добавляются при чтении."""
+        return list(
+            Follow.objects.filter(
+                user=self.user,
+                author__stats__follower_count__gt=(
+                    settings.TIMELINE_FANOUT_LIMIT
+                ),
+            ).values_list("author_id", flat=True)
+        )
+
+    def cursor_rows(self, direction, pub_date=None, pk=None):
+        limit = self.per_page + 1
+        entries = keyset(
+            TimelineEntry.objects.filter(user=self.user),
+            direction, pub_date, pk, pk_field="post_id",
+        ).select_related("post__author", "post__group").only(
+            *self.ENTRY_FIELDS
+        )
+        posts = {entry.post_id: entry.post for entry in entries[:limit]}
+        if self.read_authors:
+            extra = keyset(
+                Post.objects.feed().filter(author_id__in=self.read_authors),
+                direction, pub_date, pk,
+            )
+            posts.update((post.pk, post) for post in extra[:limit])
+        rows = sorted(
+            posts.values(),
+            key=lambda post: (post.pub_date, post.pk),
+            reverse=direction != PREVIOUS,
+        )
+        return merge_archive(
+            rows[:limit], limit, self.partitions, self.archive_queryset,
+            direction, pub_date, pk,
+        )
+
+    @cached_property
+    def partitions(self):
+        return get_partitions()
+
+    def archive_queryset(self, month):
+        """Посты подписок пользователя в архивном разделе month."""
+        return archive_model(month).objects.feed().filter(
+            author__following__user=self.user
+        )
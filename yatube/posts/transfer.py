@@ -0,0 +1,245 @@
+import contextlib
+import csv
+import json
+from collections import Counter
+from itertools import chain, islice
+
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import caching, timeline
+from .models import (
+    AuthorStats, Group, GroupStats, Post, PostDay, PostMonth, User, day_of,
+    month_of, post_models
+)
+
+FIELDS = ("text", "pub_date", "modified", "author", "group")
+FORMATS = ("jsonl", "csv")
+
+
+def guess_format(path, default="jsonl"):
+    if path.endswith(".csv"):
+        return "csv"
+    if path.endswith((".jsonl", ".json")):
+        return "jsonl"
+    return default
+
+
+def export_rows(chunk_size):
+    """
+    Посты горячей таблицы и архивных разделов в виде словарей,
+    без загрузки таблиц в память.
+    """
+    rows = chain.from_iterable(
+        model.objects.order_by("pk").values_list(
+            "text", "pub_date", "modified", "author__username", "group__slug"
+        ).iterator(chunk_size)
+        for model in post_models()
+    )
+    for text, pub_date, modified, author, group in rows:
+        yield {
+            "text": text,
+            "pub_date": pub_date.isoformat(),
+            "modified": modified.isoformat(),
+            "author": author,
+            "group": group,
+        }
+
+
+def write_rows(stream, fmt, rows):
+    count = 0
+    if fmt == "csv":
+        writer = csv.DictWriter(stream, fieldnames=FIELDS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+        return count
+    for row in rows:
+        stream.write(json.dumps(row, ensure_ascii=False))
+        stream.write("\n")
+        count += 1
+    return count
+
+
+def read_rows(stream, fmt, on_error=None):
+    """
+    Строки файла в виде словарей. Вместо строки JSON Lines, которая
+    не разбирается или не является объектом, отдаётся None, а
+    on_error(номер строки, ошибка) сообщает о ней.
+    """
+    if fmt == "csv":
+        for row in csv.DictReader(stream):
+            yield {key: value or None for key, value in row.items()}
+        return
+    for number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as error:
+            row, message = None, error.msg
+        else:
+            message = "ожидался объект JSON"
+        if not isinstance(row, dict):
+            if on_error is not None:
+                on_error(number, message)
+            row = None
+        yield row
+
+
+def chunked(rows, size):
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+@contextlib.contextmanager
+def keep_dates():
+    """
+    bulk_create вызывает pre_save полей, и auto_now_add/auto_now
+    затирают даты из файла. На время импорта они отключаются.
+    """
+    fields = [
+        Post._meta.get_field("pub_date"),
+        Post._meta.get_field("modified"),
+    ]
+    saved = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, saved):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Lookup:
+    """
+    Отображение username/slug -> id в памяти. Недостающие ключи
+    загружаются одним запросом на пачку строк.
+    """
+
+    def __init__(self, model, field):
+        self.model = model
+        self.field = field
+        self.ids = {}
+
+    def load(self, keys):
+        missing = set(keys) - self.ids.keys() - {None}
+        if missing:
+            filters = {f"{self.field}__in": missing}
+            self.ids.update(
+                self.model.objects.filter(**filters).values_list(
+                    self.field, "pk"
+                )
+            )
+
+    def get(self, key):
+        return self.ids.get(key)
+
+
+def parse_date(value, default):
+    if not value:
+        return default
+    if not isinstance(value, str):
+        raise ValueError(value)
+    date = parse_datetime(value)
+    if date is None:
+        raise ValueError(value)
+    if timezone.is_naive(date):
+        date = timezone.make_aware(date)
+    return date
+
+
+def count_posts(posts):
+    """Учитывает созданные посты в статистике авторов, групп и дат."""
+    per_author = Counter(post.author_id for post in posts)
+    for author_id, count in per_author.items():
+        AuthorStats.increment(author_id, count)
+    per_month = Counter(month_of(post.pub_date) for post in posts)
+    for month, count in per_month.items():
+        PostMonth.increment(month, count)
+    per_day = Counter(
+        (day_of(post.pub_date), *scope)
+        for post in posts
+        for scope in PostDay.scopes(post.group_id, post.author_id)
+    )
+    for (day, group_id, author_id), count in per_day.items():
+        PostDay.increment(day, group_id, author_id, count)
+    per_group = {}
+    for post in posts:
+        if post.group_id is None:
+            continue
+        key = (post.group_id, post.author_id)
+        count, latest = per_group.get(key, (0, post.pub_date))
+        per_group[key] = (count + 1, max(latest, post.pub_date))
+    for (group_id, author_id), (count, latest) in per_group.items():
+        GroupStats.add_posts(group_id, author_id, count, latest)
+
+
+def import_rows(rows, batch_size):
+    """
+    Создаёт посты пачками bulk_create, каждая пачка — в своей
+    транзакции. После каждой пачки возвращает (создано, пропущено).
+    Строки, которые не являются словарями, пропускаются.
+    Сигналы при bulk_create не отправляются, поэтому статистика авторов
+    и групп, ленты подписок и кеш лент обновляются здесь же.
+    """
+    authors = Lookup(User, "username")
+    groups = Lookup(Group, "slug")
+    with keep_dates():
+        for chunk in chunked(rows, batch_size):
+            skipped = len(chunk)
+            chunk = [row for row in chunk if isinstance(row, dict)]
+            skipped -= len(chunk)
+            authors.load(row.get("author") for row in chunk)
+            groups.load(row.get("group") for row in chunk)
+            now = timezone.now()
+            posts = []
+            for row in chunk:
+                author_id = authors.get(row.get("author"))
+                if author_id is None or not row.get("text"):
+                    skipped += 1
+                    continue
+                try:
+                    pub_date = parse_date(row.get("pub_date"), now)
+                    modified = parse_date(row.get("modified"), pub_date)
+                except ValueError:
+                    skipped += 1
+                    continue
+                posts.append(Post(
+                    text=row["text"],
+                    pub_date=pub_date,
+                    modified=modified,
+                    author_id=author_id,
+                    group_id=groups.get(row.get("group")),
+                ))
+            with transaction.atomic():
+                last_pk = Post.objects.aggregate(last=Max("pk"))["last"] or 0
+                # Размер INSERT подбирает Django с учётом лимитов СУБД
+                Post.objects.bulk_create(posts)
+                # SQLite не возвращает id созданных строк
+                timeline.fan_out(
+                    Post.objects.filter(pk__gt=last_pk).only(
+                        "author", "pub_date"
+                    )
+                )
+                count_posts(posts)
+            caching.invalidate(
+                caching.index_scope(),
+                *{
+                    caching.profile_scope(row["author"])
+                    for row in chunk if authors.get(row.get("author"))
+                },
+                *{
+                    caching.group_scope(row["group"])
+                    for row in chunk if groups.get(row.get("group"))
+                },
+            )
+            yield len(posts), skipped
@@ -1,14 +1,71 @@
 from django.urls import path
 
-from . import views
+from . import api, archive, feeds, views
 
 app_name = "posts"
 
+# Архив: весь, за год, за месяц и за день
+ARCHIVE_PERIODS = (
+    "",
+    "<int:year>/",
+    "<int:year>/<int:month>/",
+    "<int:year>/<int:month>/<int:day>/",
+)
+
 urlpatterns = [
     path("", views.index, name="index"),
+    path("group/", views.group_index, name="group_index"),
     path("group/<slug:slug>/", views.group_posts, name="group_list"),
     path("profile/<str:username>/", views.profile, name="profile"),
     path("posts/<int:post_id>/", views.post_detail, name="post_detail"),
+    path("search/", views.search, name="search"),
+    path("follow/", views.follow_index, name="follow_index"),
+    path(
+        "profile/<str:username>/follow/",
+        views.profile_follow,
+        name="profile_follow",
+    ),
+    path(
+        "profile/<str:username>/unfollow/",
+        views.profile_unfollow,
+        name="profile_unfollow",
+    ),
     path("create/", views.post_create, name="post_create"),
+    path("feeds/<str:feed_format>/", feeds.index_feed, name="index_feed"),
+    path(
+        "feeds/<str:feed_format>/group/<slug:slug>/",
+        feeds.group_feed,
+        name="group_feed",
+    ),
+    path(
+        "feeds/<str:feed_format>/profile/<str:username>/",
+        feeds.profile_feed,
+        name="profile_feed",
+    ),
+    path("api/posts/", api.index, name="api_index"),
+    path("api/group/<slug:slug>/", api.group_posts, name="api_group_list"),
+    path("api/profile/<str:username>/", api.profile, name="api_profile"),
+    path(
+        "api/posts/<int:post_id>/", api.post_detail, name="api_post_detail"
+    ),
     path("posts/<int:post_id>/edit/", views.post_edit, name="post_edit"),
 ]
+
+for period in ARCHIVE_PERIODS:
+    urlpatterns += [
+        path(
+            f"archive/{period}",
+            archive.index_archive,
+            name="index_archive",
+        ),
+        path(
+            f"group/<slug:slug>/archive/{period}",
+            archive.group_archive,
+            name="group_archive",
+        ),
+        path(
+            f"profile/<str:username>/archive/{period}",
+            archive.profile_archive,
+            name="profile_archive",
+        ),
+    ]
@@ -1,29 +1,38 @@
 from django.conf import settings
 from django.core.paginator import Paginator
+from django.http import Http404
 from django.shortcuts import get_object_or_404, redirect, render
 from django.contrib.auth.decorators import login_required
 
+from core.routers import replica_reads
+
+from . import caching, conditional, partitions, tasks, timeline
 from .forms import PostForm
-from .models import Group, Post, User
+from .models import AuthorStats, Follow, Group, Post, PostQuerySet, User
+from .paginators import get_page_obj
+from .partitions import PartitionedPaginator, partitioned
+from .search import search_posts
 
 
+@replica_reads
+@conditional.index_condition
+@caching.cache_feed(caching.index_scope)
 def index(request):
-    post_list = Post.objects.all()
-    paginator = Paginator(post_list, settings.POST_COUNT)
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
+    post_list = Post.objects.feed()
+    page_obj = get_page_obj(request, post_list, PartitionedPaginator)
     context = {
         "page_obj": page_obj,
     }
     return render(request, "posts/index.html", context)
 
 
+@replica_reads
+@conditional.group_condition
+@caching.cache_feed(caching.group_scope)
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
-    post_list = group.posts.all()
-    paginator = Paginator(post_list, settings.POST_COUNT)
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
+    post_list = group.posts.feed()
+    page_obj = get_page_obj(request, post_list, partitioned(group=group))
     context = {
         "group": group,
         "page_obj": page_obj,
@@ -31,24 +40,58 @@ def group_posts(request, slug):
     return render(request, "posts/group_list.html", context)
 
 
+def group_index(request):
+    # Один запрос: статистика групп хранится в GroupStats
+    groups = Group.objects.select_related("stats").order_by("title")
+    context = {
+        "groups": groups,
+    }
+    return render(request, "posts/group_index.html", context)
+
+
+@replica_reads
+@conditional.profile_condition
+@caching.cache_feed(caching.profile_scope)
 def profile(request, username):
-    user_profile = get_object_or_404(User, username=username)
-    post_list = user_profile.posts.all()
-    paginator = Paginator(post_list, settings.POST_COUNT)
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
+    user_profile = get_object_or_404(
+        User.objects.select_related("stats"), username=username
+    )
+    post_list = user_profile.posts.feed()
+    page_obj = get_page_obj(
+        request, post_list, partitioned(author=user_profile)
+    )
+    following = (
+        request.user.is_authenticated
+        and request.user != user_profile
+        and Follow.objects.filter(
+            user=request.user, author=user_profile
+        ).exists()
+    )
     context = {
         "user_profile": user_profile,
         "page_obj": page_obj,
-        "post_count": post_list.count(),
+        "post_count": AuthorStats.post_count_for(user_profile),
+        "following": following,
     }
     return render(request, "posts/profile.html", context)
 
 
+def get_archived(post_id, shape=None):
+    """Пост архивного раздела или Http404."""
+    post = partitions.find_archived(post_id, shape)
+    if post is None:
+        raise Http404("Нет такой записи")
+    return post
+
+
+@replica_reads
+@conditional.post_detail_condition
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, id=post_id)
-    author = post.author
-    post_count = author.posts.count()
+    post = (
+        Post.objects.feed().filter(id=post_id).first()
+        or get_archived(post_id)
+    )
+    post_count = AuthorStats.post_count_for(post.author)
     context = {
         "post": post,
         "post_count": post_count,
@@ -56,13 +99,24 @@ def post_detail(request, post_id):
     return render(request, "posts/post_detail.html", context)
 
 
+def search(request):
+    query = request.GET.get("q", "").strip()
+    paginator = Paginator(search_posts(query), settings.POST_COUNT)
+    page_obj = paginator.get_page(request.GET.get("page"))
+    context = {
+        "query": query,
+        "page_obj": page_obj,
+    }
+    return render(request, "posts/search.html", context)
+
+
 @login_required
 def post_create(request):
     context = {
         "title": "Новый пост",
         "button": "Сохранить",
     }
-    form = PostForm(request.POST or None)
+    form = PostForm(request.POST or None, files=request.FILES or None)
     if form.is_valid():
         new_post = form.save(commit=False)
         new_post.author = request.user
@@ -74,7 +128,11 @@ def post_create(request):
 
 @login_required
 def post_edit(request, post_id):
-    post = get_object_or_404(Post, id=post_id)
+    post = Post.objects.filter(id=post_id).first()
+    archived = post is None
+    if archived:
+        # Пост из архива возвращается в горячую таблицу при сохранении
+        post = partitions.as_post(get_archived(post_id, PostQuerySet.all))
     if request.user != post.author:
         return redirect("posts:post_detail", post_id)
     context = {
@@ -82,9 +140,40 @@ def post_edit(request, post_id):
         "button": "Добавить",
         "post": post,
     }
-    form = PostForm(request.POST or None, instance=post)
+    form = PostForm(
+        request.POST or None, files=request.FILES or None, instance=post
+    )
     if form.is_valid():
+        if archived and partitions.restore(post_id):
+            tasks.fan_out_post.enqueue(
+                key=f"fan_out_post:{post_id}", post_id=post_id
+            )
         form.save()
         return redirect("posts:post_detail", post.id)
     context["form"] = form
     return render(request, "posts/create.html", context)
+
+
+@login_required
+def follow_index(request):
+    # Лента читается из TimelineEntry, а не из всех постов подписок
+    paginator = timeline.TimelinePaginator(request.user, settings.POST_COUNT)
+    page_obj = paginator.get_cursor_page(request.GET.get("cursor"))
+    context = {
+        "page_obj": page_obj,
+    }
+    return render(request, "posts/follow.html", context)
+
+
+@login_required
+def profile_follow(request, username):
+    author = get_object_or_404(User, username=username)
+    timeline.follow(request.user, author)
+    return redirect("posts:profile", username)
+
+
+@login_required
+def profile_unfollow(request, username):
+    author = get_object_or_404(User, username=username)
+    timeline.unfollow(request.user, author)
+    return redirect("posts:profile", username)
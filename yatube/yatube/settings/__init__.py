@@ -0,0 +1,18 @@
+"""
+Профиль настроек выбирается переменной окружения YATUBE_ENV:
+dev (по умолчанию) — разработка, prod — боевой сервер.
+Профиль можно указать и напрямую:
+DJANGO_SETTINGS_MODULE=yatube.settings.prod.
+"""
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+ENV = os.environ.get("YATUBE_ENV", "dev")
+
+if ENV == "prod":
+    from .prod import *  # noqa: F401,F403
+elif ENV == "dev":
+    from .dev import *  # noqa: F401,F403
+else:
+    raise ImproperlyConfigured(f"Неизвестный профиль YATUBE_ENV={ENV}")
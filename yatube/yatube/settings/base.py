@@ -0,0 +1,235 @@
+"""
+Общие настройки yatube. Профили dev и prod дополняют их,
+профиль выбирается в yatube/settings/__init__.py.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/2.2/topics/settings/
+
+For the full list of settings and their values, see
+https://docs.djangoproject.com/en/2.2/ref/settings/
+"""
+
+import os
+
+from .sessions import SESSION_CACHE_TIMEOUT, get_session_engine  # noqa: F401
+
+# Build paths inside the project like this: os.path.join(BASE_DIR, ...)
+BASE_DIR = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+
+DEBUG = False
+
+ALLOWED_HOSTS = []
+
+
+# Application definition
+
+INSTALLED_APPS = [
+    "posts.apps.PostsConfig",
+    "django.contrib.admin",
+    "django.contrib.auth",
+    "django.contrib.contenttypes",
+    "django.contrib.sessions",
+    "django.contrib.messages",
+    "django.contrib.staticfiles",
+    "users.apps.UsersConfig",
+    "core.apps.CoreConfig",
+    "about.apps.AboutConfig",
+    "sorl.thumbnail",
+]
+
+MIDDLEWARE = [
+    "core.middleware.RequestStatsMiddleware",
+    "core.middleware.ReplicaRoutingMiddleware",
+    # До всех, кто читает или меняет тело ответа
+    "core.middleware.CompressionMiddleware",
+    "django.middleware.security.SecurityMiddleware",
+    "django.contrib.sessions.middleware.SessionMiddleware",
+    "django.middleware.common.CommonMiddleware",
+    "django.middleware.csrf.CsrfViewMiddleware",
+    "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "django.contrib.messages.middleware.MessageMiddleware",
+    "django.middleware.clickjacking.XFrameOptionsMiddleware",
+]
+
+ROOT_URLCONF = "yatube.urls"
+
+TEMPLATES_DIR = [os.path.join(BASE_DIR, "templates")]
+
+TEMPLATE_LOADERS = [
+    "django.template.loaders.filesystem.Loader",
+    "django.template.loaders.app_directories.Loader",
+]
+
+TEMPLATES = [
+    {
+        "BACKEND": "core.instrumentation.InstrumentedDjangoTemplates",
+        "DIRS": TEMPLATES_DIR,
+        "OPTIONS": {
+            # Скомпилированные шаблоны живут всё время работы процесса,
+            # core.warmup заполняет кеш при запуске обработчика
+            "loaders": [
+                ("django.template.loaders.cached.Loader", TEMPLATE_LOADERS),
+            ],
+            "context_processors": [
+                "django.template.context_processors.request",
+                "django.contrib.auth.context_processors.auth",
+                "django.contrib.messages.context_processors.messages",
+                "core.context_processors.year.year",
+            ],
+        },
+    },
+]
+
+WSGI_APPLICATION = "yatube.wsgi.application"
+
+
+# Database
+# https://docs.djangoproject.com/en/2.2/ref/settings/#databases
+
+DATABASES = {
+    "default": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": os.path.join(BASE_DIR, "db.sqlite3"),
+    }
+}
+
+# Реплика только для чтения. Локально это копия db.sqlite3:
+# YATUBE_REPLICA_DB=db_replica.sqlite3 после cp db.sqlite3 db_replica.sqlite3
+REPLICA_DB = os.environ.get("YATUBE_REPLICA_DB")
+if REPLICA_DB:
+    DATABASES["replica"] = {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": os.path.join(BASE_DIR, REPLICA_DB),
+        "TEST": {"MIRROR": "default"},
+    }
+
+# Чтения представлений core.routers.replica_reads идут на эти БД
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != "default"]
+DATABASE_ROUTERS = ["core.routers.ReplicaRouter"]
+# Сколько секунд после записи пользователь читает с основной БД
+REPLICA_STICKY_SECONDS = 10
+REPLICA_STICKY_COOKIE = "primary_reads"
+# Прагмы, которые core.db выполняет на каждом новом соединении с SQLite.
+# В разработке остаются значения SQLite, см. settings/sqlite.py
+SQLITE_PRAGMAS = {}
+
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    # Локальный кеш сессий процесса для режима cached_db
+    "sessions": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "sessions",
+    },
+}
+
+SESSION_ENGINE = get_session_engine(os.environ.get("YATUBE_SESSIONS", "db"))
+SESSION_CACHE_ALIAS = "sessions"
+
+
+# Password validation
+# https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        "NAME": (
+            "django.contrib.auth.password_validation."
+            "UserAttributeSimilarityValidator"
+        ),
+    },
+    {
+        "NAME": "django.contrib.auth.password_validation.MinimumLengthValidator",
+    },
+    {
+        "NAME": "django.contrib.auth.password_validation.CommonPasswordValidator",
+    },
+    {
+        "NAME": "django.contrib.auth.password_validation.NumericPasswordValidator",
+    },
+]
+
+
+# Internationalization
+# https://docs.djangoproject.com/en/2.2/topics/i18n/
+
+LANGUAGE_CODE = "ru"
+
+TIME_ZONE = "UTC"
+
+USE_I18N = True
+
+USE_L10N = True
+
+USE_TZ = True
+
+
+# Static files (CSS, JavaScript, Images)
+# https://docs.djangoproject.com/en/2.2/howto/static-files/
+
+STATIC_URL = "/static/"
+
+STATICFILES_DIRS = [os.path.join(BASE_DIR, "static")]
+
+# Сюда collectstatic собирает статику, её отдаёт core.staticfiles
+STATIC_ROOT = os.path.join(BASE_DIR, "static_root")
+# Кеширование статики без хеша в имени, секунды
+STATIC_MAX_AGE = 60 * 60
+
+# Ответы и статика короче этого не сжимаются, байты
+COMPRESS_MIN_SIZE = 1024
+
+MEDIA_URL = "/media/"
+MEDIA_ROOT = os.path.join(BASE_DIR, "media")
+
+LOGIN_URL = "users:login"
+LOGIN_REDIRECT_URL = "posts:index"
+
+EMAIL_BACKEND = "django.core.mail.backends.filebased.EmailBackend"
+EMAIL_FILE_PATH = os.path.join(BASE_DIR, "sent_emails")
+
+POST_COUNT = 10
+# Верхняя граница приблизительного числа постов в ленте
+POST_COUNT_LIMIT = 1000
+# Сколько последних месяцев посты остаются в горячей таблице posts_post,
+# более старые переносит в архивные разделы команда rollover_posts
+POST_HOT_MONTHS = 12
+
+# Кеш страниц лент (posts.caching)
+FEED_CACHE_ALIAS = "default"
+FEED_CACHE_TIMEOUT = 60 * 5
+FEED_CACHE_INDEX_PAGES = 5
+
+# Записей в лентах RSS и Atom (posts.feeds). Не больше
+# FEED_CACHE_INDEX_PAGES * POST_COUNT: иначе новые записи на главной
+# не сбросят кеш её ленты
+SYNDICATION_ITEMS = 20
+
+# Сколько секунд анонимы и прокси кешируют ответы JSON API (posts.api)
+API_CACHE_MAX_AGE = 30
+
+# Запросы дольше этого порога пишутся в журнал yatube.slow_requests
+SLOW_REQUEST_THRESHOLD_MS = 500
+
+# Лента подписок (posts.timeline). Посты авторов, у которых подписчиков
+# больше TIMELINE_FANOUT_LIMIT, не копируются в ленты при публикации,
+# а добавляются при чтении
+TIMELINE_FANOUT_LIMIT = 1000
+# Сколько последних постов автора попадает в ленту при подписке
+TIMELINE_BACKFILL = 100
+
+# Фоновые задачи (core.jobs), обработчик: manage.py run_jobs
+# JOBS_EAGER выполняет задачи сразу при постановке в очередь
+JOBS_EAGER = False
+JOBS_MAX_ATTEMPTS = 5
+# Пауза перед первым повтором, секунд; дальше удваивается
+JOBS_RETRY_DELAY = 10
+# Задача, которая выполняется дольше, считается брошенной
+JOBS_LOCK_TIMEOUT = 60 * 10
+
+# Ширины превью картинок постов для srcset (posts.images)
+POST_IMAGE_WIDTHS = (320, 640, 960)
+THUMBNAIL_QUALITY = 85
@@ -0,0 +1,20 @@
+"""Разработка: отладка, ключ в коде, шаблоны читаются с диска заново."""
+import copy
+
+from .base import *  # noqa: F401,F403
+from .base import TEMPLATE_LOADERS, TEMPLATES
+
+# SECURITY WARNING: keep the secret key used in production secret!
+SECRET_KEY = "u6du%n^fo@o_6)2(h#jv9j%$lqs)4q4f!i+7k0wzowxbxoxm13"
+
+# SECURITY WARNING: don't run with debug turned on in production!
+DEBUG = True
+
+ALLOWED_HOSTS = ["*"]
+
+TEMPLATES = copy.deepcopy(TEMPLATES)
+# Изменения шаблонов видны без перезапуска сервера
+TEMPLATES[0]["OPTIONS"]["loaders"] = TEMPLATE_LOADERS
+TEMPLATES[0]["OPTIONS"]["context_processors"].insert(
+    0, "django.template.context_processors.debug"
+)
@@ -0,0 +1,45 @@
+"""
+Боевой сервер. Без DEBUG: Django не копит в памяти каждый SQL-запрос.
+Ключ и хосты берутся из окружения: YATUBE_SECRET_KEY и
+YATUBE_ALLOWED_HOSTS (через запятую), режим сессий — YATUBE_SESSIONS
+(по умолчанию cached_db).
+"""
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .base import *  # noqa: F401,F403
+from .base import DATABASES
+from .sessions import get_session_engine
+from .sqlite import CONN_MAX_AGE, SQLITE_PRAGMAS, SQLITE_TIMEOUT  # noqa: F401
+
+try:
+    SECRET_KEY = os.environ["YATUBE_SECRET_KEY"]
+except KeyError:
+    raise ImproperlyConfigured("Не задана переменная YATUBE_SECRET_KEY")
+
+DEBUG = False
+
+ALLOWED_HOSTS = [
+    host.strip()
+    for host in os.environ.get("YATUBE_ALLOWED_HOSTS", "").split(",")
+    if host.strip()
+]
+
+DATABASES = {
+    alias: dict(
+        database,
+        CONN_MAX_AGE=CONN_MAX_AGE,
+        OPTIONS=dict(database.get("OPTIONS", {}), timeout=SQLITE_TIMEOUT),
+    )
+    for alias, database in DATABASES.items()
+}
+
+# Сессии вошедших пользователей читаются из кеша, а не из БД
+SESSION_ENGINE = get_session_engine(
+    os.environ.get("YATUBE_SESSIONS", "cached_db")
+)
+
+# Имена статики с хешем содержимого и сжатые копии .gz и .br:
+# перед запуском нужен manage.py collectstatic
+STATICFILES_STORAGE = "core.staticfiles.CompressedManifestStaticFilesStorage"
@@ -0,0 +1,27 @@
+"""
+Хранилища сессий, режим выбирается переменной YATUBE_SESSIONS.
+db — каждая страница вошедшего пользователя читает django_session;
+cached_db — читает из локального кеша процесса, пишет и в БД;
+signed_cookies — сессия целиком в подписанной cookie, без БД: только
+для небольших сессий, данные в cookie видны клиенту.
+Сравнение режимов — manage.py benchmark_sessions.
+"""
+from django.core.exceptions import ImproperlyConfigured
+
+SESSION_ENGINES = {
+    "db": "django.contrib.sessions.backends.db",
+    "cached_db": "core.sessions",
+    "signed_cookies": "django.contrib.sessions.backends.signed_cookies",
+}
+
+# Сколько секунд сессия живёт в кеше процесса в режиме cached_db
+SESSION_CACHE_TIMEOUT = 60
+
+
+def get_session_engine(mode):
+    try:
+        return SESSION_ENGINES[mode]
+    except KeyError:
+        raise ImproperlyConfigured(
+            f"Неизвестный режим сессий YATUBE_SESSIONS={mode}"
+        )
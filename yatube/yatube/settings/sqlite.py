@@ -0,0 +1,19 @@
+"""
+SQLite для нескольких процессов-обработчиков, которые одновременно
+читают и пишут. Использует профиль prod; сравнение с настройками
+по умолчанию — manage.py benchmark_sqlite.
+"""
+
+# Соединение переживает запрос и не открывается заново каждый раз
+CONN_MAX_AGE = 60
+# Сколько секунд писатель ждёт блокировку, прежде чем
+# получить «database is locked» (busy timeout)
+SQLITE_TIMEOUT = 20
+SQLITE_PRAGMAS = {
+    # Читатели не ждут писателя, писатель не ждёт читателей
+    "journal_mode": "WAL",
+    # В режиме WAL fsync только при контрольной точке, БД не портится
+    "synchronous": "NORMAL",
+    "mmap_size": 256 * 1024 * 1024,
+    "temp_store": "MEMORY",
+}
@@ -11,6 +11,13 @@ import os
 
 from django.core.wsgi import get_wsgi_application
 
+from core.staticfiles import StaticFilesApplication
+from core.warmup import warm_templates
+
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "yatube.settings")
 
-application = get_wsgi_application()
+# Статика из STATIC_ROOT отдаётся до Django
+application = StaticFilesApplication(get_wsgi_application())
+
+# Шаблоны компилируются при запуске обработчика, а не первым запросом
+warm_templates()